@@ -0,0 +1,172 @@
+# For type hinting / Do typowania
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Calculation steps shared with the monthly engine / Kroki obliczeń wspólne z silnikiem miesięcznym
+from tax_engine import compute_health, compute_pit, zus_spoleczne_for_year
+# Compiled rules / Skompilowane reguły
+from tax_rules import (
+    WARNING_PIT_SKALA, WARNING_PIT_SKALA_CUMULATIVE, TaxRulePack, pit_progressive, rule_packs_for_year,
+    warning_messages)
+
+# === Annual Simulation / Symulacja roczna ===
+# Calculates up to 12 months in one pass, carrying cumulative income and PIT forward so that
+# the tax scale bracket and the annual tax reducing amount apply in the right month.
+# Given the months of an earlier simulation of the same scenario, the unchanged leading months are reused and the
+# simulation restarts from the first month whose input changed, with the cumulative state carried by that earlier
+# result. The earlier months must come from the server's own results, never from a client.
+# Oblicza do 12 miesięcy w jednym przebiegu, przenosząc narastający dochód i PIT, tak aby
+# próg skali podatkowej i roczna kwota zmniejszająca podatek były zastosowane we właściwym miesiącu.
+# Po podaniu miesięcy wcześniejszej symulacji tego samego scenariusza niezmienione początkowe miesiące są używane
+# ponownie, a symulacja rusza od pierwszego miesiąca o zmienionym wejściu, ze stanem narastającym z tamtego wyniku.
+# Wcześniejsze miesiące muszą pochodzić z własnych wyników serwera, nigdy od klienta.
+
+# Number of months in a tax year / Liczba miesięcy w roku podatkowym
+MONTHS_IN_YEAR = 12
+
+
+class MonthResult(NamedTuple):
+    """Result of one simulated month / Wynik jednego symulowanego miesiąca."""
+    income: float  # Monthly income / Przychód miesięczny
+    costs: float  # Monthly costs / Koszty miesięczne
+    zus_spoleczne_total: float  # Total social ZUS / Suma ZUS społecznego
+    skladka_zdrowotna: float  # Health contribution / Składka zdrowotna
+    podatek_pit: float  # PIT advance for the month / Zaliczka PIT za miesiąc
+    vat: float  # VAT amount / Kwota VAT
+    calkowite_obciazenie: float  # Total burden / Całkowite obciążenie
+    dochod_netto: float  # Net income / Dochód netto
+    # Income (revenue - costs - social ZUS) since January / Dochód (przychód - koszty - ZUS społ.) od stycznia
+    dochod_narastajaco: float
+    # PIT paid since January, including this month / PIT zapłacony od stycznia, łącznie z tym miesiącem
+    podatek_pit_narastajaco: float
+    prog_podatkowy: int  # Tax bracket reached (1 or 2) / Osiągnięty próg podatkowy (1 lub 2)
+
+
+class AnnualResult(NamedTuple):
+    """Result of an annual simulation / Wynik symulacji rocznej."""
+    months: List[MonthResult]  # Months in input order / Miesiące w kolejności wejścia
+    # Zero-based index of the first recalculated month; earlier months were reused
+    # Indeks (od zera) pierwszego przeliczonego miesiąca; wcześniejsze miesiące użyto ponownie
+    recomputed_from: int
+    # Zero-based indexes of months whose result differs from the previous one / Indeksy (od zera) miesięcy, których wynik różni się od poprzedniego
+    changed: List[int]
+    # Social ZUS components, the same every month / Składowe ZUS społecznego, takie same co miesiąc
+    zus_spoleczne_details: Tuple[Tuple[str, float, float, float], ...]
+    ostrzezenia: Tuple[str, ...]  # Warnings / Ostrzeżenia
+
+
+def cumulative_pit_due(rules: TaxRulePack, dochod_narastajaco: float) -> float:
+    """
+    Tax due on the income since January under the tax scale, with the annual reducing amount.
+    Podatek należny od dochodu od stycznia według skali, z roczną kwotą zmniejszającą podatek.
+    """
+    base = max(0.0, dochod_narastajaco)
+    # Annual tax reducing amount (12 x monthly) / Roczna kwota zmniejszająca podatek (12 x miesięczna)
+    annual_reducing_amount = rules.pit_reducing_amount * MONTHS_IN_YEAR
+    if base <= rules.pit_annual_threshold:
+        return max(0.0, base * rules.pit_rate - annual_reducing_amount)
+    return (rules.pit_annual_threshold * rules.pit_rate - annual_reducing_amount
+            + (base - rules.pit_annual_threshold) * rules.pit_rate_high)
+
+
+def _simulate_month(
+    rules: TaxRulePack,
+    income: float,
+    costs: float,
+    zus_total: float,
+    stawka_vat: float,
+    has_tax_discount: bool,
+    dochod_narastajaco: float,
+    podatek_pit_narastajaco: float,
+) -> MonthResult:
+    """Calculates one month from the state carried over from the previous one / Oblicza jeden miesiąc ze stanu przeniesionego z poprzedniego."""
+    health = compute_health(rules, income, costs, zus_total)
+    dochod_narastajaco = dochod_narastajaco + (income - costs - zus_total)
+
+    if rules.pit_strategy is pit_progressive:
+        # Advance = cumulative tax due - advances already paid / Zaliczka = podatek należny narastająco - zapłacone zaliczki
+        due = cumulative_pit_due(rules, dochod_narastajaco)
+        if has_tax_discount:
+            due *= rules.pit_discount_factor
+        pit = round(max(0.0, due - podatek_pit_narastajaco), 2)
+        prog_podatkowy = 2 if dochod_narastajaco > rules.pit_annual_threshold else 1
+    else:
+        # Flat forms have no cross-month effects / Formy liniowe nie mają efektów między miesiącami
+        pit = compute_pit(rules, income, costs, zus_total, has_tax_discount)
+        prog_podatkowy = 1
+
+    total = round(zus_total + health + pit, 2)
+    return MonthResult(
+        income=income,
+        costs=costs,
+        zus_spoleczne_total=zus_total,
+        skladka_zdrowotna=health,
+        podatek_pit=pit,
+        vat=round(income * (stawka_vat / 100), 2),
+        calkowite_obciazenie=total,
+        dochod_netto=round(income - costs - total, 2),
+        dochod_narastajaco=round(dochod_narastajaco, 2),
+        podatek_pit_narastajaco=round(podatek_pit_narastajaco + pit, 2),
+        prog_podatkowy=prog_podatkowy,
+    )
+
+
+def simulate_year(
+    income: Sequence[float],
+    costs: Sequence[float],
+    forma_opodatkowania: str,
+    stawka_vat: float,
+    has_tax_discount: bool,
+    platnik_chorobowe: bool,
+    zus_base: Optional[float],
+    year: int,
+    previous: Optional[Sequence[MonthResult]] = None,
+) -> AnnualResult:
+    """
+    Simulates consecutive months from January. Inputs must already be validated with validate_row.
+    Symuluje kolejne miesiące od stycznia. Dane muszą być wcześniej zwalidowane przez validate_row.
+
+    Args:
+        income, costs: Monthly columns (at most 12 entries). / Kolumny miesięczne (najwyżej 12 wpisów).
+        forma_opodatkowania, stawka_vat, has_tax_discount, platnik_chorobowe: Same for the whole year. / Takie same przez cały rok.
+        zus_base: ZUS base from ZUSData (None if fetching failed). / Podstawa ZUS z ZUSData (None, jeśli pobieranie się nie powiodło).
+        year: Year of the ZUS data, selects the rule pack. / Rok danych ZUS, wybiera pakiet reguł.
+        previous: Months of an earlier server-side simulation with the same parameters and ZUS data.
+            Miesiące wcześniejszej symulacji po stronie serwera z tymi samymi parametrami i danymi ZUS.
+
+    Returns:
+        AnnualResult; without previous, every month is calculated and counts as changed.
+        AnnualResult; bez previous każdy miesiąc jest obliczany i liczy się jako zmieniony.
+    """
+    rules = rule_packs_for_year(year)[forma_opodatkowania]
+    zus = zus_spoleczne_for_year(zus_base, platnik_chorobowe, year)
+
+    previous = previous or []
+    # Leading months with the same input keep their result / Początkowe miesiące z tym samym wejściem zachowują wynik
+    start = 0
+    limit = min(len(previous), len(income))
+    while start < limit and (previous[start].income, previous[start].costs) == (income[start], costs[start]):
+        start += 1
+
+    months = list(previous[:start])
+    changed = []
+    dochod_narastajaco = months[-1].dochod_narastajaco if months else 0.0
+    podatek_pit_narastajaco = months[-1].podatek_pit_narastajaco if months else 0.0
+    for index in range(start, len(income)):
+        month = _simulate_month(rules, income[index], costs[index], zus.total, stawka_vat, has_tax_discount,
+                                dochod_narastajaco, podatek_pit_narastajaco)
+        months.append(month)
+        if index >= len(previous) or previous[index] != month:
+            changed.append(index)
+        dochod_narastajaco, podatek_pit_narastajaco = month.dochod_narastajaco, month.podatek_pit_narastajaco
+
+    # The single-month skala warning does not apply, thresholds are cumulative here
+    # Ostrzeżenie skali dla jednego miesiąca nie dotyczy, progi są tu liczone narastająco
+    codes = tuple(WARNING_PIT_SKALA_CUMULATIVE if code == WARNING_PIT_SKALA else code
+                  for code in rules.warning_codes)
+    return AnnualResult(
+        months=months,
+        recomputed_from=start,
+        changed=changed,
+        zus_spoleczne_details=zus.details,
+        ostrzezenia=warning_messages(codes, zus_base is None, has_tax_discount),
+    )
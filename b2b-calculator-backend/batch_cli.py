@@ -0,0 +1,222 @@
+"""
+Offline bulk calculation for month-end runs, without HTTP and without zus.pl.
+Obliczenia masowe offline dla przebiegów na koniec miesiąca, bez HTTP i bez zus.pl.
+
+Rows are read from CSV, NDJSON or Parquet files (Parquet needs pyarrow), calculated like POST /oblicz
+in a process pool across all cores, and written in input order as NDJSON or CSV, the same output as
+POST /oblicz/stream. ZUS data comes from a pinned JSON file shaped like the /aktualne_dane_zus response.
+Wiersze są odczytywane z plików CSV, NDJSON lub Parquet (Parquet wymaga pyarrow), obliczane jak w POST /oblicz
+w puli procesów na wszystkich rdzeniach i zapisywane w kolejności wejścia jako NDJSON lub CSV, tak samo jak
+w POST /oblicz/stream. Dane ZUS pochodzą z przypiętego pliku JSON w kształcie odpowiedzi /aktualne_dane_zus.
+
+Usage / Użycie (from b2b-calculator-backend / z katalogu b2b-calculator-backend):
+    curl -o zus_2025.json http://127.0.0.1:8000/aktualne_dane_zus
+    python batch_cli.py kontrahenci.csv --zus zus_2025.json --output wyniki.ndjson [--workers 8]
+"""
+# Command line parsing / Parsowanie wiersza poleceń
+import argparse
+# Ordered window of running chunks / Uporządkowane okno wykonywanych porcji
+from collections import deque
+# Process pool / Pula procesów
+from concurrent.futures import ProcessPoolExecutor
+# Library for JSON decoding / Biblioteka do dekodowania JSON
+import json
+# Library for paths and the CPU count / Biblioteka do ścieżek i liczby procesorów
+import os
+# Standard streams / Standardowe strumienie
+import sys
+# Timing / Pomiar czasu
+import time
+# For type hinting / Do typowania
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+# Shared with POST /oblicz/stream / Wspólne z POST /oblicz/stream
+from bulk_stream import (
+    CSV_OUTPUT_COLUMNS, STREAM_CHUNK_ROWS, STREAM_FORMATS, calculate_chunk, decode_line, encode_records,
+    parse_csv_header, parse_record)
+# ZUS data model / Model danych ZUS
+from zus_data_fetcher import ZUSData
+
+# === Configuration / Konfiguracja ===
+# Chunks queued per worker, bounds memory while keeping every core busy
+# Porcje w kolejce na proces roboczy, ogranicza pamięć, utrzymując zajętość wszystkich rdzeni
+CHUNKS_IN_FLIGHT_PER_WORKER = 4
+# Seconds between progress reports / Sekundy między raportami postępu
+PROGRESS_INTERVAL = 5.0
+
+# A chunk sent to a worker: (index of its first row, input format, CSV header, lines or records)
+# Porcja wysyłana do procesu roboczego: (indeks pierwszego wiersza, format wejścia, nagłówek CSV, linie lub rekordy)
+Chunk = Tuple[int, str, Optional[List[str]], list]
+
+# === Worker / Proces roboczy ===
+
+# ZUS data of this worker process, set by the pool initializer / Dane ZUS tego procesu roboczego, ustawiane przez inicjalizator puli
+_worker_zus_info: Optional[ZUSData] = None
+
+
+def _init_worker(zus_info: ZUSData) -> None:
+    global _worker_zus_info
+    _worker_zus_info = zus_info
+
+
+def _process_chunk(chunk: Chunk, output_format: str) -> Tuple[int, bytes]:
+    """
+    Decodes, validates, calculates and encodes one chunk. Returns (row count, encoded output).
+    Dekoduje, waliduje, oblicza i koduje jedną porcję. Zwraca (liczba wierszy, zakodowane wyjście).
+    """
+    first_index, input_format, header, items = chunk
+    entries = []
+    for offset, item in enumerate(items):
+        if input_format == "parquet":
+            record, error = item, None
+        else:
+            record, error = decode_line(item, input_format, header)
+        row = None
+        if record is not None:
+            row, error = parse_record(record)
+        entries.append((first_index + offset, row, error))
+    return len(entries), encode_records(calculate_chunk(entries, _worker_zus_info), output_format)
+
+# === Input / Wejście ===
+
+
+def detect_format(path: str) -> str:
+    """Input format from the file extension / Format wejścia na podstawie rozszerzenia pliku."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return "parquet"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+def iter_chunks(path: str, input_format: str, chunk_rows: int) -> Iterator[Chunk]:
+    """
+    Splits an input file into chunks of data rows without reading it all into memory.
+    Dzieli plik wejściowy na porcje wierszy danych bez wczytywania go w całości do pamięci.
+    """
+    index = 0
+    if input_format == "parquet":
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Pliki Parquet wymagają pakietu pyarrow")  # Parquet files require pyarrow
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            records = batch.to_pylist()
+            yield index, input_format, None, records
+            index += len(records)
+        return
+
+    header = None
+    lines: List[str] = []
+    # utf-8-sig drops a BOM written by spreadsheet tools / utf-8-sig usuwa BOM zapisywany przez arkusze kalkulacyjne
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as source:
+        for line in source:
+            line = line.rstrip("\r\n")
+            # Empty lines are skipped, as in /oblicz/stream / Puste linie są pomijane, jak w /oblicz/stream
+            if not line.strip():
+                continue
+            if input_format == "csv" and header is None:
+                header = parse_csv_header(line)
+                continue
+            lines.append(line)
+            if len(lines) >= chunk_rows:
+                yield index, input_format, header, lines
+                index += len(lines)
+                lines = []
+    if lines:
+        yield index, input_format, header, lines
+
+
+def load_zus_data(path: str) -> ZUSData:
+    """
+    Reads the pinned ZUS data; a file without a ZUS base is rejected rather than calculating with zero.
+    Wczytuje przypięte dane ZUS; plik bez podstawy ZUS jest odrzucany zamiast liczenia z zerem.
+    """
+    with open(path, encoding="utf-8") as source:
+        zus_info = ZUSData(**json.load(source))
+    if zus_info.zus_base is None:
+        raise SystemExit(f"Plik {path} nie zawiera podstawy ZUS (zus_base)")  # File has no ZUS base
+    return zus_info
+
+# === Run / Przebieg ===
+
+
+def run(inputs: List[str], zus_info: ZUSData, output: BinaryIO, output_format: str,
+        workers: int, chunk_rows: int = STREAM_CHUNK_ROWS) -> int:
+    """
+    Calculates every input file in order and writes the results to output.
+    Chunks run in parallel, but at most workers x CHUNKS_IN_FLIGHT_PER_WORKER are pending, and results are
+    written as soon as the oldest one is done, so output is streamed in input order.
+
+    Oblicza każdy plik wejściowy po kolei i zapisuje wyniki do output.
+    Porcje są liczone równolegle, ale oczekuje najwyżej workers x CHUNKS_IN_FLIGHT_PER_WORKER z nich, a wyniki
+    są zapisywane, gdy tylko najstarsza się zakończy, więc wyjście jest strumieniowane w kolejności wejścia.
+
+    Returns:
+        Number of rows processed. / Liczba przetworzonych wierszy.
+    """
+    if output_format == "csv":
+        output.write((",".join(CSV_OUTPUT_COLUMNS) + "\n").encode("utf-8"))
+
+    started = time.perf_counter()
+    last_report = started
+    rows = 0
+    # Row numbers continue across files / Numery wierszy są kontynuowane między plikami
+    offset = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(zus_info,)) as pool:
+        pending = deque()
+
+        def write_oldest() -> None:
+            nonlocal rows, last_report
+            count, encoded = pending.popleft().result()
+            output.write(encoded)
+            rows += count
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                print(f"{rows} wierszy, {rows / (now - started):.0f} wierszy/s", file=sys.stderr)
+
+        for path in inputs:
+            file_rows = 0
+            for first_index, input_format, header, items in iter_chunks(path, detect_format(path), chunk_rows):
+                pending.append(pool.submit(_process_chunk, (offset + first_index, input_format, header, items),
+                                           output_format))
+                file_rows = first_index + len(items)
+                if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                    write_oldest()
+            offset += file_rows
+        while pending:
+            write_oldest()
+
+    elapsed = time.perf_counter() - started
+    print(f"Gotowe: {rows} wierszy w {elapsed:.2f} s ({rows / elapsed if elapsed else 0.0:.0f} wierszy/s, "
+          f"{workers} procesów)", file=sys.stderr)  # Done: rows in seconds (rows/s, processes)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="CSV, NDJSON (.ndjson/.jsonl) or Parquet files")
+    parser.add_argument("--zus", required=True, help="Pinned ZUS data (JSON from /aktualne_dane_zus)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=STREAM_FORMATS,
+                        help="Output format (default: from the output extension, else ndjson)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS, help="Rows per chunk")
+    args = parser.parse_args(argv)
+
+    output_format = args.format
+    if output_format is None:
+        output_format = "csv" if args.output and args.output.lower().endswith(".csv") else "ndjson"
+    zus_info = load_zus_data(args.zus)
+
+    if args.output:
+        with open(args.output, "wb") as output:
+            run(args.inputs, zus_info, output, output_format, max(1, args.workers), max(1, args.chunk_rows))
+    else:
+        run(args.inputs, zus_info, sys.stdout.buffer, output_format, max(1, args.workers), max(1, args.chunk_rows))
+
+
+if __name__ == "__main__":
+    main()
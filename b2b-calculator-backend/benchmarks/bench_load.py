@@ -0,0 +1,291 @@
+"""
+Load and latency benchmark of the backend under uvicorn, with zus.pl replaced by a local stand-in.
+Benchmark obciążenia i opóźnień backendu pod uvicorn, z zus.pl zastąpionym lokalnym zamiennikiem.
+
+Scenarios / Scenariusze:
+    warm    ZUS data fetched and the result cache filled before measuring; /oblicz repeats a fixed input set.
+            Dane ZUS pobrane i pamięć wyników wypełniona przed pomiarem; /oblicz powtarza stały zestaw danych.
+    cold    New server with an empty store for each endpoint; the first requests wait for the stand-in,
+            every /oblicz input is unique.
+            Nowy serwer z pustym magazynem dla każdego punktu końcowego; pierwsze żądania czekają na zamiennik,
+            każde wejście /oblicz jest unikalne.
+    outage  As cold, but the stand-in answers every request with 503.
+            Jak cold, ale zamiennik odpowiada na każde żądanie kodem 503.
+
+Results are written as JSON (stdout or --output) to compare between commits.
+Wyniki są zapisywane jako JSON (stdout lub --output) do porównywania między commitami.
+
+Usage / Użycie (from b2b-calculator-backend / z katalogu b2b-calculator-backend):
+    python benchmarks/bench_load.py --workers 2 --concurrency 32 --duration 10 --output bench.json
+"""
+# Command line parsing / Parsowanie wiersza poleceń
+import argparse
+# Asynchronous load generator / Asynchroniczny generator obciążenia
+import asyncio
+# Timestamp of the run / Znacznik czasu przebiegu
+import datetime
+# Library for JSON encoding / Biblioteka do kodowania JSON
+import json
+# Percentile ranks / Rangi percentyli
+import math
+# Library for paths / Biblioteka do ścieżek
+import os
+# Python version in the report / Wersja Pythona w raporcie
+import platform
+# Free port lookup / Wyszukiwanie wolnego portu
+import socket
+# Server process / Proces serwera
+import subprocess
+# Interpreter path / Ścieżka interpretera
+import sys
+# Temporary store directory / Tymczasowy katalog magazynu
+import tempfile
+# Timing / Pomiar czasu
+import time
+# Waiting for the server / Oczekiwanie na serwer
+import urllib.request
+# For type hinting / Do typowania
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from zus_stub_server import start_stub_server  # noqa: E402
+
+# Backend directory, the uvicorn working directory / Katalog backendu, katalog roboczy uvicorn
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Benchmarked endpoints / Mierzone punkty końcowe
+ENDPOINTS = ("/oblicz", "/aktualne_dane_zus")
+SCENARIOS = ("warm", "cold", "outage")
+# Number of distinct /oblicz inputs in the warm scenario / Liczba różnych wejść /oblicz w scenariuszu warm
+WARM_INPUT_SET = 100
+# Tax forms cycled through in /oblicz bodies / Formy opodatkowania używane cyklicznie w treściach /oblicz
+_FORMS = ("ryczalt_12", "ryczalt_15", "liniowy_19", "skala")
+# Seconds to wait for uvicorn to accept requests / Sekundy oczekiwania, aż uvicorn zacznie przyjmować żądania
+SERVER_START_TIMEOUT = 30
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _oblicz_body(index: int) -> bytes:
+    """Deterministic /oblicz request body / Deterministyczna treść żądania /oblicz."""
+    return json.dumps({
+        "income": 5000 + (index * 37) % 50000,
+        "costs": (index * 13) % 3000,
+        "forma_opodatkowania": _FORMS[index % len(_FORMS)],
+        "has_tax_discount": index % 7 == 0,
+    }).encode("utf-8")
+
+# === Server Process / Proces serwera ===
+
+
+class BackendServer:
+    """uvicorn running main:app with its own empty ZUS store / uvicorn z main:app i własnym pustym magazynem ZUS."""
+
+    def __init__(self, workers: int, url_template: str):
+        self.workers = workers
+        self.url_template = url_template
+        self.port = _free_port()
+        self._store_dir = tempfile.TemporaryDirectory()
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "BackendServer":
+        env = dict(os.environ,
+                   ZUS_INFO_URL_TEMPLATE=self.url_template,
+                   ZUS_STORE_PATH=os.path.join(self._store_dir.name, "zus_data.sqlite3"))
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            try:
+                # Does not touch ZUS data / Nie dotyka danych ZUS
+                urllib.request.urlopen(f"http://127.0.0.1:{self.port}/openapi.json", timeout=1).read()
+                return self
+            except OSError:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.__exit__(None, None, None)
+                    raise RuntimeError("uvicorn did not start / uvicorn nie wystartował")
+                time.sleep(0.1)
+
+    def __exit__(self, *exc) -> None:
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._store_dir.cleanup()
+
+# === Load Generator / Generator obciążenia ===
+
+
+async def _send(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, port: int,
+                method: str, path: str, body: bytes) -> int:
+    """One HTTP/1.1 keep-alive request, returns the status / Jedno żądanie HTTP/1.1 keep-alive, zwraca status."""
+    head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nContent-Length: {len(body)}\r\n"
+    if body:
+        head += "Content-Type: application/json\r\n"
+    writer.write(head.encode("ascii") + b"\r\n" + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _run_load(port: int, method: str, path: str, make_body: Callable[[int], bytes],
+                    concurrency: int, duration: float) -> Dict:
+    """Keeps `concurrency` connections busy for `duration` seconds / Utrzymuje `concurrency` połączeń zajętych przez `duration` sekund."""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    counter = iter(range(sys.maxsize))
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def client() -> None:
+        nonlocal errors
+        connection: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        while time.perf_counter() < deadline:
+            body = make_body(next(counter))
+            request_started = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection("127.0.0.1", port)
+                status = await _send(*connection, port, method, path, body)
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                errors += 1
+                if connection is not None:
+                    connection[1].close()
+                connection = None
+                continue
+            latencies.append(time.perf_counter() - request_started)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        if connection is not None:
+            connection[1].close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return _summary(latencies, statuses, errors, elapsed)
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile in milliseconds / Percentyl metodą najbliższej rangi w milisekundach."""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return round(ordered[rank - 1] * 1000, 3)
+
+
+def _summary(latencies: List[float], statuses: Dict[str, int], errors: int, elapsed: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "status_counts": statuses,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": _percentile(ordered, 0.50),
+        "p95_ms": _percentile(ordered, 0.95),
+        "p99_ms": _percentile(ordered, 0.99),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+    }
+
+
+def _endpoint_load(port: int, endpoint: str, unique_inputs: bool, concurrency: int, duration: float) -> Dict:
+    if endpoint == "/oblicz":
+        if unique_inputs:
+            return asyncio.run(_run_load(port, "POST", endpoint, _oblicz_body, concurrency, duration))
+        return asyncio.run(_run_load(port, "POST", endpoint, lambda i: _oblicz_body(i % WARM_INPUT_SET),
+                                     concurrency, duration))
+    return asyncio.run(_run_load(port, "GET", endpoint, lambda i: b"", concurrency, duration))
+
+# === Scenarios / Scenariusze ===
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> Dict:
+    """Runs one scenario for every endpoint / Uruchamia jeden scenariusz dla każdego punktu końcowego."""
+    failure_rate = 1.0 if name == "outage" else args.zus_failure_rate
+    stub = start_stub_server(args.zus_latency_ms / 1000, failure_rate)
+    results = {}
+    try:
+        if name == "warm":
+            with BackendServer(args.workers, stub.url_template) as server:
+                # Every worker process fills its own caches / Każdy proces roboczy wypełnia własne pamięci podręczne
+                asyncio.run(_run_load(server.port, "GET", "/aktualne_dane_zus", lambda i: b"",
+                                      args.concurrency, args.warmup))
+                asyncio.run(_run_load(server.port, "POST", "/oblicz", lambda i: _oblicz_body(i % WARM_INPUT_SET),
+                                      args.concurrency, args.warmup))
+                for endpoint in ENDPOINTS:
+                    results[endpoint] = _endpoint_load(server.port, endpoint, False, args.concurrency, args.duration)
+        else:
+            for endpoint in ENDPOINTS:
+                with BackendServer(args.workers, stub.url_template) as server:
+                    results[endpoint] = _endpoint_load(server.port, endpoint, True, args.concurrency, args.duration)
+        results["zus_stub_requests"] = stub.requests_served
+    finally:
+        stub.shutdown()
+        stub.server_close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backend load benchmark / Benchmark obciążenia backendu")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Warm-up seconds before the warm scenario")
+    parser.add_argument("--zus-latency-ms", type=float, default=200.0, help="Stand-in response delay")
+    parser.add_argument("--zus-failure-rate", type=float, default=0.0,
+                        help="Share of stand-in 503s in warm/cold (outage always uses 1.0)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "load",
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "zus_latency_ms": args.zus_latency_ms,
+            "zus_failure_rate": args.zus_failure_rate,
+        },
+        "scenarios": {name: run_scenario(name, args) for name in args.scenarios},
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
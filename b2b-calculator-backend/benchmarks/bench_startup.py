@@ -0,0 +1,171 @@
+"""
+Cold-start benchmark: import time of main and time to the first /oblicz response of a fresh server.
+Benchmark zimnego startu: czas importu main i czas do pierwszej odpowiedzi /oblicz nowego serwera.
+
+Measurements / Pomiary:
+    import      Seconds to import main in a new interpreter, and whether the scraping stack was loaded.
+                Sekundy importu main w nowym interpreterze oraz czy został załadowany stos pobierania.
+    first_response
+                Seconds from starting uvicorn (empty ZUS store, zus.pl replaced by a slow local stand-in)
+                to the first 200 from POST /oblicz, for each ZUS_STARTUP_MODE.
+                Sekundy od uruchomienia uvicorn (pusty magazyn ZUS, zus.pl zastąpiony wolnym lokalnym zamiennikiem)
+                do pierwszej odpowiedzi 200 z POST /oblicz, dla każdego ZUS_STARTUP_MODE.
+
+Results are written as JSON (stdout or --output) to compare between commits.
+Wyniki są zapisywane jako JSON (stdout lub --output) do porównywania między commitami.
+
+Usage / Użycie (from b2b-calculator-backend / z katalogu b2b-calculator-backend):
+    python benchmarks/bench_startup.py --repeat 5 --zus-latency-ms 2000 --output startup.json
+"""
+# Command line parsing / Parsowanie wiersza poleceń
+import argparse
+# Timestamp of the run / Znacznik czasu przebiegu
+import datetime
+# Library for JSON encoding / Biblioteka do kodowania JSON
+import json
+# Library for paths / Biblioteka do ścieżek
+import os
+# Python version in the report / Wersja Pythona w raporcie
+import platform
+# Median of the timings / Mediana pomiarów czasu
+import statistics
+# Server and interpreter processes / Procesy serwera i interpretera
+import subprocess
+# Interpreter path / Ścieżka interpretera
+import sys
+# Temporary store directory / Tymczasowy katalog magazynu
+import tempfile
+# Timing / Pomiar czasu
+import time
+# Requests to the server / Żądania do serwera
+import urllib.request
+# For type hinting / Do typowania
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_load import BACKEND_DIR, SERVER_START_TIMEOUT, _free_port, _git_commit  # noqa: E402
+from zus_stub_server import start_stub_server  # noqa: E402
+
+STARTUP_MODES = ("live", "baseline")
+# Modules that should only be imported when a scrape happens / Moduły, które powinny być importowane tylko przy pobieraniu
+SCRAPER_MODULES = ("requests", "zus_page_parser")
+# Pause between attempts to reach the starting server / Przerwa między próbami połączenia z uruchamianym serwerem
+POLL_INTERVAL = 0.01
+
+# Run in a new interpreter so nothing is imported yet / Uruchamiane w nowym interpreterze, aby nic nie było jeszcze zaimportowane
+_IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "scraper_modules": [name for name in {SCRAPER_MODULES!r} if name in sys.modules]}}))
+"""
+_OBLICZ_BODY = json.dumps({"income": 12000, "costs": 500, "forma_opodatkowania": "skala"}).encode("utf-8")
+
+
+def measure_import(repeat: int) -> Dict:
+    """Import time of main over several fresh interpreters / Czas importu main w kilku nowych interpreterach."""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    seconds = [run["seconds"] for run in runs]
+    return {
+        "median_ms": round(statistics.median(seconds) * 1000, 1),
+        "min_ms": round(min(seconds) * 1000, 1),
+        "scraper_modules_loaded": runs[-1]["scraper_modules"],
+    }
+
+
+def _first_response(mode: str, url_template: str) -> Dict:
+    """
+    Starts uvicorn and polls POST /oblicz until it answers 200.
+    Uruchamia uvicorn i odpytuje POST /oblicz, aż odpowie 200.
+    """
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as store_dir:
+        env = dict(os.environ,
+                   ZUS_STARTUP_MODE=mode,
+                   ZUS_INFO_URL_TEMPLATE=url_template,
+                   ZUS_STORE_PATH=os.path.join(store_dir, "zus_data.sqlite3"))
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = started + SERVER_START_TIMEOUT
+            while True:
+                request = urllib.request.Request(
+                    f"http://127.0.0.1:{port}/oblicz", data=_OBLICZ_BODY, headers={"Content-Type": "application/json"})
+                try:
+                    with urllib.request.urlopen(request, timeout=SERVER_START_TIMEOUT) as response:
+                        response.read()
+                        break
+                except OSError:
+                    if process.poll() is not None or time.perf_counter() > deadline:
+                        raise RuntimeError("uvicorn did not answer / uvicorn nie odpowiedział")
+                    time.sleep(POLL_INTERVAL)
+            elapsed = time.perf_counter() - started
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/aktualne_dane_zus", timeout=5) as response:
+                baseline_version = json.load(response).get("baseline_version")
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return {"seconds": elapsed, "baseline_version": baseline_version}
+
+
+def measure_first_response(repeat: int, zus_latency: float) -> Dict:
+    """Time to the first /oblicz response per startup mode / Czas do pierwszej odpowiedzi /oblicz dla każdego trybu startu."""
+    stub = start_stub_server(latency=zus_latency)
+    try:
+        results = {}
+        for mode in STARTUP_MODES:
+            runs = [_first_response(mode, stub.url_template) for _ in range(repeat)]
+            seconds: List[float] = [run["seconds"] for run in runs]
+            results[mode] = {
+                "median_ms": round(statistics.median(seconds) * 1000, 1),
+                "min_ms": round(min(seconds) * 1000, 1),
+                # Still the baseline right after the first response / Nadal dane bazowe tuż po pierwszej odpowiedzi
+                "baseline_version": runs[-1]["baseline_version"],
+            }
+        return results
+    finally:
+        stub.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark / Benchmark zimnego startu")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--zus-latency-ms", type=float, default=2000.0, help="Stand-in response delay")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "startup",
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "repeat": args.repeat,
+            "zus_latency_ms": args.zus_latency_ms,
+        },
+        "import": measure_import(args.repeat),
+        "first_response": measure_first_response(args.repeat, args.zus_latency_ms / 1000),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
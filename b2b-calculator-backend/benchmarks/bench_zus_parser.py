@@ -0,0 +1,155 @@
+"""
+Offline benchmark of the ZUS page extractor against saved zus.pl pages.
+Benchmark offline ekstraktora strony ZUS na zapisanych stronach zus.pl.
+
+Fixtures are files named zus_<year>*.html in benchmarks/fixtures; the year in the name is the year searched.
+To add one, save the page as served, e.g. curl -o benchmarks/fixtures/zus_2026.html "<ZUS_INFO_URL_TEMPLATE for 2026>".
+Each fixture is also measured wrapped in --depth nested divs, the case that made the old parser quadratic.
+
+Pliki testowe to zus_<rok>*.html w benchmarks/fixtures; rok w nazwie jest szukanym rokiem.
+Aby dodać nowy, zapisz stronę w postaci serwowanej, np. curl -o benchmarks/fixtures/zus_2026.html "<ZUS_INFO_URL_TEMPLATE dla 2026>".
+Każdy plik jest też mierzony po owinięciu w --depth zagnieżdżonych divów, co czyniło stary parser kwadratowym.
+
+Usage / Użycie (from b2b-calculator-backend / z katalogu b2b-calculator-backend):
+    python benchmarks/bench_zus_parser.py [--repeat 20] [--depth 200] [--json]
+"""
+# Command line parsing / Parsowanie wiersza poleceń
+import argparse
+# Fixture discovery / Wyszukiwanie plików testowych
+import glob
+# Library for JSON encoding / Biblioteka do kodowania JSON
+import json
+# Library for paths / Biblioteka do ścieżek
+import os
+# Library for regular expressions / Biblioteka do wyrażeń regularnych
+import re
+# Median of the timings / Mediana pomiarów czasu
+import statistics
+# Import path for the backend modules / Ścieżka importu modułów backendu
+import sys
+# Timing / Pomiar czasu
+import time
+# Peak memory measurement / Pomiar szczytowego zużycia pamięci
+import tracemalloc
+# For type hinting / Do typowania
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zus_page_parser import PARSE_CHUNK_BYTES, extract_avg_salary, parse_salary, salary_pattern  # noqa: E402
+
+# The previous BeautifulSoup scan is measured only if bs4 is installed
+# Poprzednie przeszukanie BeautifulSoup jest mierzone tylko, jeśli bs4 jest zainstalowane
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+# Default fixture directory / Domyślny katalog plików testowych
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Year taken from the fixture file name / Rok pobierany z nazwy pliku testowego
+_FIXTURE_YEAR = re.compile(r"zus_(\d{4})")
+
+
+def _chunks(body: bytes):
+    """Splits a body like response.iter_content() / Dzieli treść jak response.iter_content()."""
+    for start in range(0, len(body), PARSE_CHUNK_BYTES):
+        yield body[start:start + PARSE_CHUNK_BYTES]
+
+
+def streaming_scan(body: bytes, year: int) -> Optional[float]:
+    """Current extractor / Obecny ekstraktor."""
+    return extract_avg_salary(_chunks(body), year).avg_salary
+
+
+def legacy_scan(body: bytes, year: int) -> Optional[float]:
+    """Previous find_all/get_text scan, kept for comparison / Poprzednie przeszukanie find_all/get_text, zachowane do porównania."""
+    soup = BeautifulSoup(body.decode("utf-8"), "html.parser")
+    pattern = salary_pattern(year)
+    for tag in soup.find_all(["p", "strong", "div", "span"]):
+        match = pattern.search(tag.get_text(strip=True).replace("\xa0", " "))
+        if match:
+            try:
+                return parse_salary(match.group(1))
+            except ValueError:
+                continue
+    return None
+
+
+def measure(scan: Callable[[bytes, int], Optional[float]], body: bytes, year: int, repeat: int) -> Dict:
+    """Median time and peak traced memory of a scan / Mediana czasu i szczytowa śledzona pamięć przeszukania."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = scan(body, year)
+        timings.append(time.perf_counter() - started)
+
+    # Separate run, tracing slows the scan down / Osobny przebieg, śledzenie spowalnia przeszukanie
+    tracemalloc.start()
+    scan(body, year)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "avg_salary": found,
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(fixtures: List[str], repeat: int, depth: int) -> List[Dict]:
+    """Benchmarks every fixture, plain and deeply nested / Mierzy każdy plik, zwykły i głęboko zagnieżdżony."""
+    scanners = {"streaming": streaming_scan}
+    if BeautifulSoup is not None:
+        scanners["legacy_bs4"] = legacy_scan
+
+    results = []
+    for path in fixtures:
+        match = _FIXTURE_YEAR.search(os.path.basename(path))
+        if match is None:
+            continue
+        year = int(match.group(1))
+        with open(path, "rb") as f:
+            body = f.read()
+        variants = {"plain": body}
+        if depth:
+            variants[f"nested_{depth}"] = b"<div>" * depth + body + b"</div>" * depth
+        for variant, variant_body in variants.items():
+            for name, scan in scanners.items():
+                results.append({
+                    "fixture": os.path.basename(path),
+                    "variant": variant,
+                    "bytes": len(variant_body),
+                    "parser": name,
+                    "bytes_read": extract_avg_salary(_chunks(variant_body), year).bytes_read if name == "streaming" else len(variant_body),
+                    **measure(scan, variant_body, year, repeat),
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ZUS page extractor benchmark / Benchmark ekstraktora strony ZUS")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with zus_<year>*.html files")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--depth", type=int, default=200, help="Nesting depth of the wrapped variant (0 disables it)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    fixtures = sorted(glob.glob(os.path.join(args.fixtures, "zus_*.html")))
+    if not fixtures:
+        sys.exit(f"No fixtures in {args.fixtures}")
+    results = run(fixtures, args.repeat, args.depth)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    if BeautifulSoup is None:
+        print("bs4 not installed, legacy parser skipped / bs4 nie jest zainstalowane, stary parser pominięty")
+    print(f"{'fixture':<18} {'variant':<11} {'parser':<11} {'bytes':>8} {'read':>8} {'median ms':>10} {'peak KiB':>9}  avg_salary")
+    for row in results:
+        print(f"{row['fixture']:<18} {row['variant']:<11} {row['parser']:<11} {row['bytes']:>8} {row['bytes_read']:>8} "
+              f"{row['median_ms']:>10} {row['peak_kib']:>9}  {row['avg_salary']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Local stand-in for zus.pl that serves the saved fixtures with configurable latency and failure rate.
+Lokalny zamiennik zus.pl serwujący zapisane strony z konfigurowalnym opóźnieniem i odsetkiem błędów.
+
+Usage / Użycie (from b2b-calculator-backend / z katalogu b2b-calculator-backend):
+    python benchmarks/zus_stub_server.py --port 8765 --latency-ms 200 --failure-rate 0.1
+    ZUS_INFO_URL_TEMPLATE="http://127.0.0.1:8765/zus/{year}" uvicorn main:app
+"""
+# Command line parsing / Parsowanie wiersza poleceń
+import argparse
+# Server running on its own thread / Serwer działający we własnym wątku
+import threading
+# Library for paths / Biblioteka do ścieżek
+import os
+# Random failures / Losowe błędy
+import random
+# Simulated latency / Symulowane opóźnienie
+import time
+# Standard library HTTP server / Serwer HTTP z biblioteki standardowej
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+# For type hinting / Do typowania
+from typing import Tuple
+
+# Directory with zus_<year>.html pages / Katalog ze stronami zus_<rok>.html
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Path served for a year, {year} is filled in by the backend / Ścieżka serwowana dla roku, {year} uzupełnia backend
+STUB_PATH_TEMPLATE = "/zus/{year}"
+
+
+class StubZUSServer(ThreadingHTTPServer):
+    """HTTP server with the stand-in settings / Serwer HTTP z ustawieniami zamiennika."""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: float, failure_rate: float):
+        super().__init__(address, _StubHandler)
+        self.latency = latency  # Delay before every response in seconds / Opóźnienie przed każdą odpowiedzią w sekundach
+        self.failure_rate = failure_rate  # Share of requests answered with 503 / Odsetek żądań z odpowiedzią 503
+        self.requests_served = 0  # Requests received so far / Dotychczas otrzymane żądania
+        self._lock = threading.Lock()
+
+    @property
+    def url_template(self) -> str:
+        """Value for ZUS_INFO_URL_TEMPLATE / Wartość dla ZUS_INFO_URL_TEMPLATE."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{STUB_PATH_TEMPLATE}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server._lock:
+            self.server.requests_served += 1
+        time.sleep(self.server.latency)
+        if random.random() < self.server.failure_rate:
+            self.send_error(503, "Simulated outage")
+            return
+
+        # /zus/<year>, the query string is ignored / /zus/<rok>, parametry zapytania są ignorowane
+        year = self.path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+        path = os.path.join(FIXTURES_DIR, f"zus_{year}.html")
+        if not year.isdigit() or not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean / Utrzymaj czyste wyjście benchmarku
+        pass
+
+
+def start_stub_server(latency: float = 0.0, failure_rate: float = 0.0, port: int = 0) -> StubZUSServer:
+    """
+    Starts the stand-in on a background thread (port 0 picks a free port); stop it with shutdown().
+    Uruchamia zamiennik w wątku w tle (port 0 wybiera wolny port); zatrzymaj go przez shutdown().
+    """
+    server = StubZUSServer(("127.0.0.1", port), latency, failure_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local zus.pl stand-in / Lokalny zamiennik zus.pl")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before every response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 503 (0-1)")
+    args = parser.parse_args()
+
+    server = StubZUSServer(("127.0.0.1", args.port), args.latency_ms / 1000, args.failure_rate)
+    print(f"ZUS_INFO_URL_TEMPLATE={server.url_template}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+# Library for reading and writing CSV / Biblioteka do odczytu i zapisu CSV
+import csv
+# Library for incremental text decoding / Biblioteka do przyrostowego dekodowania tekstu
+import codecs
+# In-memory text buffer for CSV output / Bufor tekstowy w pamięci dla wyjścia CSV
+import io
+# Library for JSON encoding/decoding / Biblioteka do kodowania/dekodowania JSON
+import json
+# Line break matching / Dopasowywanie końców linii
+import re
+# For type hinting / Do typowania
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Import the pure calculation engine / Import czystego silnika obliczeniowego
+from tax_engine import calculate_batch, validate_row
+# Fast JSON encoder / Szybki koder JSON
+from json_encoding import encode_json
+
+# === Streaming Bulk Calculation / Strumieniowe obliczenia masowe ===
+# Reads CSV or NDJSON rows from a byte stream, calculates them in fixed-size chunks and yields
+# the results as NDJSON or CSV. Only one chunk is held in memory at a time.
+# Odczytuje wiersze CSV lub NDJSON ze strumienia bajtów, oblicza je w porcjach o stałym rozmiarze
+# i zwraca wyniki jako NDJSON lub CSV. W pamięci jest przechowywana tylko jedna porcja naraz.
+
+# === Configuration / Konfiguracja ===
+# Supported input/output formats / Obsługiwane formaty wejścia/wyjścia
+STREAM_FORMATS = ("csv", "ndjson")
+# Media types for the response / Typy mediów dla odpowiedzi
+STREAM_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+# Number of rows calculated together / Liczba wierszy obliczanych razem
+STREAM_CHUNK_ROWS = 1000
+# Longest accepted line in characters; longer lines are reported as row errors without being kept in memory
+# Najdłuższa akceptowana linia w znakach; dłuższe linie są zgłaszane jako błędy wierszy bez trzymania ich w pamięci
+MAX_LINE_CHARS = 64 * 1024
+ERROR_LINE_TOO_LONG = f"Wiersz jest dłuższy niż {MAX_LINE_CHARS} znaków"  # Line is longer than MAX_LINE_CHARS
+
+# Output columns for CSV (nested ZUS details are omitted) / Kolumny wyjściowe dla CSV (szczegóły ZUS są pomijane)
+CSV_OUTPUT_COLUMNS = (
+    "wiersz", "rok_danych_zus", "podstawa_wymiaru_skladek_zus", "zus_spoleczne_total",
+    "skladka_zdrowotna", "podatek_pit", "vat", "calkowite_obciazenie", "dochod_netto",
+    "ostrzezenia", "blad_danych_zus", "blad",
+)
+# Separator for warnings joined into one CSV cell / Separator ostrzeżeń połączonych w jednej komórce CSV
+CSV_WARNING_SEPARATOR = " | "
+
+# CRLF, CR-only and LF line endings / Końce linii CRLF, samo CR i LF
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+# Accepted spellings of boolean values in CSV / Akceptowane zapisy wartości logicznych w CSV
+_TRUE_VALUES = ("true", "1", "tak", "yes")
+_FALSE_VALUES = ("false", "0", "nie", "no")
+
+# A parsed row: (income, costs, forma, stawka_vat, has_tax_discount, platnik_chorobowe)
+# Sparsowany wiersz: (przychód, koszty, forma, stawka_vat, has_tax_discount, platnik_chorobowe)
+ParsedRow = Tuple[float, float, str, float, bool, bool]
+
+# === Row Parsing / Parsowanie wierszy ===
+
+
+def _parse_bool(value, default: bool) -> bool:
+    """Parses a boolean from JSON or CSV / Parsuje wartość logiczną z JSON lub CSV."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Nieprawidłowa wartość logiczna: {value!r}")  # Invalid boolean value
+
+
+def _parse_float(value, default: Optional[float]) -> float:
+    """Parses a number, accepting a decimal comma / Parsuje liczbę, akceptując przecinek dziesiętny."""
+    if value is None or value == "":
+        if default is None:
+            raise ValueError("Brak wymaganej wartości liczbowej")  # Missing required numeric value
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"Nieprawidłowa liczba: {value!r}")  # Invalid number
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(str(value).strip().replace(",", "."))
+
+
+def parse_record(record: Dict) -> Tuple[Optional[ParsedRow], Optional[str]]:
+    """
+    Converts one input record into engine values, applying QuotaInput defaults.
+    Konwertuje jeden rekord wejściowy na wartości silnika, stosując domyślne wartości QuotaInput.
+
+    Returns:
+        (row, None) for a valid row or (None, error message) for an invalid one.
+        (wiersz, None) dla prawidłowego wiersza lub (None, komunikat błędu) dla nieprawidłowego.
+    """
+    try:
+        income = _parse_float(record.get("income"), None)
+        costs = _parse_float(record.get("costs"), 0.0)
+        forma = record.get("forma_opodatkowania")
+        if not isinstance(forma, str):
+            raise ValueError("Brak formy opodatkowania")  # Missing tax form
+        forma = forma.strip()
+        stawka_vat = _parse_float(record.get("stawka_vat"), 0.0)
+        has_tax_discount = _parse_bool(record.get("has_tax_discount"), False)
+        platnik_chorobowe = _parse_bool(record.get("platnik_chorobowe"), True)
+    except ValueError as e:
+        return None, str(e)
+
+    # Same validation as /oblicz / Ta sama walidacja co w /oblicz
+    error = validate_row(income, costs, forma)
+    if error is not None:
+        return None, error
+    return (income, costs, forma, stawka_vat, has_tax_discount, platnik_chorobowe), None
+
+
+class _LineSplitter:
+    """
+    Splits decoded text into lines; only newly fed text is searched, so the cost is linear in the input.
+    Dzieli zdekodowany tekst na linie; przeszukiwany jest tylko nowo podany tekst, więc koszt jest liniowy względem wejścia.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._parts: List[str] = []  # Pieces of the current line / Fragmenty bieżącej linii
+        self._length = 0
+        self._too_long = False
+        # The last text ended with CR, so a leading LF completes that CRLF
+        # Ostatni tekst kończył się CR, więc LF na początku dopełnia to CRLF
+        self._skip_lf = False
+
+    def _append(self, piece: str) -> None:
+        if self._too_long or not piece:
+            return
+        self._length += len(piece)
+        if self._length > self.max_chars:
+            self._too_long = True
+            self._parts = []
+        else:
+            self._parts.append(piece)
+
+    def _take(self) -> Optional[str]:
+        line = None if self._too_long else "".join(self._parts)
+        self._parts, self._length, self._too_long = [], 0, False
+        return line
+
+    def feed(self, text: str) -> List[Optional[str]]:
+        """Returns the lines completed by text / Zwraca linie zakończone przez text."""
+        if not text:
+            return []
+        if self._skip_lf and text[0] == "\n":
+            text = text[1:]
+        self._skip_lf = text.endswith("\r")
+        lines = []
+        start = 0
+        for match in _LINE_BREAK.finditer(text):
+            self._append(text[start:match.start()])
+            lines.append(self._take())
+            start = match.end()
+        self._append(text[start:])
+        return lines
+
+    def finish(self) -> List[Optional[str]]:
+        """Returns the unterminated last line, if any / Zwraca niezakończoną ostatnią linię, jeśli istnieje."""
+        return [self._take()] if self._parts or self._too_long else []
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_chars: int = MAX_LINE_CHARS) -> AsyncIterator[Optional[str]]:
+    """
+    Splits a byte stream into text lines (CRLF, CR or LF) without reading it all into memory.
+    A line longer than max_chars is dropped as it arrives and yielded as None.
+    Dzieli strumień bajtów na linie tekstu (CRLF, CR lub LF) bez wczytywania go w całości do pamięci.
+    Linia dłuższa niż max_chars jest odrzucana w trakcie odbioru i zwracana jako None.
+    """
+    # utf-8-sig drops a BOM written by spreadsheet tools / utf-8-sig usuwa BOM zapisywany przez arkusze kalkulacyjne
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    splitter = _LineSplitter(max_chars)
+    async for chunk in chunks:
+        for line in splitter.feed(decoder.decode(chunk)):
+            yield line
+    for line in splitter.feed(decoder.decode(b"", final=True)) + splitter.finish():
+        yield line
+
+
+def parse_csv_header(line: str) -> List[str]:
+    """Returns the column names of a CSV header line / Zwraca nazwy kolumn z linii nagłówka CSV."""
+    return [name.strip() for name in next(csv.reader([line]))]
+
+
+def decode_line(line: str, input_format: str, header: Optional[List[str]]) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Decodes one non-empty data line into (record, None), or (None, error) if it cannot be decoded.
+    Dekoduje jedną niepustą linię danych do (rekord, None) lub (None, błąd), jeśli nie da się jej zdekodować.
+    """
+    if input_format == "ndjson":
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            return None, f"Nieprawidłowy JSON: {e}"  # Invalid JSON
+        if not isinstance(record, dict):
+            return None, "Wiersz NDJSON musi być obiektem"  # NDJSON row must be an object
+        return record, None
+    # Quoted fields spanning several lines are not supported / Pola w cudzysłowach obejmujące kilka linii nie są obsługiwane
+    return dict(zip(header, next(csv.reader([line])))), None
+
+
+async def iter_records(lines: AsyncIterator[Optional[str]],
+                       input_format: str) -> AsyncIterator[Tuple[Optional[Dict], Optional[str]]]:
+    """
+    Yields (record, None) for each data line, or (None, error) if the line cannot be decoded or was too long.
+    Zwraca (rekord, None) dla każdej linii danych lub (None, błąd), jeśli linii nie da się zdekodować lub była za długa.
+    """
+    header = None
+    async for line in lines:
+        if line is None:
+            yield None, ERROR_LINE_TOO_LONG
+            continue
+        if not line.strip():
+            continue
+        if input_format == "csv" and header is None:
+            header = parse_csv_header(line)
+            continue
+        yield decode_line(line, input_format, header)
+
+# === Output Formatting / Formatowanie wyjścia ===
+
+
+def _result_record(index: int, result, position: int, zus_info) -> Dict:
+    """Builds one output record shaped like QuotaOutput / Buduje jeden rekord wyjściowy w kształcie QuotaOutput."""
+    return {
+        "wiersz": index,
+        "rok_danych_zus": zus_info.year,
+        "podstawa_wymiaru_skladek_zus": zus_info.zus_base,
+        "zus_spoleczne_details": [
+            {"nazwa": nazwa, "procent": procent, "podstawa": podstawa, "kwota": kwota}
+            for nazwa, procent, podstawa, kwota in result.zus_spoleczne_details[position]],
+        "zus_spoleczne_total": result.zus_spoleczne_total[position],
+        "skladka_zdrowotna": result.skladka_zdrowotna[position],
+        "podatek_pit": result.podatek_pit[position],
+        "vat": result.vat[position],
+        "calkowite_obciazenie": result.calkowite_obciazenie[position],
+        "dochod_netto": result.dochod_netto[position],
+        "ostrzezenia": list(result.ostrzezenia[position]),
+        "blad_danych_zus": zus_info.error_message,
+    }
+
+
+def encode_records(records: List[Dict], output_format: str) -> bytes:
+    """Encodes a chunk of output records / Koduje porcję rekordów wyjściowych."""
+    if output_format == "ndjson":
+        return b"".join(encode_json(record) + b"\n" for record in records)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for record in records:
+        if "blad" in record:
+            # Row with a validation error / Wiersz z błędem walidacji
+            writer.writerow([record["wiersz"]] + [""] * (len(CSV_OUTPUT_COLUMNS) - 2) + [record["blad"]])
+            continue
+        writer.writerow([
+            record["wiersz"], record["rok_danych_zus"], record["podstawa_wymiaru_skladek_zus"],
+            record["zus_spoleczne_total"], record["skladka_zdrowotna"], record["podatek_pit"],
+            record["vat"], record["calkowite_obciazenie"], record["dochod_netto"],
+            CSV_WARNING_SEPARATOR.join(record["ostrzezenia"]), record["blad_danych_zus"], "",
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+
+def calculate_chunk(entries: List[Tuple[int, Optional[ParsedRow], Optional[str]]], zus_info) -> List[Dict]:
+    """
+    Calculates the valid rows of a chunk at once and keeps errors inline, in input order.
+    Oblicza prawidłowe wiersze porcji naraz i zachowuje błędy w miejscu, w kolejności wejścia.
+    """
+    valid = [row for _, row, _ in entries if row is not None]
+    result = None
+    if valid:
+        columns = list(zip(*valid))
+        result = calculate_batch(
+            income=columns[0],
+            costs=columns[1],
+            forma_opodatkowania=columns[2],
+            stawka_vat=columns[3],
+            has_tax_discount=columns[4],
+            platnik_chorobowe=columns[5],
+            zus_base=zus_info.zus_base,
+            year=zus_info.year,
+        )
+
+    records = []
+    position = 0
+    for index, row, error in entries:
+        if row is None:
+            records.append({"wiersz": index, "blad": error})
+        else:
+            records.append(_result_record(index, result, position, zus_info))
+            position += 1
+    return records
+
+
+async def stream_calculation(
+    chunks: AsyncIterator[bytes],
+    input_format: str,
+    output_format: str,
+    zus_info,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """
+    Streams calculation results for a CSV/NDJSON byte stream.
+    Strumieniuje wyniki obliczeń dla strumienia bajtów CSV/NDJSON.
+
+    Args:
+        chunks: Request body chunks. / Porcje treści żądania.
+        input_format: "csv" or "ndjson". / "csv" lub "ndjson".
+        output_format: "csv" or "ndjson". / "csv" lub "ndjson".
+        zus_info: ZUSData used for every row. / ZUSData używane dla każdego wiersza.
+        chunk_rows: Rows calculated together. / Wiersze obliczane razem.
+
+    Yields:
+        Encoded output; rows keep input order and invalid rows carry a "blad" field.
+        Zakodowane wyjście; wiersze zachowują kolejność wejścia, a nieprawidłowe mają pole "blad".
+    """
+    if output_format == "csv":
+        yield (",".join(CSV_OUTPUT_COLUMNS) + "\n").encode("utf-8")
+
+    entries = []
+    index = 0
+    async for record, error in iter_records(iter_lines(chunks), input_format):
+        if record is not None:
+            row, error = parse_record(record)
+        else:
+            row = None
+        entries.append((index, row, error))
+        index += 1
+        if len(entries) >= chunk_rows:
+            yield encode_records(calculate_chunk(entries, zus_info), output_format)
+            entries = []
+    if entries:
+        yield encode_records(calculate_chunk(entries, zus_info), output_format)
@@ -0,0 +1,154 @@
+# For type hinting / Do typowania
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Calculation engine / Silnik obliczeniowy
+from tax_engine import calculate_batch, linear_segment, net_income_model, zus_spoleczne_for_year
+# Compiled rules / Skompilowane reguły
+from tax_rules import income_breakpoints, rule_packs_for_year
+
+# === Tax Form Comparison / Porównanie form opodatkowania ===
+# Evaluates several tax forms over an income/costs grid in one engine call, and finds the incomes
+# where two forms give the same net income. Net income is piecewise linear in income, so break-even
+# points are solved exactly on each linear segment instead of by sampling.
+# Oblicza kilka form opodatkowania na siatce przychodów/kosztów w jednym wywołaniu silnika i znajduje
+# przychody, przy których dwie formy dają ten sam dochód netto. Dochód netto jest odcinkowo liniowy
+# względem przychodu, więc progi opłacalności są rozwiązywane dokładnie na każdym odcinku liniowym.
+
+# Tolerance for treating a difference as zero / Tolerancja traktowania różnicy jako zera
+_EPSILON = 1e-9
+
+
+class GridPoint(NamedTuple):
+    """Comparison of all forms at one (income, costs) / Porównanie wszystkich form dla jednej pary (przychód, koszty)."""
+    income: float  # Monthly income / Przychód miesięczny
+    costs: float  # Monthly costs / Koszty miesięczne
+    dochod_netto: Dict[str, float]  # Net income per form / Dochód netto dla każdej formy
+    calkowite_obciazenie: Dict[str, float]  # Total burden per form / Całkowite obciążenie dla każdej formy
+    najkorzystniejsza: str  # Form with the highest net income / Forma z najwyższym dochodem netto
+
+
+class BreakEvenPoint(NamedTuple):
+    """Income where two forms give the same net income / Przychód, przy którym dwie formy dają ten sam dochód netto."""
+    costs: float  # Monthly costs / Koszty miesięczne
+    forma_a: str
+    forma_b: str
+    income: float  # Break-even income / Przychód progu opłacalności
+    # True if the forms swap through a jump (skala threshold) rather than a crossing
+    # True, jeśli formy zamieniają się przez skok (próg skali), a nie przez przecięcie
+    skok: bool
+    korzystniejsza_powyzej: str  # Better form just above the income / Korzystniejsza forma tuż powyżej przychodu
+    # True if the overall cheapest form changes here / True, jeśli zmienia się tu najkorzystniejsza forma ogółem
+    zmiana_najkorzystniejszej: bool
+
+
+def compare_grid(
+    incomes: Sequence[float],
+    costs_values: Sequence[float],
+    formy: Sequence[str],
+    has_tax_discount: bool,
+    platnik_chorobowe: bool,
+    zus_base: Optional[float],
+    year: int,
+) -> List[GridPoint]:
+    """
+    Calculates every form at every (income, costs) point with a single batch call.
+    Oblicza każdą formę w każdym punkcie (przychód, koszty) jednym wywołaniem wsadowym.
+    """
+    points = [(income, costs) for costs in costs_values for income in incomes]
+    size = len(points) * len(formy)
+    result = calculate_batch(
+        income=[income for income, _ in points for _ in formy],
+        costs=[costs for _, costs in points for _ in formy],
+        forma_opodatkowania=list(formy) * len(points),
+        stawka_vat=[0.0] * size,
+        has_tax_discount=[has_tax_discount] * size,
+        platnik_chorobowe=[platnik_chorobowe] * size,
+        zus_base=zus_base,
+        year=year,
+    )
+
+    grid = []
+    for point_index, (income, costs) in enumerate(points):
+        offset = point_index * len(formy)
+        net = {forma: result.dochod_netto[offset + i] for i, forma in enumerate(formy)}
+        burden = {forma: result.calkowite_obciazenie[offset + i] for i, forma in enumerate(formy)}
+        grid.append(GridPoint(income=income, costs=costs, dochod_netto=net, calkowite_obciazenie=burden,
+                              najkorzystniejsza=max(formy, key=lambda forma: net[forma])))
+    return grid
+
+
+def _sign(value: float) -> int:
+    if value > _EPSILON:
+        return 1
+    if value < -_EPSILON:
+        return -1
+    return 0
+
+
+def break_even_incomes(
+    formy: Sequence[str],
+    costs: float,
+    has_tax_discount: bool,
+    platnik_chorobowe: bool,
+    zus_base: Optional[float],
+    year: int,
+) -> List[BreakEvenPoint]:
+    """
+    Solves, for every pair of forms, the incomes where their net incomes are equal.
+    The net income model is not rounded to grosze, so amounts at the returned income may differ by 0.01 PLN.
+
+    Rozwiązuje dla każdej pary form przychody, przy których ich dochody netto są równe.
+    Model dochodu netto nie jest zaokrąglany do groszy, więc kwoty przy zwróconym przychodzie mogą różnić się o 0,01 PLN.
+    """
+    packs = rule_packs_for_year(year)
+    zus_total = zus_spoleczne_for_year(zus_base, platnik_chorobowe, year).total
+
+    def net(forma: str, income: float) -> float:
+        return net_income_model(packs[forma], income, costs, zus_total, has_tax_discount)
+
+    def best_form(income: float) -> str:
+        return max(formy, key=lambda forma: net(forma, income))
+
+    points = []
+    for index_a, forma_a in enumerate(formy):
+        for forma_b in formy[index_a + 1:]:
+            def difference(income: float, forma_a=forma_a, forma_b=forma_b) -> float:
+                return net(forma_a, income) - net(forma_b, income)
+
+            # Linear segments of the difference, starting at zero income / Odcinki liniowe różnicy, od przychodu zerowego
+            breakpoints = sorted({0.0} | {point for forma in (forma_a, forma_b)
+                                          for point in income_breakpoints(packs[forma], costs, zus_total)
+                                          if point > 0.0})
+            segments = [(start, breakpoints[i + 1] if i + 1 < len(breakpoints) else None)
+                        for i, start in enumerate(breakpoints)]
+            lines = [linear_segment(difference, start, end) for start, end in segments]
+
+            crossings = []
+            for (start, end), (slope, intercept) in zip(segments, lines):
+                # Crossing strictly inside the segment / Przecięcie ściśle wewnątrz odcinka
+                if _sign(slope) != 0:
+                    root = -intercept / slope
+                    if root > start + _EPSILON and (end is None or root < end - _EPSILON):
+                        crossings.append((root, False, slope > 0))
+            for i in range(1, len(segments)):
+                # Crossing or jump exactly at a breakpoint / Przecięcie lub skok dokładnie w punkcie załamania
+                point = segments[i][0]
+                left = lines[i - 1][0] * point + lines[i - 1][1]
+                right = lines[i][0] * point + lines[i][1]
+                if _sign(left) != _sign(right) and (_sign(left) != 0 or _sign(right) != 0):
+                    above = right if _sign(right) != 0 else lines[i][0]
+                    crossings.append((point, abs(left - right) > _EPSILON, above > 0))
+
+            for income, jump, a_better_above in sorted(crossings):
+                before = best_form(max(0.0, income - 0.01))
+                after = best_form(income + 0.01)
+                points.append(BreakEvenPoint(
+                    costs=costs,
+                    forma_a=forma_a,
+                    forma_b=forma_b,
+                    income=round(income, 2),
+                    skok=jump,
+                    korzystniejsza_powyzej=forma_a if a_better_above else forma_b,
+                    zmiana_najkorzystniejszej=before != after and {before, after} == {forma_a, forma_b},
+                ))
+    return sorted(points, key=lambda point: (point.income, point.forma_a, point.forma_b))
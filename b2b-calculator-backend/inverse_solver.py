@@ -0,0 +1,167 @@
+# Rounding up to grosze / Zaokrąglanie w górę do groszy
+import math
+# For type hinting / Do typowania
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Calculation engine / Silnik obliczeniowy
+from tax_engine import calculate_batch, linear_segment, net_income_model, zus_spoleczne_for_year
+# Compiled rules / Skompilowane reguły
+from tax_rules import income_breakpoints, rule_packs_for_year
+
+# === Inverse Solver / Solwer odwrotny ===
+# Finds the monthly income that gives a target net income under one tax form. Net income is piecewise
+# linear in income (social ZUS is fixed by the ZUS base, health and PIT change slope at the pack's
+# breakpoints and the skala PIT jumps at the bracket threshold), so each target is solved exactly on
+# the first linear segment that reaches it, then checked against calculate_batch to the grosz.
+# Znajduje miesięczny przychód, który daje docelowy dochód netto w jednej formie opodatkowania. Dochód
+# netto jest odcinkowo liniowy względem przychodu (ZUS społeczny jest stały dla podstawy ZUS, zdrowotna
+# i PIT zmieniają nachylenie w punktach załamania pakietu, a PIT skali skacze na progu), więc każdy cel
+# jest rozwiązywany dokładnie na pierwszym odcinku liniowym, który go osiąga, a następnie sprawdzany
+# przez calculate_batch co do grosza.
+
+# Tolerance for treating a difference as zero / Tolerancja traktowania różnicy jako zera
+_EPSILON = 1e-9
+# Grosze checked on each side of the exact root / Liczba groszy sprawdzanych po każdej stronie dokładnego pierwiastka
+GROSZ_WINDOW = 5
+# Wider window for targets the first one did not resolve / Szersze okno dla celów, których nie rozstrzygnęło pierwsze
+RETRY_GROSZ_WINDOW = 100
+
+
+class InverseResult(NamedTuple):
+    """Solved incomes in target order / Rozwiązane przychody w kolejności celów."""
+    # Lowest income with at least the target net income, None if unreachable or not confirmed by calculate_batch
+    # Najniższy przychód z co najmniej docelowym dochodem netto, None jeśli nieosiągalny lub niepotwierdzony
+    # przez calculate_batch
+    income: List[Optional[float]]
+    # Net income calculate_batch gives at that income / Dochód netto, jaki daje calculate_batch przy tym przychodzie
+    dochod_netto: List[Optional[float]]
+
+
+def _net_segments(forma: str, costs: float, zus_total: float, has_tax_discount: bool,
+                  year: int) -> List[Tuple[float, Optional[float], float, float]]:
+    """
+    Returns (start, end, slope, intercept) of each linear piece of the net income, from zero income.
+    Zwraca (początek, koniec, nachylenie, wyraz wolny) każdego liniowego odcinka dochodu netto, od przychodu zerowego.
+    """
+    rules = rule_packs_for_year(year)[forma]
+
+    def net(income: float) -> float:
+        return net_income_model(rules, income, costs, zus_total, has_tax_discount)
+
+    breakpoints = sorted({0.0} | {point for point in income_breakpoints(rules, costs, zus_total) if point > 0.0})
+    segments = []
+    for i, start in enumerate(breakpoints):
+        end = breakpoints[i + 1] if i + 1 < len(breakpoints) else None
+        slope, intercept = linear_segment(net, start, end)
+        segments.append((start, end, slope, intercept))
+    return segments
+
+
+def _solve_model(segments: List[Tuple[float, Optional[float], float, float]], target: float) -> Optional[float]:
+    """
+    Lowest income whose modelled net income reaches the target. A segment's start value comes from its own line,
+    so a downward jump (skala threshold) is handled by moving on to the next segment.
+    Najniższy przychód, którego modelowany dochód netto osiąga cel. Wartość na początku odcinka pochodzi z jego
+    własnej prostej, więc skok w dół (próg skali) jest obsługiwany przejściem do kolejnego odcinka.
+    """
+    for start, end, slope, intercept in segments:
+        if slope * start + intercept >= target - _EPSILON:
+            return start
+        if slope > _EPSILON:
+            root = (target - intercept) / slope
+            if end is None or root < end:
+                return root
+    return None
+
+
+def _check_candidates(
+    targets: Sequence[float],
+    roots: Sequence[float],
+    window: int,
+    costs: float,
+    forma_opodatkowania: str,
+    has_tax_discount: bool,
+    platnik_chorobowe: bool,
+    zus_base: Optional[float],
+    year: int,
+) -> List[Tuple[Optional[float], Optional[float]]]:
+    """
+    Returns (income, net income) of the lowest grosz amount within window of each root that reaches its target,
+    or (None, None) if none does.
+    Zwraca (przychód, dochód netto) najniższej kwoty w groszach w odległości window od każdego pierwiastka, która
+    osiąga swój cel, lub (None, None), jeśli żadna nie osiąga.
+    """
+    # The engine rounds each amount to grosze, which moves the net income by at most ~0.02 PLN, while every
+    # segment's slope is well above 0.5; grosz amounts around each root therefore normally contain the answer.
+    # Silnik zaokrągla każdą kwotę do groszy, co przesuwa dochód netto najwyżej o ~0,02 PLN, a nachylenie każdego
+    # odcinka jest znacznie większe niż 0,5; kwoty w groszach wokół każdego pierwiastka zwykle zawierają więc odpowiedź.
+    candidates: List[List[float]] = []
+    for root in roots:
+        # round() keeps float noise from moving an exact grosz amount / round() chroni dokładną kwotę w groszach przed szumem liczb
+        center = math.ceil(round(root * 100, 6))
+        candidates.append(sorted({max(0, center + step) / 100 for step in range(-window, window + 1)}))
+    flat = [income for incomes in candidates for income in incomes]
+    result = calculate_batch(
+        income=flat,
+        costs=[costs] * len(flat),
+        forma_opodatkowania=[forma_opodatkowania] * len(flat),
+        stawka_vat=[0.0] * len(flat),
+        has_tax_discount=[has_tax_discount] * len(flat),
+        platnik_chorobowe=[platnik_chorobowe] * len(flat),
+        zus_base=zus_base,
+        year=year,
+    )
+
+    chosen = []
+    offset = 0
+    for target, options in zip(targets, candidates):
+        nets = result.dochod_netto[offset:offset + len(options)]
+        chosen.append(next(((income, net) for income, net in zip(options, nets) if net >= target - _EPSILON),
+                           (None, None)))
+        offset += len(options)
+    return chosen
+
+
+def solve_incomes(
+    targets: Sequence[float],
+    costs: float,
+    forma_opodatkowania: str,
+    has_tax_discount: bool,
+    platnik_chorobowe: bool,
+    zus_base: Optional[float],
+    year: int,
+) -> InverseResult:
+    """
+    Solves the income for every target net income. Costs and the form must already be validated with validate_row.
+    Rozwiązuje przychód dla każdego docelowego dochodu netto. Koszty i forma muszą być wcześniej zwalidowane przez validate_row.
+
+    Returns:
+        InverseResult; each income is the lowest amount in grosze whose net income from calculate_batch
+        is at least the target.
+        InverseResult; każdy przychód jest najniższą kwotą w groszach, której dochód netto z calculate_batch
+        wynosi co najmniej tyle, co cel.
+    """
+    zus_total = zus_spoleczne_for_year(zus_base, platnik_chorobowe, year).total
+    segments = _net_segments(forma_opodatkowania, costs, zus_total, has_tax_discount, year)
+
+    roots = [_solve_model(segments, target) for target in targets]
+    incomes: List[Optional[float]] = [None] * len(targets)
+    nets: List[Optional[float]] = [None] * len(targets)
+    # Targets still to check: every solvable one / Cele do sprawdzenia: każdy rozwiązywalny
+    pending = [index for index, root in enumerate(roots) if root is not None]
+    for window in (GROSZ_WINDOW, RETRY_GROSZ_WINDOW):
+        if not pending:
+            break
+        unresolved = []
+        for index, (income, net) in zip(pending, _check_candidates(
+                [targets[index] for index in pending], [roots[index] for index in pending], window,
+                costs, forma_opodatkowania, has_tax_discount, platnik_chorobowe, zus_base, year)):
+            if income is None:
+                unresolved.append(index)
+            else:
+                incomes[index], nets[index] = income, net
+        pending = unresolved
+    # Targets no grosz amount near the root reaches stay None rather than returning an income below the target
+    # Cele, których nie osiąga żadna kwota w groszach w pobliżu pierwiastka, pozostają None zamiast zwracać
+    # przychód poniżej celu
+    return InverseResult(income=incomes, dochod_netto=nets)
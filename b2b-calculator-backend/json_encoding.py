@@ -0,0 +1,43 @@
+# Library for JSON encoding / Biblioteka do kodowania JSON
+import json
+# Finite float check / Sprawdzanie skończoności liczb
+import math
+# For type hinting / Do typowania
+from typing import Any
+
+# Fast encoder, used when installed / Szybki koder, używany jeśli jest zainstalowany
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# === JSON Encoding / Kodowanie JSON ===
+# Encodes plain dicts/lists straight to response bytes, without building and re-validating Pydantic models.
+# Output matches Starlette's JSONResponse: UTF-8, no ASCII escaping, no whitespace. NaN and infinities become null,
+# as orjson writes them, with or without orjson installed.
+# Koduje zwykłe słowniki/listy bezpośrednio do bajtów odpowiedzi, bez budowania i ponownej walidacji modeli Pydantic.
+# Wynik odpowiada JSONResponse ze Starlette: UTF-8, bez escapowania ASCII, bez białych znaków. NaN i nieskończoności
+# stają się null, tak jak zapisuje je orjson, niezależnie od tego, czy orjson jest zainstalowany.
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _replace_non_finite(value: Any) -> Any:
+    """Replaces NaN and infinities with None, like orjson / Zastępuje NaN i nieskończoności przez None, jak orjson."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    return value
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    Encodes a value of dicts, lists, strings, numbers, booleans and None as compact JSON bytes.
+    Koduje wartość ze słowników, list, napisów, liczb, wartości logicznych i None jako zwarty JSON w bajtach.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(_replace_non_finite(value), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,142 @@
+# For type hinting / Do typowania
+from typing import Any, Dict, Iterable, Mapping, Optional, Set
+
+# Calculation steps shared with the batch engine / Kroki obliczeń wspólne z silnikiem wsadowym
+from tax_engine import compute_health, compute_pit, zus_spoleczne_for_year
+# Compiled rules / Skompilowane reguły
+from tax_rules import rule_packs_for_year
+
+# === Live Recalculation Session / Sesja przeliczania na żywo ===
+# Keeps the inputs and intermediate results of one interactive user. An input change recomputes only the
+# stages that depend on it, and only output fields whose value changed are returned. Amounts are the same
+# as calculate_batch gives for the full input.
+# Przechowuje dane wejściowe i wyniki pośrednie jednego interaktywnego użytkownika. Zmiana wejścia przelicza
+# tylko zależne od niej etapy i zwracane są tylko pola wyjściowe, których wartość się zmieniła. Kwoty są takie
+# same, jak zwraca calculate_batch dla pełnego wejścia.
+
+# Stages directly affected by each input field / Etapy bezpośrednio zależne od każdego pola wejściowego
+INPUT_STAGES = {
+    "income": ("health", "pit", "vat", "totals"),
+    "costs": ("health", "pit", "totals"),
+    "forma_opodatkowania": ("rules",),
+    "stawka_vat": ("vat",),
+    "has_tax_discount": ("pit", "warnings"),
+    "platnik_chorobowe": ("zus",),
+}
+# Stages to recompute after each stage / Etapy do przeliczenia po każdym etapie
+_STAGE_DEPENDENTS = {
+    "zus_data": ("rules", "zus", "warnings"),
+    "rules": ("health", "pit", "warnings"),
+    "zus": ("health", "pit", "totals"),
+    "health": ("totals",),
+    "pit": ("totals",),
+    "vat": (),
+    "warnings": (),
+    "totals": (),
+}
+# Calculation order / Kolejność obliczeń
+_STAGE_ORDER = ("zus_data", "rules", "zus", "health", "pit", "vat", "warnings", "totals")
+
+
+def _expand(stages: Iterable[str]) -> Set[str]:
+    """Adds every stage depending on the given ones / Dodaje każdy etap zależny od podanych."""
+    pending = list(stages)
+    expanded = set()
+    while pending:
+        stage = pending.pop()
+        if stage not in expanded:
+            expanded.add(stage)
+            pending.extend(_STAGE_DEPENDENTS[stage])
+    return expanded
+
+
+class LiveSession:
+    """
+    State of one live recalculation. Inputs must already be validated with validate_row.
+    Stan jednego przeliczania na żywo. Dane muszą być wcześniej zwalidowane przez validate_row.
+    """
+
+    def __init__(self):
+        self.inputs: Dict[str, Any] = {}  # Current QuotaInput values / Bieżące wartości QuotaInput
+        self.zus_version: Optional[str] = None  # ZUS data version in use / Używana wersja danych ZUS
+        self._zus_base: Optional[float] = None
+        self._year = 0
+        # Output fields taken from the ZUS data / Pola wyjściowe pochodzące z danych ZUS
+        self._zus_fields: Dict[str, Any] = {}
+        self._rules = None
+        self._zus = None
+        self._health = 0.0
+        self._pit = 0.0
+        # Last values sent to the client / Ostatnie wartości wysłane do klienta
+        self.output: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+
+    def set_zus_data(self, version: str, year: int, zus_base: Optional[float], error_message: Optional[str]) -> None:
+        """
+        Switches to other ZUS data; everything depending on it is recomputed.
+        Przełącza na inne dane ZUS; wszystko, co od nich zależy, jest przeliczane.
+        """
+        if version == self.zus_version:
+            return
+        self.zus_version = version
+        self._year = year
+        self._zus_base = zus_base
+        self._zus_fields = {"rok_danych_zus": year, "podstawa_wymiaru_skladek_zus": zus_base,
+                            "blad_danych_zus": error_message}
+        self._dirty.add("zus_data")
+
+    def update(self, changes: Mapping[str, Any]) -> None:
+        """
+        Applies new input values; only fields whose value differs mark stages for recalculation.
+        Stosuje nowe wartości wejściowe; tylko pola o innej wartości oznaczają etapy do przeliczenia.
+        """
+        for field, value in changes.items():
+            if field not in INPUT_STAGES:
+                continue
+            if field not in self.inputs or self.inputs[field] != value:
+                self.inputs[field] = value
+                self._dirty.update(INPUT_STAGES[field])
+
+    def recalculate(self) -> Dict[str, Any]:
+        """
+        Recomputes the marked stages and returns the QuotaOutput fields that changed since the last call.
+        Przelicza oznaczone etapy i zwraca pola QuotaOutput, które zmieniły się od ostatniego wywołania.
+        """
+        stages = _expand(self._dirty)
+        self._dirty = set()
+        inputs = self.inputs
+        fields: Dict[str, Any] = {}
+        for stage in _STAGE_ORDER:
+            if stage not in stages:
+                continue
+            if stage == "zus_data":
+                fields.update(self._zus_fields)
+            elif stage == "rules":
+                self._rules = rule_packs_for_year(self._year)[inputs["forma_opodatkowania"]]
+            elif stage == "zus":
+                self._zus = zus_spoleczne_for_year(self._zus_base, bool(inputs["platnik_chorobowe"]), self._year)
+                fields["zus_spoleczne_details"] = [
+                    {"nazwa": nazwa, "procent": procent, "podstawa": podstawa, "kwota": kwota}
+                    for nazwa, procent, podstawa, kwota in self._zus.details]
+                fields["zus_spoleczne_total"] = self._zus.total
+            elif stage == "health":
+                self._health = compute_health(self._rules, inputs["income"], inputs["costs"], self._zus.total)
+                fields["skladka_zdrowotna"] = self._health
+            elif stage == "pit":
+                self._pit = compute_pit(self._rules, inputs["income"], inputs["costs"], self._zus.total,
+                                        bool(inputs["has_tax_discount"]))
+                fields["podatek_pit"] = self._pit
+            elif stage == "vat":
+                fields["vat"] = round(inputs["income"] * (inputs["stawka_vat"] / 100), 2)
+            elif stage == "warnings":
+                fields["ostrzezenia"] = list(
+                    self._rules.warnings[(self._zus_base is None, bool(inputs["has_tax_discount"]))])
+            elif stage == "totals":
+                total = round(self._zus.total + self._health + self._pit, 2)
+                fields["calkowite_obciazenie"] = total
+                fields["dochod_netto"] = round(inputs["income"] - inputs["costs"] - total, 2)
+
+        changed = {field: value for field, value in fields.items()
+                   if field not in self.output or self.output[field] != value}
+        self.output.update(changed)
+        return changed
@@ -1,21 +1,75 @@
 # FastAPI framework for building APIs / FastAPI framework do tworzenia API
 # Import List for type hinting / Import List do typowania
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List, Tuple, Union
+# Library for hashing ETags / Biblioteka do haszowania ETagów
+import hashlib
+# Constant-time comparison of the admin token / Porównanie tokenu administratora w stałym czasie
+import hmac
+# Library for decoding WebSocket messages / Biblioteka do dekodowania wiadomości WebSocket
+import json
+# Library for environment variables / Biblioteka do zmiennych środowiskowych
+import os
+# Rounding Retry-After up to whole seconds / Zaokrąglanie Retry-After w górę do pełnych sekund
+import math
+# Used to keep the upload stream the only reader of the request / Używane, aby strumień przesyłania był jedynym czytelnikiem żądania
+import asyncio
+# Decorator for the application lifespan / Dekorator dla cyklu życia aplikacji
+from contextlib import asynccontextmanager
 # Import necessary FastAPI components / Import potrzebnych komponentów FastAPI
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response, WebSocket, WebSocketDisconnect
+# StreamingResponse sends the body in parts / StreamingResponse wysyła treść w częściach
+from fastapi.responses import StreamingResponse
 # BaseModel is used to define request schemas / BaseModel jest używany do definiowania schematów żądań
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 # Import CORSMiddleware for handling Cross-Origin Resource Sharing / Import CORSMiddleware do obsługi Cross-Origin Resource Sharing
 from fastapi.middleware.cors import CORSMiddleware
 
 # === Component Import / Import komponentów ===
 # Import functions and models from the ZUS data fetching module / Import funkcji i modeli z modułu pobierania danych ZUS
-from zus_data_fetcher import fetch_and_cache_zus_data, ZUSData
+from zus_data_fetcher import (
+    add_zus_data_listener, fetch_and_cache_zus_data_async, force_refresh_zus_data, is_supported_year,
+    warm_up_zus_data, zus_data_version, ZUSData, ZUS_INFO_YEAR, ZUS_YEARS_AHEAD, ZUS_YEARS_BACK)
+# Import the pure calculation engine / Import czystego silnika obliczeniowego
+from tax_engine import BatchResult, calculate_batch, validate_row
+# Supported tax forms / Obsługiwane formy opodatkowania
+from tax_rules import FORMY_OPODATKOWANIA, WARNING_CODES_BY_MESSAGE, WARNING_MESSAGES, resolve_rules_year
+# Import streaming CSV/NDJSON processing / Import strumieniowego przetwarzania CSV/NDJSON
+from bulk_stream import STREAM_FORMATS, STREAM_MEDIA_TYPES, stream_calculation
+# Import the annual simulation / Import symulacji rocznej
+from annual_simulation import MONTHS_IN_YEAR, simulate_year
+# Import the tax form comparison / Import porównania form opodatkowania
+from form_comparison import break_even_incomes, compare_grid
+# Import the inverse solver / Import solwera odwrotnego
+from inverse_solver import solve_incomes
+# Import the bounded result cache / Import ograniczonej pamięci podręcznej wyników
+from result_cache import ResultCache
+# Import the precomputed result table / Import wcześniej obliczonej tablicy wyników
+from result_table import ResultTableManager
+# Import the live recalculation session / Import sesji przeliczania na żywo
+from live_session import LiveSession
+# Import the fast JSON encoder / Import szybkiego kodera JSON
+from json_encoding import JSON_MEDIA_TYPE, encode_json
+# Import metrics and structured logging / Import metryk i logowania strukturalnego
+from metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, STAGE_DURATION, RequestMetricsMiddleware
+from structured_logging import configure_logging
 # === End of Import / Koniec importu ===
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads persisted ZUS data before serving, so requests don't pay for the scrape.
+    Ładuje zapisane dane ZUS przed obsługą żądań, aby żądania nie płaciły za pobieranie.
+    """
+    await warm_up_zus_data()
+    yield
+
+# JSON logs to stderr; LOG_LEVEL=DEBUG also logs ZUS cache hits / Logi JSON na stderr; LOG_LEVEL=DEBUG loguje też trafienia pamięci ZUS
+configure_logging(os.environ.get("LOG_LEVEL"))
+
 # Create FastAPI app / Stworzenie aplikacji FastAPI
 # Set API title / Ustawienie tytułu API
-app = FastAPI(title="Kalkulator składek B2B (Polska)")
+app = FastAPI(title="Kalkulator składek B2B (Polska)", lifespan=lifespan)
 
 # === CORS Configuration / Konfiguracja CORS ===
 # List of origins allowed to make requests / Lista źródeł (origins), którym zezwolono na wysyłanie żądań
@@ -39,6 +93,9 @@ app.add_middleware(
 )
 # === End of CORS Configuration / Koniec konfiguracji CORS ===
 
+# Request duration histogram, outermost so it sees every request / Histogram czasu żądań, najbardziej zewnętrzny, aby widział każde żądanie
+app.add_middleware(RequestMetricsMiddleware)
+
 # === API Data Models / Modele danych dla API ===
 
 
@@ -87,6 +144,200 @@ class QuotaOutput(BaseModel):
     # Error message if fetching ZUS data failed / Komunikat błędu, jeśli pobieranie danych ZUS nie powiodło się
     blad_danych_zus: Optional[str] = None
 
+
+class QuotaCompactOutput(BaseModel):
+    """
+    Response of /oblicz with ?kompaktowy=true: warning codes instead of texts, ZUS details only with ?szczegoly=true.
+    Odpowiedź /oblicz z ?kompaktowy=true: kody ostrzeżeń zamiast treści, szczegóły ZUS tylko z ?szczegoly=true.
+    """
+    rok_danych_zus: int  # Year of the ZUS data used / Rok danych ZUS użytych do obliczeń
+    podstawa_wymiaru_skladek_zus: Optional[float]  # ZUS contribution base / Podstawa wymiaru składek ZUS
+    # Only with ?szczegoly=true / Tylko z ?szczegoly=true
+    zus_spoleczne_details: Optional[List[SkladkaDetail]] = None
+    zus_spoleczne_total: float  # Total social ZUS / Suma ZUS społecznego
+    skladka_zdrowotna: float  # Health contribution / Składka zdrowotna
+    podatek_pit: float  # Income tax (PIT) / Podatek dochodowy (PIT)
+    vat: float  # VAT amount / Kwota VAT
+    calkowite_obciazenie: float  # Total burden / Całkowite obciążenie
+    dochod_netto: float  # Net income / Dochód netto
+    # Warning codes (keys of tax_rules.WARNING_MESSAGES) / Kody ostrzeżeń (klucze tax_rules.WARNING_MESSAGES)
+    ostrzezenia: List[Literal[tuple(WARNING_MESSAGES)]] = []
+    # Error message if fetching ZUS data failed / Komunikat błędu, jeśli pobieranie danych ZUS nie powiodło się
+    blad_danych_zus: Optional[str] = None
+
+
+class QuotaBatchInput(BaseModel):
+    """Column-oriented request schema for batch calculations / Kolumnowy schemat żądania dla obliczeń wsadowych."""
+    income: List[float]  # Monthly incomes in PLN / Miesięczne przychody w PLN
+    # Monthly costs, defaults to 0 for every row / Miesięczne koszty, domyślnie 0 dla każdego wiersza
+    costs: Optional[List[float]] = None
+    forma_opodatkowania: List[str]  # Tax forms / Formy opodatkowania
+    # VAT rates, defaults to 0 for every row / Stawki VAT, domyślnie 0 dla każdego wiersza
+    stawka_vat: Optional[List[float]] = None
+    # PIT discount flags, defaults to False / Flagi ulgi PIT, domyślnie False
+    has_tax_discount: Optional[List[bool]] = None
+    # Voluntary sickness contribution flags, defaults to True / Flagi dobrowolnej składki chorobowej, domyślnie True
+    platnik_chorobowe: Optional[List[bool]] = None
+
+
+class QuotaBatchOutput(BaseModel):
+    """Column-oriented response for batch calculations / Kolumnowa odpowiedź dla obliczeń wsadowych."""
+    rok_danych_zus: int  # Year of the ZUS data used / Rok danych ZUS użytych do obliczeń
+    # ZUS contribution base shared by all rows / Podstawa wymiaru składek ZUS wspólna dla wszystkich wierszy
+    podstawa_wymiaru_skladek_zus: Optional[float]
+    # Each column below has one entry per input row, in input order
+    # Każda kolumna poniżej ma jeden wpis na wiersz wejściowy, w kolejności wejścia
+    zus_spoleczne_details: List[List[SkladkaDetail]]
+    zus_spoleczne_total: List[float]
+    skladka_zdrowotna: List[float]
+    podatek_pit: List[float]
+    vat: List[float]
+    calkowite_obciazenie: List[float]
+    dochod_netto: List[float]
+    ostrzezenia: List[List[str]]
+    # Error message if fetching ZUS data failed / Komunikat błędu, jeśli pobieranie danych ZUS nie powiodło się
+    blad_danych_zus: Optional[str] = None
+
+
+class MonthInput(BaseModel):
+    """Income and costs of one month / Przychód i koszty jednego miesiąca."""
+    income: float  # Monthly income in PLN / Miesięczny przychód w PLN
+    costs: float = 0.0  # Monthly costs (KUP) / Miesięczne koszty uzyskania przychodu (KUP)
+
+
+class MonthOutput(BaseModel):
+    """Result of one simulated month / Wynik jednego symulowanego miesiąca."""
+    miesiac: int  # Month number (1-12) / Numer miesiąca (1-12)
+    income: float  # Monthly income / Przychód miesięczny
+    costs: float  # Monthly costs / Koszty miesięczne
+    zus_spoleczne_total: float  # Total social ZUS / Suma ZUS społecznego
+    skladka_zdrowotna: float  # Health contribution / Składka zdrowotna
+    podatek_pit: float  # PIT advance for the month / Zaliczka PIT za miesiąc
+    vat: float  # VAT amount / Kwota VAT
+    calkowite_obciazenie: float  # Total burden / Całkowite obciążenie
+    dochod_netto: float  # Net income / Dochód netto
+    dochod_narastajaco: float  # Income since January / Dochód od stycznia
+    podatek_pit_narastajaco: float  # PIT paid since January / PIT zapłacony od stycznia
+    prog_podatkowy: int  # Tax bracket reached / Osiągnięty próg podatkowy
+
+
+class AnnualOutput(BaseModel):
+    """Response for the annual simulation / Odpowiedź symulacji rocznej."""
+    rok_danych_zus: int  # Year of the ZUS data used / Rok danych ZUS użytych do obliczeń
+    # Server-side reference to this result, sent back as poprzedni_scenariusz to recalculate only changed months
+    # Odwołanie do tego wyniku po stronie serwera, odsyłane jako poprzedni_scenariusz, aby przeliczyć tylko zmienione miesiące
+    id_scenariusza: str
+    # Version of the ZUS data and year of the tax rules the result was calculated with
+    # Wersja danych ZUS i rok reguł podatkowych, z którymi obliczono wynik
+    wersja_danych_zus: str
+    rok_regul: int
+    podstawa_wymiaru_skladek_zus: Optional[float]  # ZUS contribution base / Podstawa wymiaru składek ZUS
+    # Parameters the result was calculated with / Parametry, z którymi obliczono wynik
+    forma_opodatkowania: str
+    stawka_vat: float
+    has_tax_discount: bool
+    platnik_chorobowe: bool
+    # Monthly social ZUS components / Miesięczne składowe ZUS społecznego
+    zus_spoleczne_details: List[SkladkaDetail]
+    miesiace: List[MonthOutput]  # Monthly results / Wyniki miesięczne
+    # First month that was recalculated (number of months + 1 if none); earlier months were reused from poprzedni_scenariusz
+    # Pierwszy przeliczony miesiąc (liczba miesięcy + 1, jeśli żaden); wcześniejsze miesiące użyto ponownie z poprzedni_scenariusz
+    przeliczone_od: int
+    # Months (1-12) whose result differs from poprzedni_scenariusz (all without it) / Miesiące (1-12), których wynik różni się od poprzedni_scenariusz (wszystkie bez niego)
+    przeliczone_miesiace: List[int]
+    # Year totals / Sumy roczne
+    suma_przychodow: float
+    suma_zus_spoleczne: float
+    suma_skladka_zdrowotna: float
+    suma_podatek_pit: float
+    suma_vat: float
+    suma_obciazenie: float
+    suma_dochod_netto: float
+    ostrzezenia: List[str] = []  # List of warnings / Lista ostrzeżeń
+    # Error message if fetching ZUS data failed / Komunikat błędu, jeśli pobieranie danych ZUS nie powiodło się
+    blad_danych_zus: Optional[str] = None
+
+
+class AnnualInput(BaseModel):
+    """Request schema for the annual simulation / Schemat żądania symulacji rocznej."""
+    miesiace: List[MonthInput]  # Months from January (1-12 entries) / Miesiące od stycznia (1-12 wpisów)
+    forma_opodatkowania: str  # Tax form / Forma opodatkowania
+    stawka_vat: float = 0.0  # VAT rate / Stawka VAT
+    has_tax_discount: bool = False  # Whether user has PIT discount / Czy użytkownik ma ulgę podatkową PIT
+    # Whether user pays voluntary sickness contribution / Czy użytkownik opłaca dobrowolną składkę chorobową
+    platnik_chorobowe: bool = True
+    # id_scenariusza of an earlier result; months before the first changed one are reused from it
+    # id_scenariusza wcześniejszego wyniku; miesiące przed pierwszym zmienionym są z niego używane ponownie
+    poprzedni_scenariusz: Optional[str] = None
+
+
+class ComparisonInput(BaseModel):
+    """Request schema for the tax form comparison / Schemat żądania porównania form opodatkowania."""
+    income_od: float = 0.0  # First income of the grid / Pierwszy przychód siatki
+    income_do: float  # Last income of the grid / Ostatni przychód siatki
+    income_krok: float  # Grid step / Krok siatki
+    costs: List[float] = [0.0]  # Monthly costs to compare at / Miesięczne koszty do porównania
+    # Forms to compare, all by default / Formy do porównania, domyślnie wszystkie
+    formy: Optional[List[str]] = None
+    has_tax_discount: bool = False  # Whether user has PIT discount / Czy użytkownik ma ulgę podatkową PIT
+    # Whether user pays voluntary sickness contribution / Czy użytkownik opłaca dobrowolną składkę chorobową
+    platnik_chorobowe: bool = True
+
+
+class ComparisonPoint(BaseModel):
+    """All forms at one grid point / Wszystkie formy w jednym punkcie siatki."""
+    income: float  # Monthly income / Przychód miesięczny
+    costs: float  # Monthly costs / Koszty miesięczne
+    dochod_netto: Dict[str, float]  # Net income per form / Dochód netto dla każdej formy
+    calkowite_obciazenie: Dict[str, float]  # Total burden per form / Całkowite obciążenie dla każdej formy
+    najkorzystniejsza: str  # Form with the highest net income / Forma z najwyższym dochodem netto
+
+
+class BreakEven(BaseModel):
+    """Income where two forms give the same net income / Przychód, przy którym dwie formy dają ten sam dochód netto."""
+    costs: float  # Monthly costs / Koszty miesięczne
+    forma_a: str
+    forma_b: str
+    income: float  # Break-even income / Przychód progu opłacalności
+    skok: bool  # Forms swap through a jump, not a crossing / Formy zamieniają się przez skok, a nie przecięcie
+    korzystniejsza_powyzej: str  # Better form above this income / Korzystniejsza forma powyżej tego przychodu
+    # The overall cheapest form changes here / Zmienia się tu najkorzystniejsza forma ogółem
+    zmiana_najkorzystniejszej: bool
+
+
+class ComparisonOutput(BaseModel):
+    """Response for the tax form comparison / Odpowiedź porównania form opodatkowania."""
+    rok_danych_zus: int  # Year of the ZUS data used / Rok danych ZUS użytych do obliczeń
+    podstawa_wymiaru_skladek_zus: Optional[float]  # ZUS contribution base / Podstawa wymiaru składek ZUS
+    punkty: List[ComparisonPoint]  # Grid results / Wyniki siatki
+    progi_oplacalnosci: List[BreakEven]  # Break-even incomes / Progi opłacalności
+    # Error message if fetching ZUS data failed / Komunikat błędu, jeśli pobieranie danych ZUS nie powiodło się
+    blad_danych_zus: Optional[str] = None
+
+
+class InverseInput(BaseModel):
+    """Request schema for the inverse solver / Schemat żądania solwera odwrotnego."""
+    dochod_netto: List[float]  # Target monthly net incomes / Docelowe miesięczne dochody netto
+    costs: float = 0.0  # Monthly costs (KUP) / Miesięczne koszty uzyskania przychodu (KUP)
+    forma_opodatkowania: str  # Tax form / Forma opodatkowania
+    has_tax_discount: bool = False  # Whether user has PIT discount / Czy użytkownik ma ulgę podatkową PIT
+    # Whether user pays voluntary sickness contribution / Czy użytkownik opłaca dobrowolną składkę chorobową
+    platnik_chorobowe: bool = True
+
+
+class InverseOutput(BaseModel):
+    """Response for the inverse solver / Odpowiedź solwera odwrotnego."""
+    rok_danych_zus: int  # Year of the ZUS data used / Rok danych ZUS użytych do obliczeń
+    podstawa_wymiaru_skladek_zus: Optional[float]  # ZUS contribution base / Podstawa wymiaru składek ZUS
+    # Each column below has one entry per target, in input order
+    # Każda kolumna poniżej ma jeden wpis na cel, w kolejności wejścia
+    # Lowest monthly income (net of VAT) reaching the target, None if unreachable
+    # Najniższy miesięczny przychód (bez VAT) osiągający cel, None jeśli nieosiągalny
+    income: List[Optional[float]]
+    dochod_netto: List[Optional[float]]  # Net income at that income / Dochód netto przy tym przychodzie
+    # Error message if fetching ZUS data failed / Komunikat błędu, jeśli pobieranie danych ZUS nie powiodło się
+    blad_danych_zus: Optional[str] = None
+
 # === FastAPI Dependency for ZUS Data / Zależność FastAPI dla danych ZUS ===
 
 
@@ -95,218 +346,582 @@ async def get_zus_dependency() -> ZUSData:
     Dependency to get ZUS data, ensuring it's fetched if needed.
     Zależność do pobierania danych ZUS, zapewniająca ich pobranie w razie potrzeby.
     """
-    zus_info = fetch_and_cache_zus_data()
+    # Non-blocking: a cache miss must not freeze the event loop / Nieblokujące: chybienie pamięci podręcznej nie może zamrozić pętli zdarzeń
+    with STAGE_DURATION.time("zus_dependency"):
+        zus_info = await fetch_and_cache_zus_data_async()
     # Don't raise an error here, pass the data as is
     # The endpoint can handle the situation (e.g., show an error to the user)
     # Nie zgłaszamy tutaj błędu, przekazujemy dane jakie są
     # Punkt końcowy może obsłużyć sytuację (np. pokazać błąd użytkownikowi)
     return zus_info
 
+# === Result Cache / Pamięć podręczna wyników ===
+# Maximum number of memoized /oblicz results / Maksymalna liczba zapamiętanych wyników /oblicz
+RESULT_CACHE_MAX_ENTRIES = 10000
+# Result Time To Live in seconds / Czas życia wyniku w sekundach
+RESULT_CACHE_TTL = 600
+# max-age sent to proxies/CDNs for cacheable GET responses / max-age wysyłany do proxy/CDN dla buforowalnych odpowiedzi GET
+HTTP_CACHE_MAX_AGE = 300
+
+_result_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL)
+# New ZUS data makes every memoized result obsolete / Nowe dane ZUS dezaktualizują wszystkie zapamiętane wyniki
+add_zus_data_listener(lambda year: _result_cache.clear())
+_RESULT_CACHE_EVENTS = REGISTRY.counter(
+    "b2b_result_cache_events_total", "Memoized /oblicz result lookups by outcome.", ("event",))
+REGISTRY.gauge("b2b_result_cache_entries", "Memoized /oblicz results.", (), lambda: [((), len(_result_cache))])
+
+# Maximum number of annual simulations kept for partial recalculation / Maksymalna liczba symulacji rocznych przechowywanych do częściowego przeliczenia
+ANNUAL_SCENARIO_MAX_ENTRIES = 10000
+# Scenario id -> (parameters, months) calculated by this worker / Id scenariusza -> (parametry, miesiące) obliczone przez ten proces roboczy
+_annual_scenarios = ResultCache(ANNUAL_SCENARIO_MAX_ENTRIES, RESULT_CACHE_TTL)
+add_zus_data_listener(lambda year: _annual_scenarios.clear())
+
+# === Result Table / Tablica wyników ===
+# "compute" calculates every /oblicz cache miss; "table" answers integer-PLN inputs from a precomputed table
+# shared by all workers through a memory-mapped file, and calculates the rest
+# "compute" oblicza każde chybienie pamięci /oblicz; "table" odpowiada na wejścia w pełnych złotych z wcześniej
+# obliczonej tablicy współdzielonej przez wszystkie procesy robocze przez plik mapowany w pamięci, a resztę oblicza
+ENGINE_MODE = os.environ.get("ENGINE_MODE", "compute")
+_result_tables = ResultTableManager() if ENGINE_MODE == "table" else None
+# hit, or miss when the input is outside the grid or the table is still being built
+# hit lub miss, gdy wejście jest poza siatką albo tablica jest jeszcze budowana
+_RESULT_TABLE_EVENTS = REGISTRY.counter(
+    "b2b_result_table_events_total", "Result table lookups by outcome.", ("event",))
+
+
+def _make_etag(*parts) -> str:
+    """Builds a strong ETag from the given values / Buduje silny ETag z podanych wartości."""
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _cacheable_response(request: Request, etag: str, body: bytes, zus_info: ZUSData) -> Response:
+    """
+    Returns the encoded JSON body with ETag/Cache-Control, or 304 if the client already has it.
+    Answers based on failed ZUS data are marked no-store so proxies don't keep them.
+    Zwraca zakodowaną treść JSON z ETag/Cache-Control lub 304, jeśli klient już ją posiada.
+    Odpowiedzi oparte na nieudanym pobraniu danych ZUS są oznaczane no-store, aby proxy ich nie przechowywały.
+    """
+    if zus_info.zus_base is None:
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={"Cache-Control": "no-store"})
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        if "*" in candidates or etag in candidates or f"W/{etag}" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
 # === API Endpoints / Punkty końcowe API ===
 
 
+def build_quota_body(result: BatchResult, index: int, zus_info: ZUSData,
+                     kompaktowy: bool = False, szczegoly: bool = True) -> dict:
+    """
+    Builds the QuotaOutput-shaped body for one row of an engine result as plain data.
+    The engine output is already typed, so the body is encoded as is instead of being validated by Pydantic again.
+    Buduje treść w kształcie QuotaOutput dla jednego wiersza wyniku silnika jako zwykłe dane.
+    Wynik silnika jest już otypowany, więc treść jest kodowana bezpośrednio zamiast ponownej walidacji przez Pydantic.
+
+    Args:
+        kompaktowy: Warning codes instead of full texts. / Kody ostrzeżeń zamiast pełnych treści.
+        szczegoly: Include zus_spoleczne_details. / Dołącz zus_spoleczne_details.
+    """
+    body = {
+        "rok_danych_zus": zus_info.year,  # Year of ZUS data / Rok danych ZUS
+        # ZUS base used / Użyta podstawa ZUS
+        "podstawa_wymiaru_skladek_zus": zus_info.zus_base,
+    }
+    if szczegoly:
+        # Detailed ZUS contributions / Szczegółowe składki ZUS
+        body["zus_spoleczne_details"] = [
+            {"nazwa": nazwa, "procent": procent, "podstawa": podstawa, "kwota": kwota}
+            for nazwa, procent, podstawa, kwota in result.zus_spoleczne_details[index]]
+    warnings = result.ostrzezenia[index]
+    body.update(
+        # Total social ZUS / Suma ZUS społecznego
+        zus_spoleczne_total=result.zus_spoleczne_total[index],
+        # Health contribution / Składka zdrowotna
+        skladka_zdrowotna=result.skladka_zdrowotna[index],
+        podatek_pit=result.podatek_pit[index],  # PIT amount / Kwota PIT
+        vat=result.vat[index],  # VAT amount / Kwota VAT
+        # Total burden / Całkowite obciążenie
+        calkowite_obciazenie=result.calkowite_obciazenie[index],
+        dochod_netto=result.dochod_netto[index],  # Net income / Dochód netto
+        # List of warnings (or their codes) / Lista ostrzeżeń (lub ich kodów)
+        ostrzezenia=[WARNING_CODES_BY_MESSAGE[text] for text in warnings] if kompaktowy else list(warnings),
+        # ZUS data fetch error message (if any) / Komunikat błędu pobierania danych ZUS (jeśli wystąpił)
+        blad_danych_zus=zus_info.error_message,
+    )
+    return body
+
+
+def calculate_quota_cached(data: QuotaInput, zus_info: ZUSData,
+                           kompaktowy: bool = False, szczegoly: bool = True) -> Tuple[tuple, bytes]:
+    """
+    Calculates one input, memoized on the normalized input, the output mode and the ZUS data version.
+    The encoded body is memoized, so a cache hit skips serialization as well.
+    Oblicza jedno wejście, zapamiętując wynik dla znormalizowanego wejścia, trybu wyjścia i wersji danych ZUS.
+    Zapamiętywana jest zakodowana treść, więc trafienie pomija także serializację.
+
+    Returns:
+        (cache key, JSON body). / (klucz pamięci podręcznej, treść JSON).
+    """
+    # Input validation / Walidacja danych wejściowych
+    with STAGE_DURATION.time("validation"):
+        error = validate_row(data.income, data.costs, data.forma_opodatkowania)
+    if error is not None:
+        raise HTTPException(status_code=400, detail=error)
+
+    key = (zus_data_version(zus_info), float(data.income), float(data.costs), data.forma_opodatkowania,
+           float(data.stawka_vat), data.has_tax_discount, data.platnik_chorobowe, kompaktowy, szczegoly)
+    output = _result_cache.get(key)
+    if output is not None:
+        _RESULT_CACHE_EVENTS.inc("hit")
+    else:
+        _RESULT_CACHE_EVENTS.inc("miss")
+        result = None
+        if _result_tables is not None:
+            with STAGE_DURATION.time("result_table"):
+                result = _result_tables.lookup(zus_info, data.income, data.costs, data.forma_opodatkowania,
+                                               data.stawka_vat, data.has_tax_discount, data.platnik_chorobowe)
+            _RESULT_TABLE_EVENTS.inc("miss" if result is None else "hit")
+        if result is None:
+            timings = {}
+            # The single call is a batch of one / Pojedyncze wywołanie to partia o rozmiarze jeden
+            result = calculate_batch(
+                income=[data.income],
+                costs=[data.costs],
+                forma_opodatkowania=[data.forma_opodatkowania],
+                stawka_vat=[data.stawka_vat],
+                has_tax_discount=[data.has_tax_discount],
+                platnik_chorobowe=[data.platnik_chorobowe],
+                zus_base=zus_info.zus_base,
+                year=zus_info.year,
+                timings=timings,
+            )
+            for stage, seconds in timings.items():
+                STAGE_DURATION.observe(seconds, stage)
+        # Format the response / Sformatuj odpowiedź
+        with STAGE_DURATION.time("serialization"):
+            output = encode_json(build_quota_body(result, 0, zus_info, kompaktowy, szczegoly))
+        _result_cache.put(key, output)
+    return key, output
+
+
 # Define POST endpoint and response model / Definiuj punkt końcowy POST i model odpowiedzi
-@app.post("/oblicz", response_model=QuotaOutput)
+@app.post("/oblicz", response_model=Union[QuotaOutput, QuotaCompactOutput])
 # Function to calculate Polish taxes / Funkcja do obliczania polskich podatków
 # Calculates ZUS, PIT, and health contribution based on user input / Oblicza ZUS, PIT i składkę zdrowotną na podstawie danych wejściowych użytkownika
 # Inject ZUS data dependency / Wstrzyknij zależność danych ZUS
-async def calculate_polish_taxes(data: QuotaInput, zus_info: ZUSData = Depends(get_zus_dependency)):
-    # Input validation / Walidacja danych wejściowych
-    if data.income < 0:
-        # Error if income is negative / Błąd, jeśli przychód jest ujemny
+async def calculate_polish_taxes(data: QuotaInput, kompaktowy: bool = False, szczegoly: bool = False,
+                                 zus_info: ZUSData = Depends(get_zus_dependency)):
+    """
+    Calculates ZUS, PIT and health contribution for one input.
+    ?kompaktowy=true returns warning codes instead of texts and leaves out zus_spoleczne_details
+    unless ?szczegoly=true is also given.
+
+    Oblicza ZUS, PIT i składkę zdrowotną dla jednego wejścia.
+    ?kompaktowy=true zwraca kody ostrzeżeń zamiast treści i pomija zus_spoleczne_details,
+    chyba że podano także ?szczegoly=true.
+    """
+    _, body = calculate_quota_cached(data, zus_info, kompaktowy, not kompaktowy or szczegoly)
+    # Already encoded, so response_model is not applied again / Już zakodowane, więc response_model nie jest stosowany ponownie
+    return Response(content=body, media_type=JSON_MEDIA_TYPE)
+
+
+@app.get("/oblicz", response_model=Union[QuotaOutput, QuotaCompactOutput])
+async def calculate_polish_taxes_get(
+    request: Request, data: QuotaInput = Depends(), kompaktowy: bool = False, szczegoly: bool = False,
+    zus_info: ZUSData = Depends(get_zus_dependency)):
+    """
+    Cacheable variant of POST /oblicz taking QuotaInput fields as query parameters.
+    Sends ETag and Cache-Control, and answers If-None-Match with 304.
+
+    Buforowalny wariant POST /oblicz przyjmujący pola QuotaInput jako parametry zapytania.
+    Wysyła ETag i Cache-Control oraz odpowiada 304 na If-None-Match.
+    """
+    key, body = calculate_quota_cached(data, zus_info, kompaktowy, not kompaktowy or szczegoly)
+    return _cacheable_response(request, _make_etag(*key), body, zus_info)
+
+
+@app.post("/oblicz/batch", response_model=QuotaBatchOutput)
+async def calculate_polish_taxes_batch(data: QuotaBatchInput, zus_info: ZUSData = Depends(get_zus_dependency)):
+    """
+    Calculates a whole batch of contractors in one request. Results are returned in input order.
+    Oblicza całą partię kontrahentów w jednym żądaniu. Wyniki są zwracane w kolejności wejścia.
+    """
+    size = len(data.income)
+    # Optional columns fall back to QuotaInput defaults / Opcjonalne kolumny przyjmują domyślne wartości QuotaInput
+    costs = data.costs if data.costs is not None else [0.0] * size
+    stawka_vat = data.stawka_vat if data.stawka_vat is not None else [0.0] * size
+    has_tax_discount = data.has_tax_discount if data.has_tax_discount is not None else [False] * size
+    platnik_chorobowe = data.platnik_chorobowe if data.platnik_chorobowe is not None else [True] * size
+
+    # All columns must have the same length / Wszystkie kolumny muszą mieć tę samą długość
+    for column in (costs, data.forma_opodatkowania, stawka_vat, has_tax_discount, platnik_chorobowe):
+        if len(column) != size:
+            raise HTTPException(
+                status_code=400, detail="Wszystkie kolumny muszą mieć tę samą długość")  # All columns must have the same length
+
+    # Validate every row, reporting the first invalid one / Zwaliduj każdy wiersz, zgłaszając pierwszy nieprawidłowy
+    for index, (income, cost, forma) in enumerate(zip(data.income, costs, data.forma_opodatkowania)):
+        error = validate_row(income, cost, forma)
+        if error is not None:
+            raise HTTPException(
+                status_code=400, detail=f"Wiersz {index}: {error}")  # Row {index}: {error}
+
+    result = calculate_batch(
+        income=data.income,
+        costs=costs,
+        forma_opodatkowania=data.forma_opodatkowania,
+        stawka_vat=stawka_vat,
+        has_tax_discount=has_tax_discount,
+        platnik_chorobowe=platnik_chorobowe,
+        zus_base=zus_info.zus_base,
+        year=zus_info.year,
+    )
+    return QuotaBatchOutput(
+        rok_danych_zus=zus_info.year,
+        podstawa_wymiaru_skladek_zus=zus_info.zus_base,
+        zus_spoleczne_details=[
+            [SkladkaDetail(nazwa=nazwa, procent=procent, podstawa=podstawa, kwota=kwota)
+             for nazwa, procent, podstawa, kwota in details]
+            for details in result.zus_spoleczne_details],
+        zus_spoleczne_total=result.zus_spoleczne_total,
+        skladka_zdrowotna=result.skladka_zdrowotna,
+        podatek_pit=result.podatek_pit,
+        vat=result.vat,
+        calkowite_obciazenie=result.calkowite_obciazenie,
+        dochod_netto=result.dochod_netto,
+        ostrzezenia=[list(warnings) for warnings in result.ostrzezenia],
+        blad_danych_zus=zus_info.error_message,
+    )
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body is generated from the request stream.
+    The default disconnect listener would read request messages itself and take the upload away from request.stream();
+    a client disconnect still ends the upload with ClientDisconnect.
+
+    StreamingResponse, którego treść jest generowana ze strumienia żądania.
+    Domyślny nasłuch rozłączenia czytałby sam komunikaty żądania i odbierałby przesyłane dane request.stream();
+    rozłączenie klienta nadal kończy przesyłanie wyjątkiem ClientDisconnect.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        # Cancelled once the response is sent / Anulowane po wysłaniu odpowiedzi
+        await asyncio.Event().wait()
+
+
+@app.post("/oblicz/stream")
+async def calculate_polish_taxes_stream(
+    request: Request,
+    format_wejscia: Optional[str] = None,
+    format_wyjscia: str = "ndjson",
+    zus_info: ZUSData = Depends(get_zus_dependency),
+):
+    """
+    Calculates a CSV or NDJSON upload of any size and streams the results back.
+    Invalid rows are reported inline with a "blad" field instead of failing the upload.
+    The input format is taken from ?format_wejscia=csv|ndjson or guessed from Content-Type.
+
+    Oblicza przesłany plik CSV lub NDJSON dowolnego rozmiaru i strumieniuje wyniki z powrotem.
+    Nieprawidłowe wiersze są zgłaszane w miejscu polem "blad" zamiast przerywać przesyłanie.
+    Format wejścia jest brany z ?format_wejscia=csv|ndjson lub odgadywany z Content-Type.
+    """
+    if format_wejscia is None:
+        content_type = request.headers.get("content-type", "")
+        format_wejscia = "ndjson" if "json" in content_type else "csv"
+    if format_wejscia not in STREAM_FORMATS or format_wyjscia not in STREAM_FORMATS:
         raise HTTPException(
-            status_code=400, detail="Dochód (przychód) nie może być ujemny")  # Income cannot be negative
-    if data.costs < 0:
-        # Error if costs are negative / Błąd, jeśli koszty są ujemne
+            status_code=400, detail="Nieobsługiwany format (dozwolone: csv, ndjson)")  # Unsupported format (allowed: csv, ndjson)
+
+    return UploadStreamingResponse(
+        stream_calculation(request.stream(), format_wejscia, format_wyjscia, zus_info),
+        media_type=STREAM_MEDIA_TYPES[format_wyjscia],
+    )
+
+
+@app.post("/oblicz/rok", response_model=AnnualOutput)
+async def simulate_tax_year(data: AnnualInput, zus_info: ZUSData = Depends(get_zus_dependency)):
+    """
+    Simulates up to 12 months in one pass with cumulative PIT thresholds.
+    Pass an earlier id_scenariusza as poprzedni_scenariusz to recalculate only from the first month whose income
+    or costs changed; the earlier months and cumulative state come from the result this worker kept, never from
+    the request. An unknown or expired scenario, or one with other parameters, is calculated in full.
+
+    Symuluje do 12 miesięcy w jednym przebiegu z narastającymi progami PIT.
+    Przekaż wcześniejsze id_scenariusza jako poprzedni_scenariusz, aby przeliczyć tylko od pierwszego miesiąca
+    o zmienionym przychodzie lub kosztach; wcześniejsze miesiące i stan narastający pochodzą z wyniku zachowanego
+    przez ten proces roboczy, nigdy z żądania. Nieznany lub wygasły scenariusz albo scenariusz z innymi parametrami
+    jest obliczany w całości.
+    """
+    if not 1 <= len(data.miesiace) <= MONTHS_IN_YEAR:
         raise HTTPException(
-            status_code=400, detail="Koszty nie mogą być ujemne")  # Costs cannot be negative
-    # Consider warning if costs exceed income / Rozważ ostrzeżenie, jeśli koszty przekraczają przychód
-    if data.income < data.costs:
-        # For now, just calculate, but this might be unrealistic
-        # Na razie po prostu obliczamy, ale może to być nierealistyczne
-        pass
+            status_code=400, detail="Symulacja wymaga od 1 do 12 miesięcy")  # Simulation requires 1 to 12 months
+    for index, month in enumerate(data.miesiace):
+        error = validate_row(month.income, month.costs, data.forma_opodatkowania)
+        if error is not None:
+            raise HTTPException(
+                status_code=400, detail=f"Miesiąc {index + 1}: {error}")  # Month {index + 1}: {error}
+
+    version = zus_data_version(zus_info)
+    rules_year = resolve_rules_year(zus_info.year)
+    # An earlier result is only reused if it was calculated with the same parameters, ZUS data and rules
+    # Wcześniejszy wynik jest używany ponownie tylko, jeśli obliczono go z tymi samymi parametrami, danymi ZUS i regułami
+    parameters = (version, rules_year, data.forma_opodatkowania, float(data.stawka_vat), data.has_tax_discount,
+                  data.platnik_chorobowe)
+    previous = None
+    if data.poprzedni_scenariusz is not None:
+        stored = _annual_scenarios.get(data.poprzedni_scenariusz)
+        if stored is not None and stored[0] == parameters:
+            previous = stored[1]
+
+    result = simulate_year(
+        income=[month.income for month in data.miesiace],
+        costs=[month.costs for month in data.miesiace],
+        forma_opodatkowania=data.forma_opodatkowania,
+        stawka_vat=data.stawka_vat,
+        has_tax_discount=data.has_tax_discount,
+        platnik_chorobowe=data.platnik_chorobowe,
+        zus_base=zus_info.zus_base,
+        year=zus_info.year,
+        previous=previous,
+    )
+    months = result.months
+    scenario_id = hashlib.sha1(
+        repr((parameters, [(month.income, month.costs) for month in months])).encode("utf-8")).hexdigest()[:20]
+    _annual_scenarios.put(scenario_id, (parameters, months))
+    return AnnualOutput(
+        rok_danych_zus=zus_info.year,
+        id_scenariusza=scenario_id,
+        wersja_danych_zus=version,
+        rok_regul=rules_year,
+        podstawa_wymiaru_skladek_zus=zus_info.zus_base,
+        forma_opodatkowania=data.forma_opodatkowania,
+        stawka_vat=data.stawka_vat,
+        has_tax_discount=data.has_tax_discount,
+        platnik_chorobowe=data.platnik_chorobowe,
+        zus_spoleczne_details=[
+            SkladkaDetail(nazwa=nazwa, procent=procent, podstawa=podstawa, kwota=kwota)
+            for nazwa, procent, podstawa, kwota in result.zus_spoleczne_details],
+        miesiace=[MonthOutput(miesiac=index + 1, **month._asdict()) for index, month in enumerate(months)],
+        przeliczone_od=result.recomputed_from + 1,
+        przeliczone_miesiace=[index + 1 for index in result.changed],
+        suma_przychodow=round(sum(month.income for month in months), 2),
+        suma_zus_spoleczne=round(sum(month.zus_spoleczne_total for month in months), 2),
+        suma_skladka_zdrowotna=round(sum(month.skladka_zdrowotna for month in months), 2),
+        suma_podatek_pit=round(sum(month.podatek_pit for month in months), 2),
+        suma_vat=round(sum(month.vat for month in months), 2),
+        suma_obciazenie=round(sum(month.calkowite_obciazenie for month in months), 2),
+        suma_dochod_netto=round(sum(month.dochod_netto for month in months), 2),
+        ostrzezenia=list(result.ostrzezenia),
+        blad_danych_zus=zus_info.error_message,
+    )
+
+# Maximum number of (income, costs, form) evaluations per comparison / Maksymalna liczba obliczeń (przychód, koszty, forma) w porównaniu
+MAX_COMPARISON_EVALUATIONS = 200000
 
-    # === Social ZUS Calculation / Obliczenie ZUS Społecznego ===
-    zus_details = []  # List to store details of each contribution / Lista do przechowywania szczegółów każdej składki
-    zus_total = 0.0  # Total social ZUS / Suma ZUS społecznego
-    warnings = []  # List for calculation warnings / Lista na ostrzeżenia dotyczące obliczeń
-    # Get ZUS base from dependency / Pobierz podstawę ZUS z zależności
-    zus_base = zus_info.zus_base
-
-    # Handle case where ZUS base couldn't be fetched / Obsługa przypadku, gdy nie udało się pobrać podstawy ZUS
-    if zus_base is None:
-        warnings.append(
-            "Nie udało się pobrać aktualnej podstawy ZUS. Użyto wartości domyślnych/zerowych.")  # Failed to fetch current ZUS base. Using default/zero values.
-        # Set a default base or keep 0, depending on desired logic / Ustaw domyślną podstawę lub zostaw 0, w zależności od pożądanej logiki
-        zus_base = 0.0  # Or another default value / Lub inna wartość domyślna
-
-    # Calculate contributions if base is valid / Oblicz składki, jeśli podstawa jest prawidłowa
-    if zus_base > 0:
-        # ZUS rates (may change, especially 'Wypadkowe') / Stawki ZUS (mogą ulec zmianie, zwłaszcza 'Wypadkowe')
-        rates = {
-            "Emerytalne": 0.1952,  # Pension / Emerytalne
-            "Rentowe": 0.0800,  # Disability / Rentowe
-            # Accident (standard rate, may vary) / Wypadkowe (standardowa stawka, może się różnić)
-            "Wypadkowe": 0.0167,
-            # Labor Fund/Solidarity Fund / Fundusz Pracy/Solidarnościowy
-            "Fundusz Pracy/Solidarnościowy": 0.0245,
-        }
-        # Add voluntary sickness contribution if applicable / Dodaj dobrowolną składkę chorobową, jeśli dotyczy
-        if data.platnik_chorobowe:
-            # Sickness (voluntary) / Chorobowe (dobrowolne)
-            rates["Chorobowe (dobrowolne)"] = 0.0245
-
-        # Calculate each component / Oblicz każdą składową
-        for name, rate in rates.items():
-            # Calculate amount / Oblicz kwotę
-            amount = round(zus_base * rate, 2)
-            zus_details.append(SkladkaDetail(
-                nazwa=name, procent=rate * 100, podstawa=zus_base, kwota=amount))  # Add details to list / Dodaj szczegóły do listy
-            zus_total += amount  # Add to total / Dodaj do sumy
-
-        zus_total = round(zus_total, 2)  # Round the total / Zaokrąglij sumę
-
-    # === Health Contribution Calculation (SIMPLIFIED!) / Obliczenie Składki Zdrowotnej (UPROSZCZONE!) ===
-    # !!! WARNING: This is a highly simplified and likely INCORRECT calculation for most forms!
-    # !!! OSTRZEŻENIE: To jest bardzo uproszczone i prawdopodobnie NIEPOPRAWNE obliczenie dla większości form!
-    health_contribution = 0.0
-    przychody = data.income  # Revenue / Przychód
-    koszty = data.costs  # Costs / Koszty
-    # Preliminary base for health contribution (not always correct) / Wstępna podstawa składki zdrowotnej (nie zawsze poprawna)
-    # Income for health insurance base / Dochód do podstawy zdrowotnej
-    dochod_do_zdrowotnej = max(0, przychody - koszty - zus_total)
-
-    # Calculate based on tax form / Oblicz na podstawie formy opodatkowania
-    if data.forma_opodatkowania == "skala":  # Tax scale / Skala podatkowa
-        health_rate_simplified = 0.09  # Simplified rate / Uproszczona stawka
-        health_contribution = round(
-            dochod_do_zdrowotnej * health_rate_simplified, 2)
-        # TODO: Add check for minimum health contribution base / TODO: Dodaj sprawdzenie minimalnej podstawy składki zdrowotnej
-        warnings.append(
-            "Składka zdrowotna (skala) obliczona wg uproszczonej stawki 9% od dochodu (przychód - koszty - ZUS społ.).")  # Health contribution (scale) calculated using simplified 9% rate of income (revenue - costs - social ZUS).
-    elif data.forma_opodatkowania == "liniowy_19":  # Flat tax / Podatek liniowy
-        health_rate_simplified = 0.049  # Simplified rate / Uproszczona stawka
-        health_contribution = round(
-            dochod_do_zdrowotnej * health_rate_simplified, 2)
-        # TODO: Add check for minimum health contribution base / TODO: Dodaj sprawdzenie minimalnej podstawy składki zdrowotnej
-        warnings.append(
-            "Składka zdrowotna (liniowy) obliczona wg uproszczonej stawki 4.9% od dochodu (przychód - koszty - ZUS społ.).")  # Health contribution (flat) calculated using simplified 4.9% rate of income (revenue - costs - social ZUS).
-    # Lump sum tax / Ryczałt ewidencjonowany
-    elif data.forma_opodatkowania.startswith("ryczalt"):
-        # TODO: Implement lump sum logic with income thresholds and fixed rates / TODO: Zaimplementuj logikę ryczałtu z progami dochodowymi i stałymi stawkami
-        health_contribution = 300.0  # Temporary placeholder / Tymczasowa wartość zastępcza
-        warnings.append(
-            "Składka zdrowotna (ryczałt) jest wartością tymczasową. Wymaga implementacji progów dochodowych.")  # Health contribution (lump sum) is a temporary value. Requires implementation of income thresholds.
-    else:  # Unknown tax form / Nieznana forma opodatkowania
-        # Unknown tax form for health contribution.
-        warnings.append("Nieznana forma opodatkowania dla składki zdrowotnej.")
-
-    # Cannot be negative / Nie może być ujemna
-    health_contribution = max(0, health_contribution)
-
-    # === PIT Calculation (SIMPLIFIED!) / Obliczenie PIT (UPROSZCZONE!) ===
-    # !!! WARNING: PIT calculation is also simplified. / !!! OSTRZEŻENIE: Obliczenie PIT jest również uproszczone.
-    pit_tax = 0.0  # Income tax amount / Kwota podatku dochodowego
-    pit_base = 0.0  # Tax base / Podstawa opodatkowania
-
-    # Determine tax rate and base based on tax form / Określ stawkę podatku i podstawę w zależności od formy opodatkowania
-    if data.forma_opodatkowania == "ryczalt_15":
-        pit_rate = 0.15
-        # For lump sum, base = revenue (minus social ZUS, minus part of health - not implemented) / Dla ryczałtu podstawa = przychód (minus ZUS społ., minus część zdrowotnej - niezaimplementowane)
-        pit_base = max(0, przychody - zus_total)  # Simplified / Uproszczone
-        pit_tax = pit_base * pit_rate
-        warnings.append(
-            "PIT (ryczałt) obliczony od przychodu pomniejszonego tylko o ZUS społeczny (uproszczenie).")  # PIT (lump sum) calculated from revenue minus only social ZUS (simplification).
-    elif data.forma_opodatkowania == "ryczalt_12":
-        pit_rate = 0.12
-        pit_base = max(0, przychody - zus_total)  # Simplified / Uproszczone
-        pit_tax = pit_base * pit_rate
-        warnings.append(
-            "PIT (ryczałt) obliczony od przychodu pomniejszonego tylko o ZUS społeczny (uproszczenie).")  # PIT (lump sum) calculated from revenue minus only social ZUS (simplification).
-    elif data.forma_opodatkowania == "liniowy_19":
-        pit_rate = 0.19
-        # Base = income (revenue - costs - social contributions) / Podstawa = dochód (przychód - koszty - składki społeczne)
-        # TODO: Account for possible health contribution deduction / TODO: Uwzględnij możliwość odliczenia składki zdrowotnej
-        pit_base = max(0, przychody - koszty - zus_total)
-        pit_tax = pit_base * pit_rate
-        warnings.append(
-            "PIT (liniowy) obliczony od dochodu (przychód - koszty - ZUS społ.) bez odliczenia składki zdrowotnej (uproszczenie).")  # PIT (flat) calculated from income (revenue - costs - social ZUS) without health contribution deduction (simplification).
-    elif data.forma_opodatkowania == "skala":
-        # Base = income (revenue - costs - social contributions) / Podstawa = dochód (przychód - koszty - składki społeczne)
-        pit_base = max(0, przychody - koszty - zus_total)
-        # Calculation for tax scale (simplified, without monthly tax-reducing amount) / Obliczenie dla skali podatkowej (uproszczone, bez miesięcznej kwoty zmniejszającej podatek)
-        # TODO: Implement correct calculation with tax-free amount/tax-reducing amount and annual thresholds / TODO: Zaimplementuj poprawne obliczenie z kwotą wolną/zmniejszającą podatek i progami rocznymi
-        # Estimated annual income / Szacowany roczny dochód
-        roczny_dochod_szacowany = pit_base * 12
-        # 3600 / 12 (Tax reducing amount per month) / (Kwota zmniejszająca podatek miesięcznie)
-        kwota_zmniejszajaca_miesiecznie = 300.0
-        if roczny_dochod_szacowany <= 120000:  # First tax threshold / Pierwszy próg podatkowy
-            pit_rate = 0.12
-            pit_tax = max(0, (pit_base * pit_rate) -
-                          kwota_zmniejszajaca_miesiecznie)  # Apply tax reducing amount / Zastosuj kwotę zmniejszającą podatek
-        else:  # Second tax threshold / Drugi próg podatkowy
-            pit_rate = 0.32
-            # Very simplified calculation for the second threshold / Bardzo uproszczone obliczenie dla drugiego progu
-            # Correct calculation requires considering the tax paid in the first bracket / Poprawne obliczenie wymaga uwzględnienia podatku zapłaconego w pierwszym progu
-            pit_tax = pit_base * pit_rate  # Needs refinement / Wymaga dopracowania
-        warnings.append(
-            "PIT (skala) obliczony w sposób uproszczony (bez pełnego uwzględnienia kwoty wolnej/zmniejszającej i progów rocznych).")  # PIT (scale) calculated simplistically (without full consideration of tax-free/reducing amount and annual thresholds).
-    else:  # Unknown tax form / Nieznana forma opodatkowania
+
+@app.post("/oblicz/porownanie", response_model=ComparisonOutput)
+async def compare_tax_forms(data: ComparisonInput, zus_info: ZUSData = Depends(get_zus_dependency)):
+    """
+    Compares tax forms over an income/costs grid in one pass and returns the exact break-even incomes.
+    Porównuje formy opodatkowania na siatce przychodów/kosztów w jednym przebiegu i zwraca dokładne progi opłacalności.
+    """
+    formy = data.formy if data.formy is not None else list(FORMY_OPODATKOWANIA)
+    if not formy or any(forma not in FORMY_OPODATKOWANIA for forma in formy):
         raise HTTPException(
             status_code=400, detail="Nieprawidłowa forma opodatkowania")  # Invalid tax form
+    if not all(math.isfinite(value) for value in (data.income_od, data.income_do, data.income_krok, *data.costs)):
+        raise HTTPException(
+            status_code=400, detail="Kwoty muszą być liczbami skończonymi")  # Amounts must be finite numbers
+    if data.income_krok <= 0 or data.income_od < 0 or data.income_do < data.income_od:
+        raise HTTPException(
+            status_code=400, detail="Nieprawidłowy zakres przychodów")  # Invalid income range
+    if not data.costs or any(costs < 0 for costs in data.costs):
+        raise HTTPException(
+            status_code=400, detail="Koszty nie mogą być ujemne")  # Costs cannot be negative
 
-    # Tax cannot be negative / Podatek nie może być ujemny
-    pit_tax = round(max(0, pit_tax), 2)
+    # Checked as a float first, so a huge span cannot overflow int() / Sprawdzane najpierw jako float, aby ogromny zakres nie przepełnił int()
+    spans = (data.income_do - data.income_od) / data.income_krok
+    if (spans + 1) * len(data.costs) * len(formy) > MAX_COMPARISON_EVALUATIONS:
+        raise HTTPException(
+            status_code=400, detail=f"Siatka jest zbyt duża (maksymalnie {MAX_COMPARISON_EVALUATIONS} obliczeń)")  # Grid is too large
+    steps = int(spans + 1e-9) + 1
+    incomes = [round(data.income_od + step * data.income_krok, 2) for step in range(steps)]
+
+    grid = compare_grid(incomes, data.costs, formy, data.has_tax_discount, data.platnik_chorobowe,
+                        zus_info.zus_base, zus_info.year)
+    break_evens = [point for costs in data.costs
+                   for point in break_even_incomes(formy, costs, data.has_tax_discount, data.platnik_chorobowe,
+                                                   zus_info.zus_base, zus_info.year)]
+    return ComparisonOutput(
+        rok_danych_zus=zus_info.year,
+        podstawa_wymiaru_skladek_zus=zus_info.zus_base,
+        punkty=[ComparisonPoint(**point._asdict()) for point in grid],
+        progi_oplacalnosci=[BreakEven(**point._asdict()) for point in break_evens],
+        blad_danych_zus=zus_info.error_message,
+    )
 
-    # Apply tax discount if applicable / Zastosuj ulgę podatkową, jeśli dotyczy
-    if data.has_tax_discount:
-        # TODO: Clarify which specific discount is meant. / TODO: Wyjaśnij, o którą konkretnie ulgę chodzi.
-        # If 50% KUP for creators, it affects pit_base, not pit_tax directly. / Jeśli 50% KUP dla twórców, wpływa to na pit_base, a nie bezpośrednio na pit_tax.
-        pit_tax *= 0.5  # Current logic reduces the tax amount / Obecna logika zmniejsza kwotę podatku
-        warnings.append(
-            "Zastosowano uproszczoną zniżkę PIT 50% na kwotę podatku.")  # Applied simplified 50% PIT discount on the tax amount.
 
-    # Calculate VAT (does not affect other calculations) / Oblicz VAT (nie wpływa na inne obliczenia)
-    vat_amount = round(data.income * (data.stawka_vat / 100), 2)
+# Maximum number of targets per request; each one is checked on 2 * GROSZ_WINDOW + 1 engine rows
+# Maksymalna liczba celów w żądaniu; każdy jest sprawdzany na 2 * GROSZ_WINDOW + 1 wierszach silnika
+MAX_INVERSE_TARGETS = 10000
 
-    # Total monthly burden (excluding VAT) / Całkowite miesięczne obciążenie (bez VAT)
-    total_contributions = round(zus_total + health_contribution + pit_tax, 2)
 
-    # Net income ('take-home' pay) / Dochód netto ('na rękę')
-    net_income = round(data.income - data.costs - total_contributions, 2)
+@app.post("/oblicz/odwrotne", response_model=InverseOutput)
+async def solve_income_for_net(data: InverseInput, zus_info: ZUSData = Depends(get_zus_dependency)):
+    """
+    Finds the income that gives each target net income under one tax form, replacing a search over /oblicz.
+    Znajduje przychód, który daje każdy docelowy dochód netto w jednej formie opodatkowania, zastępując przeszukiwanie /oblicz.
+    """
+    error = validate_row(0.0, data.costs, data.forma_opodatkowania)
+    if error is not None:
+        raise HTTPException(status_code=400, detail=error)
+    if len(data.dochod_netto) > MAX_INVERSE_TARGETS:
+        raise HTTPException(
+            status_code=400, detail=f"Zbyt wiele celów (maksymalnie {MAX_INVERSE_TARGETS})")  # Too many targets
+    if not all(math.isfinite(value) for value in (data.costs, *data.dochod_netto)):
+        raise HTTPException(
+            status_code=400, detail="Kwoty muszą być liczbami skończonymi")  # Amounts must be finite numbers
 
-    # Format the response / Sformatuj odpowiedź
-    return QuotaOutput(
-        rok_danych_zus=zus_info.year,  # Year of ZUS data / Rok danych ZUS
-        # ZUS base used / Użyta podstawa ZUS
+    result = solve_incomes(data.dochod_netto, data.costs, data.forma_opodatkowania, data.has_tax_discount,
+                           data.platnik_chorobowe, zus_info.zus_base, zus_info.year)
+    return InverseOutput(
+        rok_danych_zus=zus_info.year,
         podstawa_wymiaru_skladek_zus=zus_info.zus_base,
-        # Detailed ZUS contributions / Szczegółowe składki ZUS
-        zus_spoleczne_details=zus_details,
-        zus_spoleczne_total=zus_total,  # Total social ZUS / Suma ZUS społecznego
-        # Health contribution / Składka zdrowotna
-        skladka_zdrowotna=health_contribution,
-        podatek_pit=pit_tax,  # PIT amount / Kwota PIT
-        vat=vat_amount,  # VAT amount / Kwota VAT
-        calkowite_obciazenie=total_contributions,  # Total burden / Całkowite obciążenie
-        dochod_netto=net_income,  # Net income / Dochód netto
-        ostrzezenia=warnings,  # List of warnings / Lista ostrzeżeń
-        # ZUS data fetch error message (if any) / Komunikat błędu pobierania danych ZUS (jeśli wystąpił)
-        blad_danych_zus=zus_info.error_message
+        income=result.income,
+        dochod_netto=result.dochod_netto,
+        blad_danych_zus=zus_info.error_message,
     )
 
+
+@app.websocket("/oblicz/na_zywo")
+async def calculate_polish_taxes_live(websocket: WebSocket):
+    """
+    Live recalculation session for interactive forms.
+    The first message is a QuotaInput object, each later one only the fields that changed. Every reply holds only
+    the QuotaOutput fields whose value changed, or {"blad": ...} if the message was rejected (the session keeps its
+    previous state). Only stages depending on the changed fields are recomputed, e.g. stawka_vat recomputes VAT only.
+
+    Sesja przeliczania na żywo dla interaktywnych formularzy.
+    Pierwsza wiadomość to obiekt QuotaInput, każda kolejna tylko zmienione pola. Każda odpowiedź zawiera tylko pola
+    QuotaOutput, których wartość się zmieniła, lub {"blad": ...}, jeśli wiadomość odrzucono (sesja zachowuje
+    poprzedni stan). Przeliczane są tylko etapy zależne od zmienionych pól, np. stawka_vat przelicza tylko VAT.
+    """
+    await websocket.accept()
+    session = LiveSession()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                changes = json.loads(message)
+                if not isinstance(changes, dict):
+                    raise ValueError("Wiadomość musi być obiektem JSON")  # Message must be a JSON object
+                data = QuotaInput(**{**session.inputs, **changes})
+            except (ValueError, ValidationError) as e:
+                await websocket.send_text(encode_json({"blad": str(e)}).decode("utf-8"))
+                continue
+            error = validate_row(data.income, data.costs, data.forma_opodatkowania)
+            if error is not None:
+                await websocket.send_text(encode_json({"blad": error}).decode("utf-8"))
+                continue
+
+            # Cached lookup; new ZUS data recomputes the whole session / Odczyt z pamięci podręcznej; nowe dane ZUS przeliczają całą sesję
+            zus_info = await fetch_and_cache_zus_data_async()
+            session.set_zus_data(zus_data_version(zus_info), zus_info.year, zus_info.zus_base, zus_info.error_message)
+            session.update(data.model_dump())
+            await websocket.send_text(encode_json(session.recalculate()).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics of this worker process: request durations, /oblicz stage timings, cache events and ZUS data age.
+    Metryki Prometheusa tego procesu roboczego: czasy żądań, czasy etapów /oblicz, zdarzenia pamięci podręcznych i wiek danych ZUS.
+    """
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def check_zus_year(rok: Optional[int]) -> None:
+    """
+    Rejects years outside the supported window, so clients cannot trigger a scrape per arbitrary year.
+    Odrzuca lata spoza obsługiwanego zakresu, aby klienci nie mogli wywołać pobrania dla dowolnego roku.
+    """
+    if rok is not None and not is_supported_year(rok):
+        # Unsupported year / Nieobsługiwany rok
+        raise HTTPException(status_code=422, detail=(
+            f"Nieobsługiwany rok {rok}; dostępne lata: "
+            f"{ZUS_INFO_YEAR - ZUS_YEARS_BACK}-{ZUS_INFO_YEAR + ZUS_YEARS_AHEAD}"))
+
 # Endpoint to check current ZUS data (uses the new module) / Punkt końcowy do sprawdzania aktualnych danych ZUS (używa nowego modułu)
 
 
-@app.get("/aktualne_dane_zus", response_model=ZUSData)
-async def get_current_zus_data(force_refresh: bool = False):
+@app.get("/aktualne_dane_zus", response_model=ZUSData, responses={
+    429: {"model": ZUSData, "description": "Forced refresh over the limit; the cached data and Retry-After"}})
+async def get_current_zus_data(request: Request, force_refresh: bool = False, rok: Optional[int] = None):
     """
     Returns current data about projected average salary and ZUS base. Uses cache.
-    Add ?force_refresh=true to update data from the ZUS website.
+    Add ?force_refresh=true to update data from the ZUS website, ?rok=YYYY for another year.
+    Forced refreshes are rate-limited per process; concurrent ones share one fetch, and callers over the
+    limit get 429 with the cached data in the body and a Retry-After header. Cached answers carry ETag and
+    Cache-Control headers.
 
     Zwraca aktualne dane o prognozowanym przeciętnym wynagrodzeniu i podstawie ZUS. Używa pamięci podręcznej.
-    Dodaj ?force_refresh=true, aby zaktualizować dane ze strony ZUS.
+    Dodaj ?force_refresh=true, aby zaktualizować dane ze strony ZUS, ?rok=RRRR dla innego roku.
+    Wymuszone odświeżenia mają limit w każdym procesie; równoczesne współdzielą jedno pobieranie, a wywołania
+    ponad limit dostają 429 z danymi z pamięci podręcznej w treści i nagłówkiem Retry-After. Odpowiedzi z pamięci
+    podręcznej mają nagłówki ETag i Cache-Control.
+    """
+    check_zus_year(rok)
+    if force_refresh:
+        outcome = await force_refresh_zus_data(year=rok)
+        # No need to raise an error here, just return the result (which might contain an error message)
+        # Nie ma potrzeby zgłaszania tutaj błędu, po prostu zwróć wynik (który może zawierać komunikat o błędzie)
+        if outcome.retry_after is None:
+            return outcome.data
+        # Over the limit: the cached data, marked as throttled / Ponad limitem: dane z pamięci podręcznej, oznaczone jako ograniczone
+        return Response(content=encode_json(outcome.data.model_dump(mode="json")), status_code=429,
+                        media_type=JSON_MEDIA_TYPE,
+                        headers={"Retry-After": str(math.ceil(outcome.retry_after)), "Cache-Control": "no-store"})
+    result = await fetch_and_cache_zus_data_async(year=rok)
+    return _cacheable_response(
+        request, _make_etag(zus_data_version(result)), encode_json(result.model_dump(mode="json")), result)
+
+# === Admin / Administracja ===
+# Bearer token for operator endpoints; they are disabled when it is not set
+# Token Bearer dla punktów końcowych operatora; są wyłączone, gdy nie jest ustawiony
+ZUS_ADMIN_TOKEN = os.environ.get("ZUS_ADMIN_TOKEN")
+
+
+def require_admin(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Dependency accepting only "Authorization: Bearer <ZUS_ADMIN_TOKEN>".
+    Zależność akceptująca tylko "Authorization: Bearer <ZUS_ADMIN_TOKEN>".
+    """
+    if not ZUS_ADMIN_TOKEN:
+        # Admin endpoints are disabled / Punkty końcowe administracyjne są wyłączone
+        raise HTTPException(status_code=403, detail="Punkty końcowe administracyjne są wyłączone (brak ZUS_ADMIN_TOKEN)")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode("utf-8"),
+                                                             ZUS_ADMIN_TOKEN.encode("utf-8")):
+        # Missing or wrong token / Brak tokenu lub błędny token
+        raise HTTPException(status_code=401, detail="Nieprawidłowy token administratora",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.post("/admin/odswiez_dane_zus", response_model=ZUSData, dependencies=[Depends(require_admin)])
+async def admin_refresh_zus_data(rok: Optional[int] = None):
+    """
+    Operator refresh of the ZUS data, not subject to the public force_refresh limit.
+    A fetch already in progress is joined.
+    Odświeżenie danych ZUS przez operatora, niepodlegające publicznemu limitowi force_refresh.
+    Do pobierania już w toku następuje dołączenie.
     """
-    result = fetch_and_cache_zus_data(force_refresh=force_refresh)
-    # No need to raise an error here, just return the result (which might contain an error message)
-    # Nie ma potrzeby zgłaszania tutaj błędu, po prostu zwróć wynik (który może zawierać komunikat o błędzie)
-    return result
+    check_zus_year(rok)
+    outcome = await force_refresh_zus_data(year=rok, privileged=True)
+    return outcome.data
@@ -0,0 +1,210 @@
+# Bucket lookup for histograms / Wyszukiwanie przedziałów histogramów
+import bisect
+# Metrics are updated from worker threads too / Metryki są aktualizowane także z wątków roboczych
+import threading
+# Library for time-related functions / Biblioteka do funkcji związanych z czasem
+import time
+# Context manager helper / Pomocnik menedżera kontekstu
+from contextlib import contextmanager
+# For type hinting / Do typowania
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# === Metrics / Metryki ===
+# Minimal in-process metrics rendered in the Prometheus text format, without extra dependencies.
+# Each worker process has its own values, so Prometheus should scrape every worker (or sum by instance).
+# Minimalne metryki w procesie renderowane w formacie tekstowym Prometheusa, bez dodatkowych zależności.
+# Każdy proces roboczy ma własne wartości, więc Prometheus powinien odpytywać każdy proces (lub sumować po instancji).
+
+# Content type of the text exposition format / Typ zawartości formatu tekstowego
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Buckets for whole requests, in seconds / Przedziały dla całych żądań, w sekundach
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets for calculation stages, in seconds / Przedziały dla etapów obliczeń, w sekundach
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.1, 1.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter / Licznik monotoniczny."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values]
+
+
+class Gauge(_Metric):
+    """
+    Gauge whose samples are read from a callback when rendering.
+    Wskaźnik, którego próbki są odczytywane z wywołania zwrotnego podczas renderowania.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]]):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._collect())]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram / Histogram skumulowany."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (counts per bucket plus +Inf, sum) / Dla każdego zestawu etykiet: (liczności przedziałów z +Inf, suma)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[labels] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observes the duration of the block / Rejestruje czas trwania bloku."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._values.items())
+        lines = self._header()
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together / Zbiór metryk renderowanych razem."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str],
+              collect: Callable[[], Iterable[Tuple[LabelValues, float]]]) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = REQUEST_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format / Wszystkie metryki w formacie tekstowym Prometheusa."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registry shared by all modules / Rejestr współdzielony przez wszystkie moduły
+REGISTRY = MetricsRegistry()
+
+# Time spent in each calculation stage / Czas spędzony w każdym etapie obliczeń
+STAGE_DURATION = REGISTRY.histogram(
+    "b2b_stage_duration_seconds", "Time spent in each calculation stage.", ("stage",), STAGE_BUCKETS)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware observing the duration of every HTTP request, labelled by route template and status.
+    Middleware ASGI rejestrujące czas trwania każdego żądania HTTP, z etykietami szablonu ścieżki i statusu.
+    """
+
+    def __init__(self, app, histogram: Optional[Histogram] = None):
+        self.app = app
+        self.histogram = histogram or REGISTRY.histogram(
+            "b2b_http_request_duration_seconds", "HTTP request duration.", ("method", "route", "status"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = ["500"]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route templates keep the label set small / Szablony ścieżek utrzymują mały zbiór etykiet
+            route = scope.get("route")
+            self.histogram.observe(time.perf_counter() - started, scope["method"],
+                                   getattr(route, "path", "unmatched"), status[0])
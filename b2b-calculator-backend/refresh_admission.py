@@ -0,0 +1,53 @@
+# For type hinting / Do typowania
+from typing import Dict, Hashable
+
+# === Refresh Admission / Dopuszczanie odświeżeń ===
+# Limits forced refreshes of one process: a token bucket caps the overall rate (with a small burst) and a
+# cooldown per key (year) rejects repeats of a refresh that has only just run. Times are monotonic seconds.
+# Ogranicza wymuszone odświeżenia jednego procesu: wiadro żetonów ogranicza ogólną częstotliwość (z niewielkim
+# zapasem), a czas ochłodzenia dla klucza (roku) odrzuca powtórzenia odświeżenia, które dopiero co się odbyło.
+# Czasy są sekundami monotonicznymi.
+
+
+class RefreshAdmission:
+    """Token bucket with a per-key cooldown / Wiadro żetonów z czasem ochłodzenia dla klucza."""
+
+    def __init__(self, burst: int, refill_interval: float, cooldown: float):
+        self.burst = burst  # Maximum stored tokens / Maksymalna liczba zgromadzonych żetonów
+        self.refill_interval = refill_interval  # Seconds to regain one token / Sekundy do odzyskania jednego żetonu
+        self.cooldown = cooldown  # Seconds between refreshes of one key / Sekundy między odświeżeniami jednego klucza
+        self._tokens = float(burst)
+        self._updated = None
+        self._last_refresh: Dict[Hashable, float] = {}
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) / self.refill_interval)
+        self._updated = now
+
+    def admit(self, key: Hashable, now: float) -> float:
+        """
+        Takes a token and starts the key's cooldown if both allow it.
+        Pobiera żeton i rozpoczyna czas ochłodzenia klucza, jeśli oba na to pozwalają.
+
+        Returns:
+            0.0 if admitted, otherwise seconds until a retry can be admitted.
+            0.0 jeśli dopuszczono, w przeciwnym razie sekundy do chwili, gdy ponowna próba może zostać dopuszczona.
+        """
+        self._refill(now)
+        wait = max(0.0, (1.0 - self._tokens) * self.refill_interval)
+        last = self._last_refresh.get(key)
+        if last is not None:
+            wait = max(wait, last + self.cooldown - now)
+        if wait > 0.0:
+            return wait
+        self._tokens -= 1.0
+        self._last_refresh[key] = now
+        return 0.0
+
+    def record(self, key: Hashable, now: float) -> None:
+        """
+        Starts the key's cooldown for a refresh admitted elsewhere, without taking a token.
+        Rozpoczyna czas ochłodzenia klucza dla odświeżenia dopuszczonego gdzie indziej, bez pobierania żetonu.
+        """
+        self._last_refresh[key] = now
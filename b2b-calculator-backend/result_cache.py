@@ -0,0 +1,48 @@
+# Ordered dict used as an LRU list / Uporządkowany słownik używany jako lista LRU
+from collections import OrderedDict
+# Library for time-related functions / Biblioteka do funkcji związanych z czasem
+import time
+# For type hinting / Do typowania
+from typing import Any, Hashable, Optional
+
+# === Result Cache / Pamięć podręczna wyników ===
+# Bounded LRU cache with a TTL. Keys must include the ZUS data version, so results calculated
+# from older ZUS data are never returned; the cache is also cleared when new data is loaded.
+# Ograniczona pamięć podręczna LRU z czasem życia. Klucze muszą zawierać wersję danych ZUS, więc wyniki
+# obliczone na starszych danych nigdy nie są zwracane; pamięć jest też czyszczona po wczytaniu nowych danych.
+
+
+class ResultCache:
+    """Bounded LRU/TTL cache / Ograniczona pamięć podręczna LRU/TTL."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries  # Maximum number of entries / Maksymalna liczba wpisów
+        self.ttl = ttl  # Entry Time To Live in seconds / Czas życia wpisu w sekundach
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns a cached value or None / Zwraca wartość z pamięci podręcznej lub None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        # Mark as recently used / Oznacz jako ostatnio używany
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used entry if full / Zapisuje wartość, usuwając najdawniej używany wpis, gdy brak miejsca."""
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all entries / Usuwa wszystkie wpisy."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,279 @@
+# Compact integer columns / Zwarte kolumny liczb całkowitych
+from array import array
+# Background builds; the CPU-bound build runs in a separate process so it does not hold the server's GIL
+# Budowanie w tle; obliczenia budowania działają w osobnym procesie, aby nie trzymać GIL serwera
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+# Table versions / Wersje tablic
+import hashlib
+# Library for the table header / Biblioteka do nagłówka tablicy
+import json
+# Structured, leveled logging / Strukturalne logowanie z poziomami
+import logging
+# Spawned build process / Uruchamiany proces budowania
+import multiprocessing
+# Memory-mapped tables shared by all workers / Tablice mapowane w pamięci współdzielone przez wszystkie procesy robocze
+import mmap
+# Library for paths and environment variables / Biblioteka do ścieżek i zmiennych środowiskowych
+import os
+# Header length / Długość nagłówka
+import struct
+# Byte order check / Sprawdzenie kolejności bajtów
+import sys
+# Temporary file for atomic writes / Plik tymczasowy do atomowego zapisu
+import tempfile
+# Build timing / Pomiar czasu budowania
+import time
+# For type hinting / Do typowania
+from typing import Dict, Optional, Tuple
+
+# Calculation steps shared with the batch engine / Kroki obliczeń wspólne z silnikiem wsadowym
+from tax_engine import BatchResult, compute_health, compute_pit, effective_zus_base, zus_spoleczne_for_year
+# Compiled rules / Skompilowane reguły
+from tax_rules import FORMY_OPODATKOWANIA, STRATEGY_ARGUMENT, rule_packs_for_year
+# ZUS data model / Model danych ZUS
+from zus_data_fetcher import ZUSData
+
+logger = logging.getLogger(__name__)
+
+# === Result Table / Tablica wyników ===
+# Precomputed health contribution and PIT (before the discount) in grosze for one year and ZUS base, for every
+# integer-PLN amount from 0 to RESULT_TABLE_MAX_PLN. Each strategy depends on a single amount (revenue or
+# revenue - costs, see STRATEGY_ARGUMENT), so one column per (form, sickness flag, strategy) covers every
+# combination of integer income and costs. Social ZUS, VAT, the discount and the totals are cheap and are applied
+# at lookup with the same float operations as calculate_batch, so amounts are identical to a full calculation.
+# The table is written once to a file and memory-mapped read-only, so all workers share the same physical pages.
+# Wcześniej obliczona składka zdrowotna i PIT (przed zniżką) w groszach dla jednego roku i podstawy ZUS, dla każdej
+# kwoty w pełnych złotych od 0 do RESULT_TABLE_MAX_PLN. Każda strategia zależy od jednej kwoty (przychodu lub
+# przychodu - kosztów, patrz STRATEGY_ARGUMENT), więc jedna kolumna na (formę, flagę chorobowego, strategię) obejmuje
+# każdą kombinację całkowitego przychodu i kosztów. ZUS społeczny, VAT, zniżka i sumy są tanie i są stosowane przy
+# wyszukaniu tymi samymi operacjami zmiennoprzecinkowymi co w calculate_batch, więc kwoty są identyczne z pełnym
+# obliczeniem. Tablica jest zapisywana raz do pliku i mapowana w pamięci tylko do odczytu, więc wszystkie procesy
+# robocze współdzielą te same strony fizyczne.
+
+# === Configuration / Konfiguracja ===
+# Highest revenue (and revenue - costs) in the table, in PLN / Najwyższy przychód (i przychód - koszty) w tablicy, w PLN
+RESULT_TABLE_MAX_PLN = 100000
+# Seconds before a failed build of a version is tried again / Sekundy przed ponowną próbą nieudanego budowania wersji
+RESULT_TABLE_RETRY_SECONDS = 60
+# Directory shared by all workers / Katalog współdzielony przez wszystkie procesy robocze
+RESULT_TABLE_DIR = os.environ.get(
+    "RESULT_TABLE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "result_tables"))
+
+_MAGIC = b"B2BTBL01"
+_HEADER_LENGTH = struct.Struct("<I")
+# Data starts at a multiple of this / Dane zaczynają się od wielokrotności tej wartości
+_ALIGNMENT = 8
+# Amounts stored per column / Kwoty zapisywane w każdej kolumnie
+_AMOUNTS = ("health", "pit")
+
+
+def table_version(zus_info: ZUSData) -> str:
+    """
+    Identifies the table for ZUS data. Only the fields the amounts depend on are used, so a new error message
+    alone does not cause a rebuild.
+    Identyfikuje tablicę dla danych ZUS. Używane są tylko pola, od których zależą kwoty, więc sam nowy komunikat
+    o błędzie nie powoduje przebudowania.
+    """
+    raw = repr((zus_info.year, zus_info.zus_base, zus_info.baseline_version))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def build_result_table(path: str, zus_info: ZUSData, max_pln: int = RESULT_TABLE_MAX_PLN) -> None:
+    """
+    Computes the table for the ZUS data and writes it atomically to path.
+    Oblicza tablicę dla danych ZUS i zapisuje ją atomowo do path.
+    """
+    packs = rule_packs_for_year(zus_info.year)
+    cells = array("i")
+    columns = []
+    for forma in FORMY_OPODATKOWANIA:
+        rules = packs[forma]
+        for chorobowe in (False, True):
+            zus_total = zus_spoleczne_for_year(zus_info.zus_base, chorobowe, zus_info.year).total
+            for amount, strategy in zip(_AMOUNTS, (rules.health_strategy, rules.pit_strategy)):
+                argument = STRATEGY_ARGUMENT[strategy]
+                # The amount is passed as revenue with zero costs; revenue - costs is exact for integer PLN
+                # Kwota jest przekazywana jako przychód z zerowymi kosztami; przychód - koszty jest dokładny dla pełnych złotych
+                points = range(max_pln + 1) if argument is not None else range(1)
+                if amount == "health":
+                    values = [compute_health(rules, float(point), 0.0, zus_total) for point in points]
+                else:
+                    values = [compute_pit(rules, float(point), 0.0, zus_total, False) for point in points]
+                columns.append([forma, chorobowe, amount, argument, len(cells), len(values)])
+                cells.extend(round(value * 100) for value in values)
+
+    header = json.dumps({
+        "table_version": table_version(zus_info),
+        "max_pln": max_pln,
+        "byteorder": sys.byteorder,
+        "columns": columns,
+    }).encode("utf-8")
+    padding = -(len(_MAGIC) + _HEADER_LENGTH.size + len(header)) % _ALIGNMENT
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as target:
+            target.write(_MAGIC + _HEADER_LENGTH.pack(len(header) + padding) + header + b" " * padding)
+            cells.tofile(target)
+        # Other workers see either no file or the complete one / Inne procesy widzą brak pliku albo plik kompletny
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class ResultTable:
+    """
+    Read-only, memory-mapped table for one table version (year, ZUS base and baseline).
+    Tablica tylko do odczytu, mapowana w pamięci, dla jednej wersji tablicy (rok, podstawa ZUS i dane bazowe).
+    """
+
+    def __init__(self, path: str, zus_info: ZUSData):
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        prefix = len(_MAGIC) + _HEADER_LENGTH.size
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"Not a result table: {path}")
+        (header_length,) = _HEADER_LENGTH.unpack(self._map[len(_MAGIC):prefix])
+        header = json.loads(self._map[prefix:prefix + header_length])
+        self.version: str = header["table_version"]
+        if self.version != table_version(zus_info) or header["byteorder"] != sys.byteorder:
+            raise ValueError(f"Result table does not match the ZUS data: {path}")
+        self.max_pln: int = header["max_pln"]
+        cells = memoryview(self._map)[prefix + header_length:].cast("i")
+
+        self._zus_base_missing = zus_info.zus_base is None
+        self._packs = rule_packs_for_year(zus_info.year)
+        self._effective_base = effective_zus_base(zus_info.zus_base)
+        self._zus_variants = {flag: zus_spoleczne_for_year(zus_info.zus_base, flag, zus_info.year)
+                              for flag in (False, True)}
+        # (form, sickness flag, amount) -> (argument, cells) / (forma, flaga chorobowego, kwota) -> (argument, komórki)
+        self._columns: Dict[Tuple[str, bool, str], Tuple[Optional[str], memoryview]] = {
+            (forma, chorobowe, amount): (argument, cells[offset:offset + length])
+            for forma, chorobowe, amount, argument, offset, length in header["columns"]}
+
+    def _amount(self, forma: str, chorobowe: bool, amount: str, przychod: int, dochod: int) -> float:
+        argument, column = self._columns[(forma, chorobowe, amount)]
+        if argument is None:
+            return column[0] / 100
+        # Integer grosze divided by 100 is the same float as round(value, 2)
+        # Całkowite grosze podzielone przez 100 to ta sama liczba co round(wartość, 2)
+        return column[przychod if argument == "przychod" else dochod] / 100
+
+    def lookup(self, income: float, costs: float, forma_opodatkowania: str, stawka_vat: float,
+               has_tax_discount: bool, platnik_chorobowe: bool) -> Optional[BatchResult]:
+        """
+        Returns a one-row BatchResult, or None if the input is outside the grid. The row must already be
+        validated with validate_row.
+        Zwraca jednowierszowy BatchResult lub None, jeśli wejście jest poza siatką. Wiersz musi być wcześniej
+        zwalidowany przez validate_row.
+        """
+        if not (float(income).is_integer() and float(costs).is_integer()):
+            return None
+        przychod = int(income)
+        dochod = przychod - int(costs)
+        if not (0 <= dochod and przychod <= self.max_pln):
+            return None
+
+        chorobowe = bool(platnik_chorobowe)
+        rules = self._packs[forma_opodatkowania]
+        zus = self._zus_variants[chorobowe]
+        health = self._amount(forma_opodatkowania, chorobowe, "health", przychod, dochod)
+        pit = self._amount(forma_opodatkowania, chorobowe, "pit", przychod, dochod)
+        # Same operations as compute_pit and calculate_batch / Te same operacje co w compute_pit i calculate_batch
+        if has_tax_discount:
+            pit *= rules.pit_discount_factor
+        total = round(zus.total + health + pit, 2)
+        return BatchResult(
+            zus_base=self._effective_base,
+            zus_spoleczne_details=[zus.details],
+            zus_spoleczne_total=[zus.total],
+            skladka_zdrowotna=[health],
+            podatek_pit=[pit],
+            vat=[round(income * (stawka_vat / 100), 2)],
+            calkowite_obciazenie=[total],
+            dochod_netto=[round(income - costs - total, 2)],
+            ostrzezenia=[rules.warnings[(self._zus_base_missing, bool(has_tax_discount))]],
+        )
+
+
+class ResultTableManager:
+    """
+    Keeps the table for the current ZUS data of this worker. A lookup with a new table version starts a
+    background build in a child process (or opens the file another worker already built) and falls back until
+    it is ready.
+    Przechowuje tablicę dla bieżących danych ZUS tego procesu roboczego. Wyszukanie z nową wersją tablicy
+    rozpoczyna budowanie w tle w procesie potomnym (lub otwiera plik zbudowany już przez inny proces) i do czasu
+    gotowości zwraca None.
+    """
+
+    def __init__(self, directory: str = RESULT_TABLE_DIR, max_pln: int = RESULT_TABLE_MAX_PLN):
+        self.directory = directory
+        self.max_pln = max_pln
+        self._table: Optional[ResultTable] = None
+        # Version being built / Wersja w trakcie budowania
+        self._pending: Optional[str] = None
+        # Last failed version and the monotonic time it may be retried
+        # Ostatnia nieudana wersja i czas monotoniczny, od którego można ją ponowić
+        self._failed: Optional[Tuple[str, float]] = None
+        # One build at a time; the thread only waits for the build process and opens the file
+        # Jedno budowanie naraz; wątek tylko czeka na proces budowania i otwiera plik
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-table")
+        self._builder: Optional[ProcessPoolExecutor] = None
+
+    def lookup(self, zus_info: ZUSData, income: float, costs: float, forma_opodatkowania: str, stawka_vat: float,
+               has_tax_discount: bool, platnik_chorobowe: bool) -> Optional[BatchResult]:
+        """
+        Answers from the table for this ZUS data, or returns None (not ready or outside the grid).
+        Odpowiada z tablicy dla tych danych ZUS lub zwraca None (niegotowa lub poza siatką).
+        """
+        version = table_version(zus_info)
+        table = self._table
+        if table is None or table.version != version:
+            failed = self._failed
+            retry_pending = failed is not None and failed[0] == version and time.monotonic() < failed[1]
+            if version != self._pending and not retry_pending:
+                self._pending = version
+                self._executor.submit(self._load, zus_info, version)
+            return None
+        return table.lookup(income, costs, forma_opodatkowania, stawka_vat, has_tax_discount, platnik_chorobowe)
+
+    def _load(self, zus_info: ZUSData, version: str) -> None:
+        """Opens the table for a version, building it first if needed / Otwiera tablicę dla wersji, w razie potrzeby najpierw ją budując."""
+        path = os.path.join(self.directory, f"{version}.tbl")
+        try:
+            try:
+                table = ResultTable(path, zus_info)
+            except (OSError, ValueError, KeyError):
+                started = time.perf_counter()
+                if self._builder is None:
+                    # spawn: forking a process with running threads is unsafe / spawn: fork procesu z działającymi wątkami jest niebezpieczny
+                    self._builder = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+                self._builder.submit(build_result_table, path, zus_info, self.max_pln).result()
+                table = ResultTable(path, zus_info)
+                logger.info("Built the result table", extra={
+                    "table_version": version, "seconds": round(time.perf_counter() - started, 2)})
+            self._table = table
+            self._failed = None
+            self._remove_other_tables(path)
+        except Exception as e:
+            # Lookups fall back to the full calculation until the retry / Wyszukania przechodzą do pełnego obliczenia do czasu ponowienia
+            logger.error("Error building the result table", extra={"table_version": version, "error": str(e)})
+            self._failed = (version, time.monotonic() + RESULT_TABLE_RETRY_SECONDS)
+        finally:
+            if self._pending == version:
+                self._pending = None
+
+    def _remove_other_tables(self, keep: str) -> None:
+        """
+        Deletes tables of older ZUS data; workers still mapping one keep their pages until they switch.
+        Usuwa tablice starszych danych ZUS; procesy, które wciąż mapują którąś z nich, zachowują strony do czasu przełączenia.
+        """
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tbl") and path != keep:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
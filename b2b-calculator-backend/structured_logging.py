@@ -0,0 +1,48 @@
+# Library for JSON encoding / Biblioteka do kodowania JSON
+import json
+# Standard logging / Standardowe logowanie
+import logging
+# For type hinting / Do typowania
+from typing import Optional
+
+# === Structured Logging / Logowanie strukturalne ===
+# One JSON object per line with the level, logger, message and any fields passed with extra={...}.
+# Jeden obiekt JSON na linię z poziomem, loggerem, komunikatem i polami przekazanymi przez extra={...}.
+
+# Attributes every LogRecord has; anything else came from extra / Atrybuty każdego LogRecord; pozostałe pochodzą z extra
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON / Formatuje wpisy jako jednoliniowy JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Sends application logs as JSON to stderr, unless the root logger is already configured.
+    Wysyła logi aplikacji jako JSON na stderr, chyba że główny logger jest już skonfigurowany.
+
+    Args:
+        level: Level name such as "INFO" or "DEBUG" (cache hits are logged at DEBUG). / Nazwa poziomu, np. "INFO" lub "DEBUG" (trafienia pamięci podręcznej są logowane na DEBUG).
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    root.addHandler(handler)
+    root.setLevel((level or "INFO").upper())
@@ -0,0 +1,226 @@
+# Stage timings / Pomiar czasu etapów
+import time
+# For type hinting / Do typowania
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Compiled per-year/per-form rules / Skompilowane reguły dla roku i formy
+from tax_rules import FORMY_OPODATKOWANIA, TaxRulePack, rule_packs_for_year
+
+# === Tax Engine / Silnik podatkowy ===
+# Pure, column-oriented calculation of social ZUS, health contribution, PIT and VAT.
+# Czyste, kolumnowe obliczenia ZUS społecznego, składki zdrowotnej, PIT i VAT.
+# The engine knows nothing about HTTP or Pydantic: it takes columns (lists, array.array, NumPy arrays...)
+# and returns columns, so a whole batch is computed in one pass.
+# Silnik nic nie wie o HTTP ani Pydantic: przyjmuje kolumny (listy, array.array, tablice NumPy...)
+# i zwraca kolumny, więc cała partia jest liczona w jednym przebiegu.
+
+# === Validation messages / Komunikaty walidacji ===
+ERROR_NEGATIVE_INCOME = "Dochód (przychód) nie może być ujemny"  # Income cannot be negative
+ERROR_NEGATIVE_COSTS = "Koszty nie mogą być ujemne"  # Costs cannot be negative
+ERROR_INVALID_FORMA = "Nieprawidłowa forma opodatkowania"  # Invalid tax form
+
+# === Result Models / Modele wyników ===
+
+
+class ZusSpoleczne(NamedTuple):
+    """Social ZUS contributions for one base / Składki ZUS społeczne dla jednej podstawy."""
+    # Components as (name, percent, base, amount) / Składowe jako (nazwa, procent, podstawa, kwota)
+    details: Tuple[Tuple[str, float, float, float], ...]
+    total: float  # Total social ZUS / Suma ZUS społecznego
+
+
+class BatchResult(NamedTuple):
+    """Column-oriented calculation result / Wynik obliczeń w układzie kolumnowym."""
+    # Effective ZUS base used for the calculation / Efektywna podstawa ZUS użyta do obliczeń
+    zus_base: float
+    # Per-row social ZUS components (shared tuples) / Składowe ZUS społecznego dla każdego wiersza (współdzielone krotki)
+    zus_spoleczne_details: List[Tuple[Tuple[str, float, float, float], ...]]
+    zus_spoleczne_total: List[float]  # Total social ZUS / Suma ZUS społecznego
+    skladka_zdrowotna: List[float]  # Health contribution / Składka zdrowotna
+    podatek_pit: List[float]  # Income tax (PIT) / Podatek dochodowy (PIT)
+    vat: List[float]  # VAT amount / Kwota VAT
+    calkowite_obciazenie: List[float]  # Total burden / Całkowite obciążenie
+    dochod_netto: List[float]  # Net income / Dochód netto
+    ostrzezenia: List[Tuple[str, ...]]  # Warnings / Ostrzeżenia
+
+# === Validation / Walidacja ===
+
+
+def validate_row(income: float, costs: float, forma_opodatkowania: str) -> Optional[str]:
+    """
+    Returns an error message for an invalid row, or None if the row can be calculated.
+    Zwraca komunikat błędu dla nieprawidłowego wiersza lub None, jeśli wiersz można obliczyć.
+    """
+    if income < 0:
+        return ERROR_NEGATIVE_INCOME
+    if costs < 0:
+        return ERROR_NEGATIVE_COSTS
+    if forma_opodatkowania not in FORMY_OPODATKOWANIA:
+        return ERROR_INVALID_FORMA
+    return None
+
+# === Calculation Steps / Kroki obliczeń ===
+
+
+def compute_zus_spoleczne(rules: TaxRulePack, zus_base: float, platnik_chorobowe: bool) -> ZusSpoleczne:
+    """
+    Calculates social ZUS contributions for a given base.
+    Oblicza składki ZUS społeczne dla danej podstawy.
+    """
+    if zus_base <= 0:
+        return ZusSpoleczne(details=(), total=0.0)
+
+    rates = rules.zus_spoleczne_rates
+    # Add voluntary sickness contribution if applicable / Dodaj dobrowolną składkę chorobową, jeśli dotyczy
+    if platnik_chorobowe:
+        rates = rates + (rules.zus_chorobowe_rate,)
+
+    details = []
+    total = 0.0
+    for name, rate in rates:
+        amount = round(zus_base * rate, 2)
+        details.append((name, rate * 100, zus_base, amount))
+        total += amount
+    return ZusSpoleczne(details=tuple(details), total=round(total, 2))
+
+
+def effective_zus_base(zus_base: Optional[float]) -> float:
+    """ZUS base used for calculations; a missing base counts as zero / Podstawa ZUS używana w obliczeniach; brak podstawy liczy się jako zero."""
+    return 0.0 if zus_base is None else zus_base
+
+
+def zus_spoleczne_for_year(zus_base: Optional[float], platnik_chorobowe: bool, year: int) -> ZusSpoleczne:
+    """
+    Social ZUS for the ZUS data of a year. The rates are shared by all forms of a year, so any pack of the year is used.
+    ZUS społeczny dla danych ZUS z danego roku. Stawki są wspólne dla wszystkich form w roku, więc używany jest dowolny pakiet roku.
+    """
+    year_rules = rule_packs_for_year(year)[FORMY_OPODATKOWANIA[0]]
+    return compute_zus_spoleczne(year_rules, effective_zus_base(zus_base), platnik_chorobowe)
+
+
+def compute_health(rules: TaxRulePack, income: float, costs: float, zus_total: float) -> float:
+    """
+    Calculates the (simplified) health contribution with the pack's strategy.
+    Oblicza (uproszczoną) składkę zdrowotną strategią z pakietu reguł.
+    """
+    return max(0.0, round(rules.health_strategy(rules, income, costs, zus_total), 2))
+
+
+def compute_pit(rules: TaxRulePack, income: float, costs: float, zus_total: float, has_tax_discount: bool) -> float:
+    """
+    Calculates the (simplified) income tax with the pack's strategy.
+    Oblicza (uproszczony) podatek dochodowy strategią z pakietu reguł.
+    """
+    pit_tax = round(max(0.0, rules.pit_strategy(rules, income, costs, zus_total)), 2)
+    # Simplified discount on the tax amount / Uproszczona zniżka na kwotę podatku
+    if has_tax_discount:
+        pit_tax *= rules.pit_discount_factor
+    return pit_tax
+
+
+def net_income_model(rules: TaxRulePack, income: float, costs: float, zus_total: float, has_tax_discount: bool) -> float:
+    """
+    Net income without rounding to grosze. Linear in income between the pack's breakpoints;
+    used by the analytic solvers. calculate_batch stays the source of truth for amounts.
+
+    Dochód netto bez zaokrąglania do groszy. Liniowy względem przychodu między punktami załamania pakietu;
+    używany przez solwery analityczne. calculate_batch pozostaje źródłem prawdy dla kwot.
+    """
+    health = max(0.0, rules.health_strategy(rules, income, costs, zus_total))
+    pit = max(0.0, rules.pit_strategy(rules, income, costs, zus_total))
+    if has_tax_discount:
+        pit *= rules.pit_discount_factor
+    return income - costs - zus_total - health - pit
+
+
+def linear_segment(function: Callable[[float], float], start: float, end: Optional[float]) -> Tuple[float, float]:
+    """
+    Returns (slope, intercept) of a function that is linear on (start, end), from two interior samples.
+    Zwraca (nachylenie, wyraz wolny) funkcji liniowej na (start, end), z dwóch próbek wewnętrznych.
+    """
+    if end is None:
+        first, second = start + 1000.0, start + 2000.0
+    else:
+        first, second = start + (end - start) / 3, start + 2 * (end - start) / 3
+    value_first, value_second = function(first), function(second)
+    slope = (value_second - value_first) / (second - first)
+    return slope, value_first - slope * first
+
+# === Batch Calculation / Obliczenia wsadowe ===
+
+
+def calculate_batch(
+    income: Sequence[float],
+    costs: Sequence[float],
+    forma_opodatkowania: Sequence[str],
+    stawka_vat: Sequence[float],
+    has_tax_discount: Sequence[bool],
+    platnik_chorobowe: Sequence[bool],
+    zus_base: Optional[float],
+    year: int,
+    timings: Optional[Dict[str, float]] = None,
+) -> BatchResult:
+    """
+    Calculates a whole batch of rows at once. Rows must already be validated with validate_row.
+    Oblicza całą partię wierszy naraz. Wiersze muszą być wcześniej zwalidowane przez validate_row.
+
+    Args:
+        income, costs, forma_opodatkowania, stawka_vat, has_tax_discount, platnik_chorobowe:
+            Equal-length input columns. / Kolumny wejściowe o równej długości.
+        zus_base: ZUS base from ZUSData (None if fetching failed). / Podstawa ZUS z ZUSData (None, jeśli pobieranie się nie powiodło).
+        year: Year of the ZUS data, selects the rule packs. / Rok danych ZUS, wybiera pakiety reguł.
+        timings: If given, seconds spent in the zus_spoleczne, skladka_zdrowotna and podatek_pit stages are added to it.
+            Jeśli podany, dodawane są do niego sekundy spędzone w etapach zus_spoleczne, skladka_zdrowotna i podatek_pit.
+
+    Returns:
+        BatchResult with output columns in input order. / BatchResult z kolumnami wyjściowymi w kolejności wejścia.
+    """
+    started = time.perf_counter()
+    zus_base_missing = zus_base is None
+    effective_base = effective_zus_base(zus_base)
+    packs = rule_packs_for_year(year)
+    # One dispatch per row / Jedno rozstrzygnięcie na wiersz
+    rules_rows = [packs[forma] for forma in forma_opodatkowania]
+
+    # Social ZUS only depends on the sickness flag, so compute both variants once
+    # ZUS społeczny zależy tylko od flagi chorobowego, więc obliczamy oba warianty raz
+    zus_variants = {flag: zus_spoleczne_for_year(zus_base, flag, year) for flag in (True, False)}
+    zus_rows = [zus_variants[bool(flag)] for flag in platnik_chorobowe]
+    zus_totals = [row.total for row in zus_rows]
+    zus_done = time.perf_counter()
+
+    health = [compute_health(rules, inc, cost, zus_total)
+              for rules, inc, cost, zus_total in zip(rules_rows, income, costs, zus_totals)]
+    health_done = time.perf_counter()
+    pit = [compute_pit(rules, inc, cost, zus_total, bool(discount))
+           for rules, inc, cost, zus_total, discount
+           in zip(rules_rows, income, costs, zus_totals, has_tax_discount)]
+    if timings is not None:
+        # Rule pack dispatch is counted with social ZUS / Wybór pakietu reguł jest liczony razem z ZUS społecznym
+        pit_done = time.perf_counter()
+        for stage, seconds in (("zus_spoleczne", zus_done - started), ("skladka_zdrowotna", health_done - zus_done),
+                               ("podatek_pit", pit_done - health_done)):
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    # VAT does not affect other calculations / VAT nie wpływa na inne obliczenia
+    vat = [round(inc * (rate / 100), 2) for inc, rate in zip(income, stawka_vat)]
+    # Total monthly burden (excluding VAT) / Całkowite miesięczne obciążenie (bez VAT)
+    total = [round(zus_total + health_row + pit_row, 2)
+             for zus_total, health_row, pit_row in zip(zus_totals, health, pit)]
+    # Net income ('take-home' pay) / Dochód netto ('na rękę')
+    net = [round(inc - cost - total_row, 2)
+           for inc, cost, total_row in zip(income, costs, total)]
+    # Precompiled warning texts / Wcześniej skompilowane treści ostrzeżeń
+    warnings = [rules.warnings[(zus_base_missing, bool(discount))]
+                for rules, discount in zip(rules_rows, has_tax_discount)]
+
+    return BatchResult(
+        zus_base=effective_base,
+        zus_spoleczne_details=[row.details for row in zus_rows],
+        zus_spoleczne_total=zus_totals,
+        skladka_zdrowotna=health,
+        podatek_pit=pit,
+        vat=vat,
+        calkowite_obciazenie=total,
+        dochod_netto=net,
+        ostrzezenia=warnings,
+    )
@@ -0,0 +1,283 @@
+# Read-only view of a dict / Widok słownika tylko do odczytu
+from types import MappingProxyType
+# For type hinting / Do typowania
+from typing import Callable, Dict, Mapping, NamedTuple, Tuple
+
+# === Tax Rule Packs / Pakiety reguł podatkowych ===
+# Immutable rule objects indexed by (year, tax form), compiled once at import time. A new tax year
+# is a new entry in TAX_YEAR_PARAMETERS, not new branches in the calculation code.
+# Niezmienne obiekty reguł indeksowane przez (rok, forma opodatkowania), kompilowane raz przy imporcie.
+# Nowy rok podatkowy to nowy wpis w TAX_YEAR_PARAMETERS, a nie nowe gałęzie w kodzie obliczeń.
+
+# === Warning Codes / Kody ostrzeżeń ===
+WARNING_NO_ZUS_BASE = "ZUS_BASE_MISSING"
+WARNING_HEALTH_SKALA = "HEALTH_SKALA_SIMPLIFIED"
+WARNING_HEALTH_LINIOWY = "HEALTH_LINIOWY_SIMPLIFIED"
+WARNING_HEALTH_RYCZALT = "HEALTH_RYCZALT_PLACEHOLDER"
+WARNING_PIT_RYCZALT = "PIT_RYCZALT_SIMPLIFIED"
+WARNING_PIT_LINIOWY = "PIT_LINIOWY_SIMPLIFIED"
+WARNING_PIT_SKALA = "PIT_SKALA_SIMPLIFIED"
+WARNING_TAX_DISCOUNT = "PIT_DISCOUNT_SIMPLIFIED"
+WARNING_PIT_SKALA_CUMULATIVE = "PIT_SKALA_CUMULATIVE"
+
+# Full warning texts returned to users / Pełne treści ostrzeżeń zwracane użytkownikom
+WARNING_MESSAGES = {
+    # Failed to fetch current ZUS base. Using default/zero values.
+    WARNING_NO_ZUS_BASE: "Nie udało się pobrać aktualnej podstawy ZUS. Użyto wartości domyślnych/zerowych.",
+    # Health contribution (scale) calculated using simplified 9% rate of income (revenue - costs - social ZUS).
+    WARNING_HEALTH_SKALA: "Składka zdrowotna (skala) obliczona wg uproszczonej stawki 9% od dochodu (przychód - koszty - ZUS społ.).",
+    # Health contribution (flat) calculated using simplified 4.9% rate of income (revenue - costs - social ZUS).
+    WARNING_HEALTH_LINIOWY: "Składka zdrowotna (liniowy) obliczona wg uproszczonej stawki 4.9% od dochodu (przychód - koszty - ZUS społ.).",
+    # Health contribution (lump sum) is a temporary value. Requires implementation of income thresholds.
+    WARNING_HEALTH_RYCZALT: "Składka zdrowotna (ryczałt) jest wartością tymczasową. Wymaga implementacji progów dochodowych.",
+    # PIT (lump sum) calculated from revenue minus only social ZUS (simplification).
+    WARNING_PIT_RYCZALT: "PIT (ryczałt) obliczony od przychodu pomniejszonego tylko o ZUS społeczny (uproszczenie).",
+    # PIT (flat) calculated from income (revenue - costs - social ZUS) without health contribution deduction (simplification).
+    WARNING_PIT_LINIOWY: "PIT (liniowy) obliczony od dochodu (przychód - koszty - ZUS społ.) bez odliczenia składki zdrowotnej (uproszczenie).",
+    # PIT (scale) calculated simplistically (without full consideration of tax-free/reducing amount and annual thresholds).
+    WARNING_PIT_SKALA: "PIT (skala) obliczony w sposób uproszczony (bez pełnego uwzględnienia kwoty wolnej/zmniejszającej i progów rocznych).",
+    # Applied simplified 50% PIT discount on the tax amount.
+    WARNING_TAX_DISCOUNT: "Zastosowano uproszczoną zniżkę PIT 50% na kwotę podatku.",
+    # PIT (scale) calculated as cumulative monthly advances from the start of the year, without the annual return settlement.
+    WARNING_PIT_SKALA_CUMULATIVE: "PIT (skala) obliczony jako zaliczki narastająco od początku roku, bez rozliczenia rocznego w zeznaniu.",
+}
+# Code of each warning text, for compact responses / Kod każdej treści ostrzeżenia, dla zwartych odpowiedzi
+WARNING_CODES_BY_MESSAGE = {message: code for code, message in WARNING_MESSAGES.items()}
+
+# === Strategies / Strategie ===
+# Each strategy takes (rules, income, costs, zus_total) and returns an unrounded amount.
+# Każda strategia przyjmuje (reguły, przychód, koszty, zus_total) i zwraca niezaokrągloną kwotę.
+
+
+def health_from_income(rules: "TaxRulePack", income: float, costs: float, zus_total: float) -> float:
+    """Health = rate x (revenue - costs - social ZUS) / Zdrowotna = stawka x (przychód - koszty - ZUS społ.)."""
+    return max(0.0, income - costs - zus_total) * rules.health_rate
+
+
+def health_flat(rules: "TaxRulePack", income: float, costs: float, zus_total: float) -> float:
+    """Fixed health amount (lump sum placeholder) / Stała kwota zdrowotnej (wartość zastępcza dla ryczałtu)."""
+    return rules.health_flat_amount
+
+
+def pit_from_revenue(rules: "TaxRulePack", income: float, costs: float, zus_total: float) -> float:
+    """PIT = rate x (revenue - social ZUS) / PIT = stawka x (przychód - ZUS społ.)."""
+    return max(0.0, income - zus_total) * rules.pit_rate
+
+
+def pit_from_income(rules: "TaxRulePack", income: float, costs: float, zus_total: float) -> float:
+    """PIT = rate x (revenue - costs - social ZUS) / PIT = stawka x (przychód - koszty - ZUS społ.)."""
+    return max(0.0, income - costs - zus_total) * rules.pit_rate
+
+
+def pit_progressive(rules: "TaxRulePack", income: float, costs: float, zus_total: float) -> float:
+    """
+    Tax scale with the annual bracket estimated from one month (x 12).
+    Skala podatkowa z rocznym progiem szacowanym na podstawie jednego miesiąca (x 12).
+    """
+    pit_base = max(0.0, income - costs - zus_total)
+    if pit_base * 12 <= rules.pit_annual_threshold:
+        return max(0.0, (pit_base * rules.pit_rate) - rules.pit_reducing_amount)
+    return pit_base * rules.pit_rate_high
+
+
+# === Strategy Breakpoints / Punkty załamania strategii ===
+# Incomes where a strategy changes slope (or jumps), for given costs and social ZUS. Between these points every
+# strategy is linear in income, which the comparison and inverse solvers rely on.
+# Przychody, przy których strategia zmienia nachylenie (lub skacze), dla danych kosztów i ZUS społ. Pomiędzy tymi
+# punktami każda strategia jest liniowa względem przychodu, na czym opierają się solwery porównania i odwrotny.
+
+
+def _no_breakpoints(rules: "TaxRulePack", costs: float, zus_total: float) -> Tuple[float, ...]:
+    return ()
+
+
+def _revenue_breakpoints(rules: "TaxRulePack", costs: float, zus_total: float) -> Tuple[float, ...]:
+    # Revenue minus ZUS reaches zero / Przychód minus ZUS osiąga zero
+    return (zus_total,)
+
+
+def _income_breakpoints(rules: "TaxRulePack", costs: float, zus_total: float) -> Tuple[float, ...]:
+    # Income (revenue - costs - ZUS) reaches zero / Dochód (przychód - koszty - ZUS) osiąga zero
+    return (costs + zus_total,)
+
+
+def _progressive_breakpoints(rules: "TaxRulePack", costs: float, zus_total: float) -> Tuple[float, ...]:
+    start = costs + zus_total
+    return (
+        start,
+        # Tax exceeds the reducing amount / Podatek przekracza kwotę zmniejszającą
+        start + rules.pit_reducing_amount / rules.pit_rate,
+        # Estimated annual income crosses the threshold (tax jumps) / Szacowany roczny dochód przekracza próg (podatek skacze)
+        start + rules.pit_annual_threshold / 12,
+    )
+
+
+STRATEGY_BREAKPOINTS = {
+    health_from_income: _income_breakpoints,
+    health_flat: _no_breakpoints,
+    pit_from_revenue: _revenue_breakpoints,
+    pit_from_income: _income_breakpoints,
+    pit_progressive: _progressive_breakpoints,
+}
+
+
+# The amount each strategy reads from (income, costs): "przychod" (revenue), "dochod" (revenue - costs) or None
+# (constant). The result table keys precomputed amounts on it.
+# Kwota, którą każda strategia odczytuje z (przychód, koszty): "przychod" (przychód), "dochod" (przychód - koszty)
+# lub None (stała). Tablica wyników indeksuje nią wcześniej obliczone kwoty.
+STRATEGY_ARGUMENT = {
+    health_from_income: "dochod",
+    health_flat: None,
+    pit_from_revenue: "przychod",
+    pit_from_income: "dochod",
+    pit_progressive: "dochod",
+}
+
+
+def income_breakpoints(rules: "TaxRulePack", costs: float, zus_total: float) -> Tuple[float, ...]:
+    """
+    Returns the incomes where the pack's health or PIT amount is not linear.
+    Zwraca przychody, przy których składka zdrowotna lub PIT pakietu nie jest liniowa.
+    """
+    return (STRATEGY_BREAKPOINTS[rules.health_strategy](rules, costs, zus_total)
+            + STRATEGY_BREAKPOINTS[rules.pit_strategy](rules, costs, zus_total))
+
+
+class TaxRulePack(NamedTuple):
+    """Compiled rules for one (year, tax form) / Skompilowane reguły dla jednej pary (rok, forma opodatkowania)."""
+    year: int  # Rules year / Rok reguł
+    forma_opodatkowania: str  # Tax form / Forma opodatkowania
+    # Social ZUS (name, rate) pairs / Pary (nazwa, stawka) ZUS społecznego
+    zus_spoleczne_rates: Tuple[Tuple[str, float], ...]
+    # Voluntary sickness (name, rate) / Dobrowolna chorobowa (nazwa, stawka)
+    zus_chorobowe_rate: Tuple[str, float]
+    health_strategy: Callable  # Health contribution strategy / Strategia składki zdrowotnej
+    health_rate: float  # Rate for health_from_income / Stawka dla health_from_income
+    health_flat_amount: float  # Amount for health_flat / Kwota dla health_flat
+    pit_strategy: Callable  # PIT strategy / Strategia PIT
+    pit_rate: float  # (First bracket) PIT rate / Stawka PIT (pierwszego progu)
+    pit_rate_high: float  # Second bracket rate / Stawka drugiego progu
+    pit_annual_threshold: float  # Annual bracket threshold / Roczny próg podatkowy
+    pit_reducing_amount: float  # Monthly tax reducing amount / Miesięczna kwota zmniejszająca podatek
+    pit_discount_factor: float  # Multiplier for has_tax_discount / Mnożnik dla has_tax_discount
+    warning_codes: Tuple[str, ...]  # Form warnings, health first / Ostrzeżenia formy, najpierw zdrowotna
+    # Warning texts for (zus_base_missing, has_tax_discount) / Treści ostrzeżeń dla (zus_base_missing, has_tax_discount)
+    warnings: Mapping[Tuple[bool, bool], Tuple[str, ...]]
+
+# === Configuration / Konfiguracja ===
+
+
+# Parameters per tax year / Parametry dla każdego roku podatkowego
+TAX_YEAR_PARAMETERS = {
+    2025: {
+        # ZUS rates (may change, especially 'Wypadkowe') / Stawki ZUS (mogą ulec zmianie, zwłaszcza 'Wypadkowe')
+        "zus_spoleczne_rates": (
+            ("Emerytalne", 0.1952),  # Pension / Emerytalne
+            ("Rentowe", 0.0800),  # Disability / Rentowe
+            # Accident (standard rate, may vary) / Wypadkowe (standardowa stawka, może się różnić)
+            ("Wypadkowe", 0.0167),
+            # Labor Fund/Solidarity Fund / Fundusz Pracy/Solidarnościowy
+            ("Fundusz Pracy/Solidarnościowy", 0.0245),
+        ),
+        # Sickness (voluntary) / Chorobowe (dobrowolne)
+        "zus_chorobowe_rate": ("Chorobowe (dobrowolne)", 0.0245),
+        "pit_discount_factor": 0.5,
+        # Per-form parameters / Parametry dla każdej formy
+        "formy": {
+            "ryczalt_15": {
+                "health_strategy": health_flat, "health_flat_amount": 300.0,
+                "pit_strategy": pit_from_revenue, "pit_rate": 0.15,
+                "warning_codes": (WARNING_HEALTH_RYCZALT, WARNING_PIT_RYCZALT),
+            },
+            "ryczalt_12": {
+                "health_strategy": health_flat, "health_flat_amount": 300.0,
+                "pit_strategy": pit_from_revenue, "pit_rate": 0.12,
+                "warning_codes": (WARNING_HEALTH_RYCZALT, WARNING_PIT_RYCZALT),
+            },
+            "liniowy_19": {
+                "health_strategy": health_from_income, "health_rate": 0.049,
+                "pit_strategy": pit_from_income, "pit_rate": 0.19,
+                "warning_codes": (WARNING_HEALTH_LINIOWY, WARNING_PIT_LINIOWY),
+            },
+            "skala": {
+                "health_strategy": health_from_income, "health_rate": 0.09,
+                "pit_strategy": pit_progressive, "pit_rate": 0.12, "pit_rate_high": 0.32,
+                # 3600 / 12 tax reducing amount per month / Kwota zmniejszająca podatek miesięcznie
+                "pit_annual_threshold": 120000.0, "pit_reducing_amount": 300.0,
+                "warning_codes": (WARNING_HEALTH_SKALA, WARNING_PIT_SKALA),
+            },
+        },
+    },
+}
+
+
+def warning_messages(codes: Tuple[str, ...], zus_base_missing: bool, has_tax_discount: bool) -> Tuple[str, ...]:
+    """
+    Returns warning texts for form codes plus the flag warnings, in calculation order.
+    Zwraca treści ostrzeżeń dla kodów formy wraz z ostrzeżeniami flag, w kolejności obliczeń.
+    """
+    if zus_base_missing:
+        codes = (WARNING_NO_ZUS_BASE,) + codes
+    if has_tax_discount:
+        codes = codes + (WARNING_TAX_DISCOUNT,)
+    return tuple(WARNING_MESSAGES[code] for code in codes)
+
+
+def _compile_warnings(codes: Tuple[str, ...]) -> Mapping[Tuple[bool, bool], Tuple[str, ...]]:
+    """Precomputes warning texts for every flag combination / Wylicza z góry treści ostrzeżeń dla każdej kombinacji flag."""
+    return MappingProxyType({
+        (zus_base_missing, has_tax_discount): warning_messages(codes, zus_base_missing, has_tax_discount)
+        for zus_base_missing in (False, True)
+        for has_tax_discount in (False, True)
+    })
+
+
+def _compile_rule_packs() -> Dict[Tuple[int, str], TaxRulePack]:
+    """Builds every rule pack once / Buduje każdy pakiet reguł jeden raz."""
+    packs = {}
+    for year, parameters in TAX_YEAR_PARAMETERS.items():
+        for forma, forma_parameters in parameters["formy"].items():
+            packs[(year, forma)] = TaxRulePack(
+                year=year,
+                forma_opodatkowania=forma,
+                zus_spoleczne_rates=parameters["zus_spoleczne_rates"],
+                zus_chorobowe_rate=parameters["zus_chorobowe_rate"],
+                health_strategy=forma_parameters["health_strategy"],
+                health_rate=forma_parameters.get("health_rate", 0.0),
+                health_flat_amount=forma_parameters.get("health_flat_amount", 0.0),
+                pit_strategy=forma_parameters["pit_strategy"],
+                pit_rate=forma_parameters["pit_rate"],
+                pit_rate_high=forma_parameters.get("pit_rate_high", forma_parameters["pit_rate"]),
+                pit_annual_threshold=forma_parameters.get("pit_annual_threshold", 0.0),
+                pit_reducing_amount=forma_parameters.get("pit_reducing_amount", 0.0),
+                pit_discount_factor=parameters["pit_discount_factor"],
+                warning_codes=forma_parameters["warning_codes"],
+                warnings=_compile_warnings(forma_parameters["warning_codes"]),
+            )
+    return packs
+
+
+# Compiled packs indexed by (year, forma) / Skompilowane pakiety indeksowane przez (rok, forma)
+RULE_PACKS = _compile_rule_packs()
+# Same packs grouped by year, then tax form / Te same pakiety pogrupowane wg roku, a następnie formy
+_PACKS_BY_YEAR = {
+    year: {forma: pack for (pack_year, forma), pack in RULE_PACKS.items() if pack_year == year}
+    for year in TAX_YEAR_PARAMETERS
+}
+# Supported tax forms / Obsługiwane formy opodatkowania
+FORMY_OPODATKOWANIA = tuple(TAX_YEAR_PARAMETERS[max(TAX_YEAR_PARAMETERS)]["formy"])
+
+
+def resolve_rules_year(year: int) -> int:
+    """
+    Returns the latest rules year not after the given year (or the earliest known one).
+    Zwraca najnowszy rok reguł nie późniejszy niż podany (lub najwcześniejszy znany).
+    """
+    known = [known_year for known_year in TAX_YEAR_PARAMETERS if known_year <= year]
+    return max(known) if known else min(TAX_YEAR_PARAMETERS)
+
+
+def rule_packs_for_year(year: int) -> Dict[str, TaxRulePack]:
+    """Returns the packs for a year keyed by tax form / Zwraca pakiety dla roku z kluczem formy opodatkowania."""
+    rules_year = resolve_rules_year(year)
+    return _PACKS_BY_YEAR[rules_year]
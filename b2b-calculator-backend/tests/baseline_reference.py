@@ -0,0 +1,138 @@
+# Seeded input generation / Generowanie danych wejściowych z ziarnem
+import random
+# For type hinting / Do typowania
+from typing import Dict, List, Optional
+
+# === Frozen Reference / Zamrożona referencja ===
+# The per-request calculation of POST /oblicz before the tax engine existed, kept verbatim apart from
+# HTTP handling. The engine, the result table and every endpoint built on them must match it exactly.
+# Obliczenie POST /oblicz dla pojedynczego żądania sprzed powstania silnika podatkowego, zachowane dosłownie
+# poza obsługą HTTP. Silnik, tablica wyników i każdy oparty na nich punkt końcowy muszą się z nim dokładnie zgadzać.
+
+FORMY = ("ryczalt_15", "ryczalt_12", "liniowy_19", "skala")
+
+
+def reference_calculation(income: float, costs: float, forma_opodatkowania: str, stawka_vat: float,
+                          has_tax_discount: bool, platnik_chorobowe: bool, zus_base: Optional[float]) -> Dict:
+    """
+    Returns the fields of the original QuotaOutput for one valid input.
+    Zwraca pola pierwotnego QuotaOutput dla jednego prawidłowego wejścia.
+    """
+    # === Social ZUS Calculation / Obliczenie ZUS Społecznego ===
+    zus_details = []
+    zus_total = 0.0
+    warnings = []
+    if zus_base is None:
+        warnings.append(
+            "Nie udało się pobrać aktualnej podstawy ZUS. Użyto wartości domyślnych/zerowych.")
+        zus_base = 0.0
+
+    if zus_base > 0:
+        rates = {
+            "Emerytalne": 0.1952,
+            "Rentowe": 0.0800,
+            "Wypadkowe": 0.0167,
+            "Fundusz Pracy/Solidarnościowy": 0.0245,
+        }
+        if platnik_chorobowe:
+            rates["Chorobowe (dobrowolne)"] = 0.0245
+        for name, rate in rates.items():
+            amount = round(zus_base * rate, 2)
+            zus_details.append({"nazwa": name, "procent": rate * 100, "podstawa": zus_base, "kwota": amount})
+            zus_total += amount
+        zus_total = round(zus_total, 2)
+
+    # === Health Contribution Calculation / Obliczenie Składki Zdrowotnej ===
+    health_contribution = 0.0
+    przychody = income
+    koszty = costs
+    dochod_do_zdrowotnej = max(0, przychody - koszty - zus_total)
+    if forma_opodatkowania == "skala":
+        health_contribution = round(dochod_do_zdrowotnej * 0.09, 2)
+        warnings.append(
+            "Składka zdrowotna (skala) obliczona wg uproszczonej stawki 9% od dochodu (przychód - koszty - ZUS społ.).")
+    elif forma_opodatkowania == "liniowy_19":
+        health_contribution = round(dochod_do_zdrowotnej * 0.049, 2)
+        warnings.append(
+            "Składka zdrowotna (liniowy) obliczona wg uproszczonej stawki 4.9% od dochodu (przychód - koszty - ZUS społ.).")
+    elif forma_opodatkowania.startswith("ryczalt"):
+        health_contribution = 300.0
+        warnings.append(
+            "Składka zdrowotna (ryczałt) jest wartością tymczasową. Wymaga implementacji progów dochodowych.")
+    health_contribution = max(0, health_contribution)
+
+    # === PIT Calculation / Obliczenie PIT ===
+    pit_tax = 0.0
+    if forma_opodatkowania == "ryczalt_15":
+        pit_base = max(0, przychody - zus_total)
+        pit_tax = pit_base * 0.15
+        warnings.append(
+            "PIT (ryczałt) obliczony od przychodu pomniejszonego tylko o ZUS społeczny (uproszczenie).")
+    elif forma_opodatkowania == "ryczalt_12":
+        pit_base = max(0, przychody - zus_total)
+        pit_tax = pit_base * 0.12
+        warnings.append(
+            "PIT (ryczałt) obliczony od przychodu pomniejszonego tylko o ZUS społeczny (uproszczenie).")
+    elif forma_opodatkowania == "liniowy_19":
+        pit_base = max(0, przychody - koszty - zus_total)
+        pit_tax = pit_base * 0.19
+        warnings.append(
+            "PIT (liniowy) obliczony od dochodu (przychód - koszty - ZUS społ.) bez odliczenia składki zdrowotnej (uproszczenie).")
+    elif forma_opodatkowania == "skala":
+        pit_base = max(0, przychody - koszty - zus_total)
+        if pit_base * 12 <= 120000:
+            pit_tax = max(0, (pit_base * 0.12) - 300.0)
+        else:
+            pit_tax = pit_base * 0.32
+        warnings.append(
+            "PIT (skala) obliczony w sposób uproszczony (bez pełnego uwzględnienia kwoty wolnej/zmniejszającej i progów rocznych).")
+    else:
+        raise ValueError("Nieprawidłowa forma opodatkowania")
+    pit_tax = round(max(0, pit_tax), 2)
+    if has_tax_discount:
+        pit_tax *= 0.5
+        warnings.append("Zastosowano uproszczoną zniżkę PIT 50% na kwotę podatku.")
+
+    vat_amount = round(income * (stawka_vat / 100), 2)
+    total_contributions = round(zus_total + health_contribution + pit_tax, 2)
+    net_income = round(income - costs - total_contributions, 2)
+    return {
+        "zus_spoleczne_details": zus_details,
+        "zus_spoleczne_total": zus_total,
+        "skladka_zdrowotna": health_contribution,
+        "podatek_pit": pit_tax,
+        "vat": vat_amount,
+        "calkowite_obciazenie": total_contributions,
+        "dochod_netto": net_income,
+        "ostrzezenia": warnings,
+    }
+
+
+def random_inputs(count: int, seed: int) -> List[Dict]:
+    """
+    Returns valid QuotaInput dictionaries covering whole and fractional amounts, the skala threshold,
+    costs above income and both flags.
+    Zwraca prawidłowe słowniki QuotaInput obejmujące kwoty całkowite i ułamkowe, próg skali,
+    koszty wyższe niż przychód oraz obie flagi.
+    """
+    generator = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        kind = generator.random()
+        if kind < 0.3:
+            income = float(generator.randint(0, 60000))
+        elif kind < 0.6:
+            income = round(generator.uniform(0, 60000), 2)
+        else:
+            # Around the skala threshold of 10000 PLN monthly income / Wokół progu skali 10000 PLN dochodu miesięcznie
+            income = round(generator.uniform(10000, 13000), 2)
+        costs = generator.choice((0.0, float(generator.randint(0, 5000)), round(generator.uniform(0, income * 1.2), 2)))
+        inputs.append({
+            "income": income,
+            "costs": costs,
+            "forma_opodatkowania": generator.choice(FORMY),
+            "stawka_vat": generator.choice((0.0, 5.0, 8.0, 23.0)),
+            "has_tax_discount": generator.random() < 0.3,
+            "platnik_chorobowe": generator.random() < 0.7,
+        })
+    return inputs
@@ -0,0 +1,33 @@
+# Library for paths and environment variables / Biblioteka do ścieżek i zmiennych środowiskowych
+import os
+# For the module search path / Do ścieżki wyszukiwania modułów
+import sys
+# Temporary store and table directories / Tymczasowe katalogi magazynu i tablic
+import tempfile
+
+# Test framework / Framework testowy
+import pytest
+
+# Backend modules are top-level modules next to this directory / Moduły backendu są modułami najwyższego poziomu obok tego katalogu
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The application must start offline from the bundled baseline, with its own store and tables
+# Aplikacja musi startować offline z dołączonych danych bazowych, z własnym magazynem i tablicami
+_TEST_DIR = tempfile.mkdtemp(prefix="b2b-tests-")
+os.environ.setdefault("ZUS_STARTUP_MODE", "baseline")
+os.environ.setdefault("ZUS_STORE_PATH", os.path.join(_TEST_DIR, "zus_data.sqlite3"))
+os.environ.setdefault("RESULT_TABLE_DIR", os.path.join(_TEST_DIR, "result_tables"))
+# Nothing listens on the discard port, so refreshes fail fast / Nic nie nasłuchuje na porcie discard, więc odświeżenia szybko zawodzą
+os.environ.setdefault("ZUS_INFO_URL_TEMPLATE", "http://127.0.0.1:9/{year}")
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Application client with startup and shutdown / Klient aplikacji ze startem i zamknięciem."""
+    # Imported here so the environment above is read first / Importowane tutaj, aby najpierw odczytać powyższe środowisko
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,126 @@
+# Seeded months / Miesiące z ziarnem
+import random
+
+# Test framework / Framework testowy
+import pytest
+
+# Simulation under test / Testowana symulacja
+import annual_simulation
+from annual_simulation import cumulative_pit_due, simulate_year
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import FORMY
+# Compiled rules / Skompilowane reguły
+from tax_rules import rule_packs_for_year
+
+ZUS_BASE = 5203.8
+YEAR = 2025
+_MONTHLY = ("zus_spoleczne_total", "skladka_zdrowotna", "podatek_pit", "vat", "calkowite_obciazenie", "dochod_netto")
+
+
+def _simulate(income, costs, forma="skala", previous=None):
+    return simulate_year(income, costs, forma, 23.0, False, True, ZUS_BASE, YEAR, previous=previous)
+
+
+def test_skala_crosses_the_threshold_in_the_right_month():
+    rules = rule_packs_for_year(YEAR)["skala"]
+    result = _simulate([20000.0] * 12, [0.0] * 12)
+    months = result.months
+
+    crossing = next(index for index, month in enumerate(months) if month.dochod_narastajaco > rules.pit_annual_threshold)
+    assert 0 < crossing < 11
+    assert all(month.prog_podatkowy == 1 for month in months[:crossing])
+    assert all(month.prog_podatkowy == 2 for month in months[crossing:])
+    # The annual reducing amount keeps January tax-free, the second bracket raises the advance
+    # Roczna kwota zmniejszająca zwalnia styczeń z podatku, drugi próg podnosi zaliczkę
+    assert months[0].podatek_pit == 0.0
+    assert months[crossing + 1].podatek_pit > months[crossing - 1].podatek_pit
+    # Advances add up to the tax due on the year's income / Zaliczki sumują się do podatku należnego od dochodu roku
+    assert months[-1].podatek_pit_narastajaco == pytest.approx(
+        cumulative_pit_due(rules, months[-1].dochod_narastajaco), abs=0.01)
+    assert months[-1].podatek_pit_narastajaco == pytest.approx(sum(month.podatek_pit for month in months), abs=0.01)
+
+
+@pytest.mark.parametrize("forma", FORMY)
+def test_partial_recompute_matches_full_recompute(forma, monkeypatch):
+    generator = random.Random(7)
+    income = [float(generator.randint(5000, 40000)) for _ in range(12)]
+    costs = [float(generator.randint(0, 3000)) for _ in range(12)]
+    previous = _simulate(income, costs, forma)
+
+    income[6] += 1000.0
+    calls = []
+    simulate_month = annual_simulation._simulate_month
+
+    def counting_simulate_month(*args):
+        calls.append(args)
+        return simulate_month(*args)
+
+    monkeypatch.setattr(annual_simulation, "_simulate_month", counting_simulate_month)
+    partial = _simulate(income, costs, forma, previous=previous.months)
+    monkeypatch.undo()
+
+    # Only July to December were calculated / Obliczono tylko lipiec do grudnia
+    assert len(calls) == 6 and partial.recomputed_from == 6
+    assert partial.months == _simulate(income, costs, forma).months
+    assert partial.changed[0] == 6
+
+
+def test_unchanged_and_shorter_scenarios_reuse_every_month():
+    income, costs = [10000.0] * 12, [100.0] * 12
+    previous = _simulate(income, costs).months
+    same = _simulate(income, costs, previous=previous)
+    assert (same.recomputed_from, same.changed, same.months) == (12, [], previous)
+    shorter = _simulate(income[:4], costs[:4], previous=previous)
+    assert shorter.months == previous[:4]
+    longer = _simulate(income, costs, previous=previous[:4])
+    assert longer.recomputed_from == 4 and longer.changed == list(range(4, 12)) and longer.months == previous
+
+# === Endpoint / Punkt końcowy ===
+
+
+def _annual_request(months, **extra):
+    return {"miesiace": [{"income": income, "costs": costs} for income, costs in months],
+            "forma_opodatkowania": "skala", "stawka_vat": 23, **extra}
+
+
+@pytest.mark.parametrize("forma", FORMY)
+def test_one_month_matches_oblicz(client, forma):
+    for row_income, row_costs in ((3000, 0), (12000, 500), (20000, 2500), (50000, 500)):
+        single = client.post("/oblicz", json={"income": row_income, "costs": row_costs, "forma_opodatkowania": forma,
+                                              "stawka_vat": 23}).json()
+        annual = client.post("/oblicz/rok", json={**_annual_request([(row_income, row_costs)]),
+                                                  "forma_opodatkowania": forma}).json()
+        month = annual["miesiace"][0]
+        # Skala PIT is cumulative with the annual reducing amount, not one month times 12
+        # PIT na skali jest liczony narastająco z roczną kwotą zmniejszającą, a nie jako miesiąc razy 12
+        compared = _MONTHLY if forma != "skala" else ("zus_spoleczne_total", "skladka_zdrowotna", "vat")
+        assert {field: month[field] for field in compared} == {field: single[field] for field in compared}
+        assert annual["zus_spoleczne_details"] == single["zus_spoleczne_details"]
+        assert annual["suma_dochod_netto"] == month["dochod_netto"]
+
+
+def test_endpoint_recomputes_from_the_first_changed_month(client):
+    months = [(20000.0, 1000.0)] * 12
+    first = client.post("/oblicz/rok", json=_annual_request(months)).json()
+    assert (first["przeliczone_od"], first["przeliczone_miesiace"]) == (1, list(range(1, 13)))
+
+    months[8] = (25000.0, 1000.0)
+    second = client.post("/oblicz/rok", json=_annual_request(
+        months, poprzedni_scenariusz=first["id_scenariusza"])).json()
+    assert second["przeliczone_od"] == 9 and second["przeliczone_miesiace"][0] == 9
+    assert second["miesiace"][:8] == first["miesiace"][:8]
+    full = client.post("/oblicz/rok", json=_annual_request(months)).json()
+    assert second["miesiace"] == full["miesiace"] and second["id_scenariusza"] == full["id_scenariusza"]
+
+
+@pytest.mark.parametrize("reference, extra", [
+    ("unknown", {}),
+    ("first", {"stawka_vat": 8}),
+    ("first", {"has_tax_discount": True}),
+])
+def test_endpoint_calculates_in_full_without_a_matching_scenario(client, reference, extra):
+    months = [(15000.0, 0.0)] * 3
+    first = client.post("/oblicz/rok", json=_annual_request(months)).json()
+    scenario = first["id_scenariusza"] if reference == "first" else "0" * 20
+    result = client.post("/oblicz/rok", json=_annual_request(months, poprzedni_scenariusz=scenario, **extra)).json()
+    assert result["przeliczone_od"] == 1
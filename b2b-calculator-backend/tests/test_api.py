@@ -0,0 +1,45 @@
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import random_inputs, reference_calculation
+
+# Fields of QuotaOutput compared with the reference / Pola QuotaOutput porównywane z referencją
+_COMPARED = ("zus_spoleczne_details", "zus_spoleczne_total", "skladka_zdrowotna", "podatek_pit", "vat",
+             "calkowite_obciazenie", "dochod_netto", "ostrzezenia")
+
+
+def _zus_base(client):
+    return client.get("/aktualne_dane_zus").json()["zus_base"]
+
+
+def test_oblicz_matches_reference(client):
+    zus_base = _zus_base(client)
+    for row in random_inputs(500, seed=3):
+        response = client.post("/oblicz", json=row)
+        assert response.status_code == 200
+        body = response.json()
+        assert {field: body[field] for field in _COMPARED} == reference_calculation(zus_base=zus_base, **row), row
+
+
+def test_oblicz_get_matches_post(client):
+    for row in random_inputs(100, seed=4):
+        assert client.get("/oblicz", params=row).json() == client.post("/oblicz", json=row).json()
+
+
+def test_oblicz_batch_matches_reference(client):
+    zus_base = _zus_base(client)
+    inputs = random_inputs(3000, seed=5)
+    columns = {field: [row[field] for row in inputs] for field in inputs[0]}
+    response = client.post("/oblicz/batch", json=columns)
+    assert response.status_code == 200
+    body = response.json()
+    for position, row in enumerate(inputs):
+        expected = reference_calculation(zus_base=zus_base, **row)
+        assert {field: body[field][position] for field in _COMPARED} == expected, row
+
+
+def test_oblicz_rejects_invalid_input(client):
+    response = client.post("/oblicz", json={"income": -1, "forma_opodatkowania": "skala"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Dochód (przychód) nie może być ujemny"
+    response = client.post("/oblicz/batch", json={"income": [100, 200], "forma_opodatkowania": ["skala", "x"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Wiersz 1: Nieprawidłowa forma opodatkowania"
@@ -0,0 +1,72 @@
+# Writing the CSV input / Zapisywanie wejścia CSV
+import csv
+# Writing and parsing NDJSON / Zapisywanie i parsowanie NDJSON
+import json
+
+# Test framework / Framework testowy
+import pytest
+
+# CLI under test / Testowane CLI
+import batch_cli
+# Seeded inputs / Wejścia z ziarnem
+from baseline_reference import random_inputs
+
+# Fields compared with /oblicz/batch / Pola porównywane z /oblicz/batch
+_COMPARED = ("zus_spoleczne_details", "zus_spoleczne_total", "skladka_zdrowotna", "podatek_pit", "vat",
+             "calkowite_obciazenie", "dochod_netto", "ostrzezenia")
+
+
+@pytest.fixture
+def zus_file(client, tmp_path):
+    """ZUS data pinned from the running service / Dane ZUS przypięte z działającej usługi."""
+    path = tmp_path / "zus.json"
+    path.write_text(client.get("/aktualne_dane_zus").text, encoding="utf-8")
+    return str(path)
+
+
+def test_output_matches_batch_endpoint_in_input_order(client, zus_file, tmp_path):
+    first, second = random_inputs(700, seed=21), random_inputs(500, seed=22)
+    csv_path = tmp_path / "kontrahenci.csv"
+    with open(csv_path, "w", encoding="utf-8-sig", newline="") as target:
+        writer = csv.DictWriter(target, fieldnames=list(first[0]))
+        writer.writeheader()
+        writer.writerows(first)
+    ndjson_path = tmp_path / "kontrahenci.ndjson"
+    ndjson_path.write_text("".join(json.dumps(row) + "\n" for row in second), encoding="utf-8")
+    output = tmp_path / "wyniki.ndjson"
+
+    batch_cli.main([str(csv_path), str(ndjson_path), "--zus", zus_file, "--output", str(output),
+                    "--workers", "3", "--chunk-rows", "37"])
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    inputs = first + second
+    assert [record["wiersz"] for record in records] == list(range(len(inputs)))
+    columns = {field: [row[field] for row in inputs] for field in inputs[0]}
+    expected = client.post("/oblicz/batch", json=columns).json()
+    for position, record in enumerate(records):
+        assert {field: record[field] for field in _COMPARED} == \
+            {field: expected[field][position] for field in _COMPARED}, inputs[position]
+        assert record["podstawa_wymiaru_skladek_zus"] == expected["podstawa_wymiaru_skladek_zus"]
+
+
+def test_invalid_rows_stay_in_place(zus_file, tmp_path):
+    source = tmp_path / "kontrahenci.ndjson"
+    source.write_text('{"income": 1000, "forma_opodatkowania": "skala"}\n'
+                      '{"income": -5, "forma_opodatkowania": "skala"}\n'
+                      'nie json\n'
+                      '{"income": 2000, "forma_opodatkowania": "ryczalt_12"}\n', encoding="utf-8")
+    output = tmp_path / "wyniki.csv"
+    batch_cli.main([str(source), "--zus", zus_file, "--output", str(output), "--workers", "2", "--chunk-rows", "1"])
+
+    with open(output, encoding="utf-8", newline="") as result:
+        rows = list(csv.DictReader(result))
+    assert [row["wiersz"] for row in rows] == ["0", "1", "2", "3"]
+    assert [bool(row["blad"]) for row in rows] == [False, True, True, False]
+
+
+def test_zus_file_without_base_is_rejected(tmp_path):
+    path = tmp_path / "zus.json"
+    path.write_text(json.dumps({"year": 2025, "avg_salary": None, "zus_base": None,
+                                "error_message": "brak danych"}), encoding="utf-8")
+    with pytest.raises(SystemExit):
+        batch_cli.load_zus_data(str(path))
@@ -0,0 +1,146 @@
+# Running the async generators / Uruchamianie generatorów asynchronicznych
+import asyncio
+# Parsing CSV output / Parsowanie wyjścia CSV
+import csv
+# Parsing NDJSON output / Parsowanie wyjścia NDJSON
+import json
+
+# Test framework / Framework testowy
+import pytest
+
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import reference_calculation
+# Streaming under test / Testowane strumieniowanie
+from bulk_stream import CSV_OUTPUT_COLUMNS, ERROR_LINE_TOO_LONG, MAX_LINE_CHARS, iter_lines, stream_calculation
+# Validation messages / Komunikaty walidacji
+from tax_engine import ERROR_INVALID_FORMA, ERROR_NEGATIVE_COSTS, ERROR_NEGATIVE_INCOME
+# ZUS data model / Model danych ZUS
+from zus_data_fetcher import ZUSData
+
+ZUS_INFO = ZUSData(year=2025, avg_salary=8673.0, zus_base=5203.8, baseline_version="2025.1")
+
+
+async def _chunks(payload: bytes, size: int):
+    for start in range(0, len(payload), size):
+        yield payload[start:start + size]
+
+
+def _run(payload: bytes, input_format: str, output_format: str, chunk_size: int = 7, chunk_rows: int = 2) -> str:
+    async def collect():
+        return b"".join([part async for part in stream_calculation(
+            _chunks(payload, chunk_size), input_format, output_format, ZUS_INFO, chunk_rows=chunk_rows)])
+    return asyncio.run(collect()).decode("utf-8")
+
+
+def _lines(payload: bytes, chunk_size: int, max_chars: int = MAX_LINE_CHARS):
+    async def collect():
+        return [line async for line in iter_lines(_chunks(payload, chunk_size), max_chars)]
+    return asyncio.run(collect())
+
+# === Line Splitting / Dzielenie na linie ===
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 1024])
+def test_iter_lines_handles_every_line_ending(chunk_size):
+    payload = "\ufeffa,b\r\nżółw\rc\n\nd\r\n\re".encode("utf-8")
+    assert _lines(payload, chunk_size) == ["a,b", "żółw", "c", "", "d", "", "e"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+def test_iter_lines_drops_long_lines(chunk_size):
+    payload = b"short\n" + b"x" * 11 + b"\r\nexactly10!\n" + b"y" * 25
+    assert _lines(payload, chunk_size, max_chars=10) == ["short", None, "exactly10!", None]
+
+# === NDJSON Errors / Błędy NDJSON ===
+
+
+def test_ndjson_error_rows_keep_their_position():
+    valid = {"income": 12000.5, "costs": 800, "forma_opodatkowania": "liniowy_19", "stawka_vat": 23}
+    payload = "\n".join([
+        json.dumps(valid),
+        "{not json",
+        "[1, 2]",
+        json.dumps({"income": -1, "forma_opodatkowania": "skala"}),
+        json.dumps({"income": 100, "costs": -5, "forma_opodatkowania": "skala"}),
+        json.dumps({"income": 100, "forma_opodatkowania": "ryczalt_8"}),
+        json.dumps({"forma_opodatkowania": "skala"}),
+        json.dumps({"income": 100, "forma_opodatkowania": "skala", "has_tax_discount": "moze"}),
+        "",
+        json.dumps({"income": "5000,50", "forma_opodatkowania": "skala", "platnik_chorobowe": "nie"}),
+    ]).encode("utf-8")
+    rows = [json.loads(line) for line in _run(payload, "ndjson", "ndjson").splitlines()]
+
+    assert [row["wiersz"] for row in rows] == list(range(9))
+    errors = {row["wiersz"]: row["blad"] for row in rows if "blad" in row}
+    assert errors[1].startswith("Nieprawidłowy JSON")
+    assert errors[2] == "Wiersz NDJSON musi być obiektem"
+    assert errors[3] == ERROR_NEGATIVE_INCOME
+    assert errors[4] == ERROR_NEGATIVE_COSTS
+    assert errors[5] == ERROR_INVALID_FORMA
+    assert errors[6] == "Brak wymaganej wartości liczbowej"
+    assert errors[7].startswith("Nieprawidłowa wartość logiczna")
+    assert sorted(errors) == [1, 2, 3, 4, 5, 6, 7]
+
+    expected = reference_calculation(12000.5, 800.0, "liniowy_19", 23.0, False, True, ZUS_INFO.zus_base)
+    assert {field: rows[0][field] for field in expected} == expected
+    expected = reference_calculation(5000.5, 0.0, "skala", 0.0, False, False, ZUS_INFO.zus_base)
+    assert {field: rows[8][field] for field in expected} == expected
+
+
+def test_ndjson_long_line_is_an_error_row():
+    row = json.dumps({"income": 100, "forma_opodatkowania": "skala"})
+    payload = (row + "\n" + " " * (MAX_LINE_CHARS + 1) + row + "\n" + row).encode("utf-8")
+    rows = [json.loads(line) for line in _run(payload, "ndjson", "ndjson", chunk_size=4096).splitlines()]
+    assert [row.get("blad") for row in rows] == [None, ERROR_LINE_TOO_LONG, None]
+
+# === CSV Errors / Błędy CSV ===
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n", "\r"])
+def test_csv_error_rows_keep_their_position(line_break):
+    payload = line_break.join([
+        "income,costs,forma_opodatkowania,stawka_vat,has_tax_discount,platnik_chorobowe",
+        "10000,1000,skala,23,false,true",
+        "abc,0,skala,0,,",
+        "-5,0,skala,0,,",
+        "100,0,,0,,",
+        "100,0,skala,0,tak,nie",
+        "100,0,skala,0,maybe,",
+    ]).encode("utf-8")
+    rows = list(csv.DictReader(_run(payload, "csv", "csv").splitlines()))
+
+    assert tuple(rows[0]) == CSV_OUTPUT_COLUMNS
+    assert [row["wiersz"] for row in rows] == ["0", "1", "2", "3", "4", "5"]
+    assert [bool(row["blad"]) for row in rows] == [False, True, True, True, False, True]
+    assert rows[2]["blad"] == ERROR_NEGATIVE_INCOME
+    assert rows[3]["blad"] == ERROR_INVALID_FORMA
+    # Error rows leave the result columns empty / Wiersze z błędem pozostawiają kolumny wyników puste
+    assert rows[1]["dochod_netto"] == "" and rows[1]["rok_danych_zus"] == ""
+
+    expected = reference_calculation(10000.0, 1000.0, "skala", 23.0, False, True, ZUS_INFO.zus_base)
+    assert float(rows[0]["dochod_netto"]) == expected["dochod_netto"]
+    assert rows[0]["ostrzezenia"].split(" | ") == expected["ostrzezenia"]
+    expected = reference_calculation(100.0, 0.0, "skala", 0.0, True, False, ZUS_INFO.zus_base)
+    assert float(rows[4]["dochod_netto"]) == expected["dochod_netto"]
+
+
+def test_csv_long_line_is_an_error_row():
+    payload = ("income,forma_opodatkowania\n100,skala\n" + "1" * (MAX_LINE_CHARS + 1) + ",skala\n200,skala"
+               ).encode("utf-8")
+    rows = [json.loads(line) for line in _run(payload, "csv", "ndjson", chunk_size=4096).splitlines()]
+    assert [row.get("blad") for row in rows] == [None, ERROR_LINE_TOO_LONG, None]
+    assert [row["wiersz"] for row in rows] == [0, 1, 2]
+
+# === Endpoint / Punkt końcowy ===
+
+
+def test_stream_endpoint_reports_error_rows(client):
+    payload = b'{"income": 9000, "forma_opodatkowania": "ryczalt_12"}\n{"income": -1, "forma_opodatkowania": "skala"}\n'
+    response = client.post("/oblicz/stream", content=payload, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert "blad" not in rows[0] and rows[0]["wiersz"] == 0
+    assert rows[1] == {"wiersz": 1, "blad": ERROR_NEGATIVE_INCOME}
+
+    response = client.post("/oblicz/stream?format_wejscia=xml", content=payload)
+    assert response.status_code == 400
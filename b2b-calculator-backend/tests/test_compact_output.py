@@ -0,0 +1,55 @@
+# Parsing responses / Parsowanie odpowiedzi
+import json
+
+# Test framework / Framework testowy
+import pytest
+
+# Encoder under test / Testowany koder
+import json_encoding
+# Warning texts and codes / Treści i kody ostrzeżeń
+from tax_rules import WARNING_CODES_BY_MESSAGE, WARNING_MESSAGES
+
+QUERY = {"income": 12000, "costs": 500, "forma_opodatkowania": "liniowy_19", "stawka_vat": 23,
+         "has_tax_discount": True}
+
+
+def test_compact_mode_returns_warning_codes(client):
+    full = client.post("/oblicz", json=QUERY).json()
+    compact = client.post("/oblicz?kompaktowy=true", json=QUERY).json()
+
+    assert compact["ostrzezenia"] == [WARNING_CODES_BY_MESSAGE[text] for text in full["ostrzezenia"]]
+    assert [WARNING_MESSAGES[code] for code in compact["ostrzezenia"]] == full["ostrzezenia"]
+    assert "zus_spoleczne_details" not in compact
+    # Every amount is the same as in the full response / Każda kwota jest taka sama jak w pełnej odpowiedzi
+    assert {key: value for key, value in full.items() if key not in ("ostrzezenia", "zus_spoleczne_details")} == \
+        {key: value for key, value in compact.items() if key != "ostrzezenia"}
+
+
+def test_compact_mode_with_details(client):
+    full = client.post("/oblicz", json=QUERY).json()
+    compact = client.post("/oblicz?kompaktowy=true&szczegoly=true", json=QUERY).json()
+    assert compact["zus_spoleczne_details"] == full["zus_spoleczne_details"]
+    # GET answers the same compact body / GET odpowiada tą samą zwartą treścią
+    assert client.get("/oblicz", params={**QUERY, "kompaktowy": "true", "szczegoly": "true"}).json() == compact
+
+
+def test_openapi_declares_both_shapes(client):
+    schema = client.get("/openapi.json").json()
+    for method in ("post", "get"):
+        response = schema["paths"]["/oblicz"][method]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert {option["$ref"].rsplit("/", 1)[-1] for option in response["anyOf"]} == {
+            "QuotaOutput", "QuotaCompactOutput"}
+    codes = schema["components"]["schemas"]["QuotaCompactOutput"]["properties"]["ostrzezenia"]["items"]["enum"]
+    assert sorted(codes) == sorted(WARNING_MESSAGES)
+
+
+@pytest.mark.parametrize("value", [
+    {"kwota": float("nan"), "lista": [float("inf"), -float("inf"), (1.5, "żółw")], "brak": None, "flaga": True},
+    [0.1, 1e16, -0.0, 12345678.91, "Składka"],
+])
+def test_stdlib_fallback_matches_orjson(monkeypatch, value):
+    fast = json_encoding.encode_json(value)
+    monkeypatch.setattr(json_encoding, "orjson", None)
+    fallback = json_encoding.encode_json(value)
+    assert json.loads(fallback) == json.loads(fast)
+    assert b"NaN" not in fallback and b"Infinity" not in fallback
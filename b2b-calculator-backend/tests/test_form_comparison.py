@@ -0,0 +1,87 @@
+# Sending non-finite JSON numbers / Wysyłanie nieskończonych liczb JSON
+import json
+
+# Test framework / Framework testowy
+import pytest
+
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import FORMY
+# Solver under test / Testowany solwer
+from form_comparison import break_even_incomes, compare_grid
+# Forward calculation / Obliczenie w przód
+from tax_engine import calculate_batch
+
+ZUS_BASE = 5203.8
+YEAR = 2025
+# 1-PLN grid covering every break-even point of the cases below / Siatka co 1 PLN obejmująca każdy próg opłacalności poniższych przypadków
+GRID_MAX_PLN = 80000
+
+
+def _sign_changes(differences):
+    """Returns (last income before, first income after) for each sign change, skipping zeros / Zwraca (ostatni przychód przed, pierwszy przychód po) dla każdej zmiany znaku, pomijając zera."""
+    changes = []
+    previous = None
+    for income, difference in enumerate(differences):
+        if difference == 0:
+            continue
+        if previous is not None and (difference > 0) != (differences[previous] > 0):
+            changes.append((previous, income))
+        previous = income
+    return changes
+
+
+@pytest.mark.parametrize("costs", [0.0, 1500.0, 20000.0])
+@pytest.mark.parametrize("discount, chorobowe", [(False, True), (True, False)])
+def test_break_even_matches_grid_sign_changes(costs, discount, chorobowe):
+    incomes = [float(income) for income in range(GRID_MAX_PLN + 1)]
+    size = len(incomes)
+    nets = {forma: calculate_batch(incomes, [costs] * size, [forma] * size, [0.0] * size, [discount] * size,
+                                   [chorobowe] * size, zus_base=ZUS_BASE, year=YEAR).dochod_netto
+            for forma in FORMY}
+    points = break_even_incomes(FORMY, costs, discount, chorobowe, zus_base=ZUS_BASE, year=YEAR)
+
+    for index_a, forma_a in enumerate(FORMY):
+        for forma_b in FORMY[index_a + 1:]:
+            differences = [round(net_a - net_b, 2) for net_a, net_b in zip(nets[forma_a], nets[forma_b])]
+            changes = _sign_changes(differences)
+            found = sorted(point.income for point in points
+                           if (point.forma_a, point.forma_b) == (forma_a, forma_b))
+            assert len(found) == len(changes), (forma_a, forma_b, found, changes)
+            for income, (before, after) in zip(found, changes):
+                assert before <= income <= after, (forma_a, forma_b, income, before, after)
+            for point in points:
+                if (point.forma_a, point.forma_b) == (forma_a, forma_b):
+                    # The better form just above the point is the one ahead on the grid after it
+                    # Korzystniejsza forma tuż powyżej punktu to ta, która prowadzi na siatce za nim
+                    after = next(after for before, after in changes if before <= point.income <= after)
+                    assert point.korzystniejsza_powyzej == (forma_a if differences[after] > 0 else forma_b)
+
+
+def test_compare_grid_picks_highest_net():
+    incomes = [0.0, 5000.0, 12000.0, 30000.0]
+    grid = compare_grid(incomes, [0.0, 2000.0], FORMY, False, True, zus_base=ZUS_BASE, year=YEAR)
+    assert len(grid) == len(incomes) * 2
+    for point in grid:
+        assert point.najkorzystniejsza in FORMY
+        assert point.dochod_netto[point.najkorzystniejsza] == max(point.dochod_netto.values())
+
+
+@pytest.mark.parametrize("payload", [
+    {"income_do": 1e308, "income_krok": 1e-300},
+    {"income_do": float("inf"), "income_krok": 100},
+    {"income_do": 10000, "income_krok": float("nan")},
+    {"income_do": 10000, "income_krok": 100, "costs": [float("inf")]},
+    {"income_do": 10000000, "income_krok": 1},
+])
+def test_comparison_rejects_non_finite_or_huge_grids(client, payload):
+    response = client.post("/oblicz/porownanie", content=json.dumps(payload),
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_comparison_endpoint_returns_grid_and_break_evens(client):
+    response = client.post("/oblicz/porownanie", json={"income_od": 5000, "income_do": 15000, "income_krok": 2500})
+    assert response.status_code == 200
+    body = response.json()
+    assert [point["income"] for point in body["punkty"]] == [5000.0, 7500.0, 10000.0, 12500.0, 15000.0]
+    assert body["progi_oplacalnosci"]
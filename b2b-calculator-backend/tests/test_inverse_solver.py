@@ -0,0 +1,89 @@
+# Sending non-finite JSON numbers / Wysyłanie nieskończonych liczb JSON
+import json
+# Seeded targets / Cele z ziarnem
+import random
+
+# Test framework / Framework testowy
+import pytest
+
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import FORMY
+# Solver under test / Testowany solwer
+import inverse_solver
+from inverse_solver import solve_incomes
+# Forward calculation / Obliczenie w przód
+from tax_engine import calculate_batch
+
+ZUS_BASE = 5203.8
+YEAR = 2025
+
+
+def _net(incomes, costs, forma, discount, chorobowe):
+    return calculate_batch(incomes, [costs] * len(incomes), [forma] * len(incomes), [0.0] * len(incomes),
+                           [discount] * len(incomes), [chorobowe] * len(incomes),
+                           zus_base=ZUS_BASE, year=YEAR).dochod_netto
+
+
+@pytest.mark.parametrize("forma", FORMY)
+@pytest.mark.parametrize("costs, discount, chorobowe", [(0.0, False, True), (1500.0, True, False)])
+def test_income_is_minimal(forma, costs, discount, chorobowe):
+    generator = random.Random(7)
+    # Whole, fractional and skala-threshold targets / Cele całkowite, ułamkowe i wokół progu skali
+    targets = ([float(generator.randint(0, 40000)) for _ in range(150)]
+               + [round(generator.uniform(0, 40000), 2) for _ in range(150)]
+               + [round(generator.uniform(5500, 7500), 2) for _ in range(100)])
+    result = solve_incomes(targets, costs, forma, discount, chorobowe, zus_base=ZUS_BASE, year=YEAR)
+
+    incomes = result.income
+    assert None not in incomes
+    at_income = _net(incomes, costs, forma, discount, chorobowe)
+    below = _net([round(income - 0.01, 2) for income in incomes], costs, forma, discount, chorobowe)
+    for target, income, net, net_below, reported in zip(targets, incomes, at_income, below, result.dochod_netto):
+        assert reported == net
+        assert net >= target, (target, income)
+        # One grosz less no longer reaches the target / Grosz mniej już nie osiąga celu
+        if income > 0:
+            assert net_below < target, (target, income)
+
+
+def test_target_below_net_at_zero_income():
+    # Zero income already reaches a very low target / Zerowy przychód już osiąga bardzo niski cel
+    result = solve_incomes([-100000.0], 0.0, "skala", False, True, zus_base=ZUS_BASE, year=YEAR)
+    assert result.income == [0.0]
+
+
+def test_root_outside_first_window_is_found_by_retry(monkeypatch):
+    expected = solve_incomes([7000.0], 0.0, "liniowy_19", False, True, zus_base=ZUS_BASE, year=YEAR)
+    solve_model = inverse_solver._solve_model
+    # A model root 50 grosze too low / Pierwiastek modelu o 50 groszy za niski
+    monkeypatch.setattr(inverse_solver, "_solve_model", lambda segments, target: solve_model(segments, target) - 0.5)
+    assert solve_incomes([7000.0], 0.0, "liniowy_19", False, True, zus_base=ZUS_BASE, year=YEAR) == expected
+
+
+def test_unconfirmed_target_is_none_not_a_lower_income(monkeypatch):
+    solve_model = inverse_solver._solve_model
+    # A model root far below the answer / Pierwiastek modelu daleko poniżej odpowiedzi
+    monkeypatch.setattr(inverse_solver, "_solve_model", lambda segments, target: solve_model(segments, target) - 500)
+    result = solve_incomes([7000.0, 8000.0], 0.0, "skala", False, True, zus_base=ZUS_BASE, year=YEAR)
+    assert result.income == [None, None]
+    assert result.dochod_netto == [None, None]
+
+
+@pytest.mark.parametrize("payload", [
+    {"dochod_netto": [float("inf")]},
+    {"dochod_netto": [float("nan")]},
+    {"dochod_netto": [5000], "costs": float("inf")},
+    {"dochod_netto": [5000.0] * 10001},
+])
+def test_endpoint_rejects_non_finite_or_too_many_targets(client, payload):
+    response = client.post("/oblicz/odwrotne", content=json.dumps({"forma_opodatkowania": "skala", **payload}),
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_endpoint_reaches_targets(client):
+    response = client.post("/oblicz/odwrotne", json={"dochod_netto": [5000, 12000], "forma_opodatkowania": "skala"})
+    assert response.status_code == 200
+    for income, target in zip(response.json()["income"], (5000, 12000)):
+        net = client.post("/oblicz", json={"income": income, "forma_opodatkowania": "skala"}).json()["dochod_netto"]
+        assert net >= target
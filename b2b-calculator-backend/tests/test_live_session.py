@@ -0,0 +1,91 @@
+# Seeded edits / Edycje z ziarnem
+import random
+
+# Test framework / Framework testowy
+import pytest
+
+# Session under test / Testowana sesja
+import live_session
+from live_session import LiveSession
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import random_inputs, reference_calculation
+
+ZUS_BASE = 5203.8
+YEAR = 2025
+START = {"income": 15000.0, "costs": 1000.0, "forma_opodatkowania": "skala", "stawka_vat": 23.0,
+         "has_tax_discount": False, "platnik_chorobowe": True}
+
+
+def _session(inputs=START) -> LiveSession:
+    session = LiveSession()
+    session.set_zus_data("v1", YEAR, ZUS_BASE, None)
+    session.update(inputs)
+    session.recalculate()
+    return session
+
+
+def test_edits_match_a_full_calculation():
+    session = _session()
+    generator = random.Random(11)
+    for row in random_inputs(300, seed=12):
+        # Change a random subset of fields / Zmień losowy podzbiór pól
+        changes = {field: value for field, value in row.items() if generator.random() < 0.4}
+        session.update(changes)
+        session.recalculate()
+        expected = reference_calculation(zus_base=ZUS_BASE, **session.inputs)
+        assert {field: session.output[field] for field in expected} == expected, session.inputs
+
+
+def test_vat_change_recomputes_only_vat(monkeypatch):
+    session = _session()
+    calls = []
+    monkeypatch.setattr(live_session, "compute_pit", lambda *args: calls.append("pit"))
+    monkeypatch.setattr(live_session, "compute_health", lambda *args: calls.append("health"))
+    session.update({**START, "stawka_vat": 8.0})
+    assert session.recalculate() == {"vat": 1200.0}
+    assert calls == []
+    # Same values again: nothing to send / Te same wartości ponownie: nic do wysłania
+    session.update({**START, "stawka_vat": 8.0})
+    assert session.recalculate() == {}
+
+
+def test_new_zus_data_recomputes_the_session():
+    session = _session()
+    session.set_zus_data("v2", YEAR, 5400.0, None)
+    changed = session.recalculate()
+    assert changed["podstawa_wymiaru_skladek_zus"] == 5400.0
+    assert {"zus_spoleczne_total", "skladka_zdrowotna", "dochod_netto"} <= set(changed)
+    assert "vat" not in changed
+
+# === Endpoint / Punkt końcowy ===
+
+
+def test_websocket_sends_deltas(client):
+    with client.websocket_connect("/oblicz/na_zywo") as websocket:
+        websocket.send_json(START)
+        first = websocket.receive_json()
+        assert {field: first[field] for field in ("dochod_netto", "vat", "podatek_pit")} == \
+            {field: client.post("/oblicz", json=START).json()[field] for field in ("dochod_netto", "vat", "podatek_pit")}
+        assert first["rok_danych_zus"] == YEAR
+
+        websocket.send_json({"stawka_vat": 8})
+        assert websocket.receive_json() == {"vat": 1200.0}
+
+        websocket.send_json({"forma_opodatkowania": "ryczalt_12"})
+        changed = websocket.receive_json()
+        assert "podatek_pit" in changed and "vat" not in changed and "zus_spoleczne_total" not in changed
+        websocket.send_json({"income": 15000})
+        assert websocket.receive_json() == {}
+
+
+@pytest.mark.parametrize("message", ["nie json", "[1, 2]", '{"income": "dużo"}', '{"costs": -5}',
+                                     '{"forma_opodatkowania": "nieznana"}'])
+def test_websocket_rejects_bad_messages_and_keeps_state(client, message):
+    with client.websocket_connect("/oblicz/na_zywo") as websocket:
+        websocket.send_json(START)
+        websocket.receive_json()
+        websocket.send_text(message)
+        assert set(websocket.receive_json()) == {"blad"}
+        # The session still answers from its previous state / Sesja nadal odpowiada ze swojego poprzedniego stanu
+        websocket.send_json({"stawka_vat": 0})
+        assert websocket.receive_json() == {"vat": 0.0}
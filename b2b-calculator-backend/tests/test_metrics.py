@@ -0,0 +1,54 @@
+# Test framework / Framework testowy
+import pytest
+
+# Metrics under test / Testowane metryki
+from metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry
+
+
+def _samples(text: str) -> dict:
+    """Sample lines as {name with labels: value} / Linie próbek jako {nazwa z etykietami: wartość}."""
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines() if line and not line.startswith("#")}
+
+
+def test_registry_renders_the_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.", ("event",))
+    counter.inc("hit")
+    counter.inc("hit")
+    counter.inc('z"\n', amount=0.5)
+    registry.gauge("entries", "Entries.", (), lambda: [((), 7)])
+    histogram = registry.histogram("duration_seconds", "Duration.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "calc")
+
+    text = registry.render()
+    assert "# TYPE events_total counter" in text and "# TYPE duration_seconds histogram" in text
+    assert _samples(text) == {
+        'events_total{event="hit"}': 2.0,
+        'events_total{event="z\\"\\n"}': 0.5,
+        "entries": 7.0,
+        'duration_seconds_bucket{stage="calc",le="0.1"}': 1.0,
+        'duration_seconds_bucket{stage="calc",le="1.0"}': 2.0,
+        'duration_seconds_bucket{stage="calc",le="+Inf"}': 3.0,
+        'duration_seconds_sum{stage="calc"}': pytest.approx(5.55),
+        'duration_seconds_count{stage="calc"}': 3.0,
+    }
+
+
+def test_metrics_endpoint(client):
+    client.post("/oblicz", json={"income": 10000, "forma_opodatkowania": "skala"})
+    client.post("/oblicz", json={"income": 10000, "forma_opodatkowania": "skala"})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    samples = _samples(response.text)
+    # Labelled by route template / Etykiety według szablonu ścieżki
+    assert samples['b2b_http_request_duration_seconds_count{method="POST",route="/oblicz",status="200"}'] >= 2
+    assert samples['b2b_result_cache_events_total{event="hit"}'] >= 1
+    assert samples['b2b_stage_duration_seconds_count{stage="validation"}'] >= 2
+    # Baseline data was never scraped, so it has no age / Dane bazowe nigdy nie były pobrane, więc nie mają wieku
+    assert "# TYPE b2b_zus_data_age_seconds gauge" in response.text
+    assert not any(name.startswith("b2b_zus_data_age_seconds{") for name in samples)
+    # /metrics stays out of the API schema / /metrics pozostaje poza schematem API
+    assert "/metrics" not in client.get("/openapi.json").json()["paths"]
@@ -0,0 +1,107 @@
+# Fresh data timestamps / Znaczniki czasu świeżych danych
+import time
+
+# Test framework / Framework testowy
+import pytest
+
+# Fetcher holding the process-wide admission / Moduł pobierający z dopuszczaniem dla całego procesu
+import zus_data_fetcher
+# Application module / Moduł aplikacji
+import main
+# Admission under test / Testowane dopuszczanie
+from refresh_admission import RefreshAdmission
+from zus_data_fetcher import ZUSData
+# Persistent store / Trwały magazyn
+from zus_store import ZUSStore
+
+
+def test_bucket_allows_a_burst_then_refills():
+    admission = RefreshAdmission(burst=2, refill_interval=10.0, cooldown=0.0)
+    assert admission.admit("a", 0.0) == 0.0
+    assert admission.admit("b", 0.0) == 0.0
+    assert admission.admit("c", 0.0) == pytest.approx(10.0)
+    assert admission.admit("c", 4.0) == pytest.approx(6.0)
+    assert admission.admit("c", 10.0) == 0.0
+    # Tokens never exceed the burst / Żetonów nigdy nie jest więcej niż zapas
+    assert [admission.admit(key, 1000.0) for key in "xyz"] == [0.0, 0.0, pytest.approx(10.0)]
+
+
+def test_cooldown_applies_per_key():
+    admission = RefreshAdmission(burst=10, refill_interval=1.0, cooldown=60.0)
+    assert admission.admit(2025, 0.0) == 0.0
+    assert admission.admit(2025, 20.0) == pytest.approx(40.0)
+    assert admission.admit(2024, 20.0) == 0.0
+    # A privileged refresh starts the cooldown without a token / Uprzywilejowane odświeżenie rozpoczyna ochłodzenie bez żetonu
+    admission.record(2023, 30.0)
+    assert admission.admit(2023, 31.0) == pytest.approx(59.0)
+    assert admission.admit(2025, 60.0) == 0.0
+
+# === Endpoints / Punkty końcowe ===
+
+
+@pytest.fixture
+def scrapes(tmp_path, monkeypatch):
+    """Private ZUS data, a fresh limit and counted scrapes / Prywatne dane ZUS, świeży limit i liczone pobrania."""
+    monkeypatch.setattr(zus_data_fetcher, "_zus_data_cache", {})
+    monkeypatch.setattr(zus_data_fetcher, "_inflight_fetch", {})
+    monkeypatch.setattr(zus_data_fetcher, "_store", ZUSStore(str(tmp_path / "zus_data.sqlite3")))
+    monkeypatch.setattr(zus_data_fetcher, "_store_failed", False)
+    monkeypatch.setattr(zus_data_fetcher, "_force_refresh_admission", RefreshAdmission(
+        zus_data_fetcher.FORCE_REFRESH_BURST, zus_data_fetcher.FORCE_REFRESH_INTERVAL,
+        zus_data_fetcher.FORCE_REFRESH_COOLDOWN))
+    calls = []
+
+    def scrape(year):
+        calls.append(year)
+        return ZUSData(year=year, avg_salary=8673.0 + len(calls), zus_base=5203.8)
+
+    monkeypatch.setattr(zus_data_fetcher, "_scrape_zus_data", scrape)
+    zus_data_fetcher._store_zus_data(2025, ZUSData(year=2025, avg_salary=8673.0, zus_base=5203.8), time.time())
+    yield calls
+    main._result_cache.clear()
+
+
+def test_forced_refreshes_over_the_limit_get_429_with_cached_data(client, scrapes):
+    first = client.get("/aktualne_dane_zus", params={"force_refresh": "true"})
+    assert first.status_code == 200 and scrapes == [2025]
+
+    # Same year within the cooldown / Ten sam rok w czasie ochłodzenia
+    repeated = client.get("/aktualne_dane_zus", params={"force_refresh": "true"})
+    assert repeated.status_code == 429
+    assert repeated.json() == first.json()
+    assert 0 < int(repeated.headers["retry-after"]) <= zus_data_fetcher.FORCE_REFRESH_COOLDOWN
+    assert repeated.headers["cache-control"] == "no-store"
+
+    # Other years use up the burst / Inne lata wyczerpują zapas
+    for rok in (2024, 2023):
+        assert client.get("/aktualne_dane_zus", params={"force_refresh": "true", "rok": rok}).status_code == 200
+    limited = client.get("/aktualne_dane_zus", params={"force_refresh": "true", "rok": 2026})
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) == zus_data_fetcher.FORCE_REFRESH_INTERVAL
+    assert scrapes == [2025, 2024, 2023, 2026]
+    assert client.get("/aktualne_dane_zus").status_code == 200
+
+
+def test_admin_refresh_bypasses_the_limit(client, scrapes, monkeypatch):
+    monkeypatch.setattr(main, "ZUS_ADMIN_TOKEN", "sekret")
+    for _ in range(zus_data_fetcher.FORCE_REFRESH_BURST + 1):
+        client.get("/aktualne_dane_zus", params={"force_refresh": "true"})
+    before = len(scrapes)
+
+    response = client.post("/admin/odswiez_dane_zus", headers={"Authorization": "Bearer sekret"})
+    assert response.status_code == 200
+    assert len(scrapes) == before + 1
+    assert response.json()["avg_salary"] == 8673.0 + len(scrapes)
+
+
+@pytest.mark.parametrize("token, authorization, status", [
+    (None, "Bearer sekret", 403),
+    ("sekret", None, 401),
+    ("sekret", "Bearer zly", 401),
+    ("sekret", "Basic sekret", 401),
+])
+def test_admin_refresh_requires_the_token(client, scrapes, monkeypatch, token, authorization, status):
+    monkeypatch.setattr(main, "ZUS_ADMIN_TOKEN", token)
+    headers = {"Authorization": authorization} if authorization else {}
+    assert client.post("/admin/odswiez_dane_zus", headers=headers).status_code == status
+    assert scrapes == []
@@ -0,0 +1,73 @@
+# Fresh data timestamps / Znaczniki czasu świeżych danych
+import time
+
+# Test framework / Framework testowy
+import pytest
+
+# Fetcher whose data the responses depend on / Moduł pobierający, od którego danych zależą odpowiedzi
+import zus_data_fetcher
+# Application module / Moduł aplikacji
+import main
+# Cache under test / Testowana pamięć podręczna
+from result_cache import ResultCache
+from zus_data_fetcher import ZUSData
+# Persistent store / Trwały magazyn
+from zus_store import ZUSStore
+
+QUERY = {"income": 12000, "costs": 500, "forma_opodatkowania": "skala", "stawka_vat": 23}
+
+
+@pytest.fixture
+def zus_cache(tmp_path, monkeypatch):
+    """Private ZUS data cache, restored after the test / Prywatna pamięć danych ZUS, przywracana po teście."""
+    monkeypatch.setattr(zus_data_fetcher, "_zus_data_cache", {})
+    monkeypatch.setattr(zus_data_fetcher, "_inflight_fetch", {})
+    monkeypatch.setattr(zus_data_fetcher, "_store", ZUSStore(str(tmp_path / "zus_data.sqlite3")))
+    monkeypatch.setattr(zus_data_fetcher, "_store_failed", False)
+    zus_data_fetcher._store_zus_data(2025, ZUSData(year=2025, avg_salary=8673.0, zus_base=5203.8), time.time())
+    yield
+    main._result_cache.clear()
+
+
+def test_lru_evicts_least_recently_used(monkeypatch):
+    cache = ResultCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    # Expired entries are dropped / Wygasłe wpisy są usuwane
+    monkeypatch.setattr("result_cache.time.monotonic", lambda: float("inf"))
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def test_get_sends_etag_and_answers_304(client, zus_cache):
+    first = client.get("/oblicz", params=QUERY)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == f"public, max-age={main.HTTP_CACHE_MAX_AGE}"
+    assert first.json() == client.post("/oblicz", json=QUERY).json()
+
+    cached = client.get("/oblicz", params=QUERY, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert client.get("/oblicz", params=QUERY, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    # A different input has a different ETag / Inne wejście ma inny ETag
+    other = client.get("/oblicz", params={**QUERY, "income": 12001}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
+
+
+def test_new_zus_data_invalidates_results_and_etags(client, zus_cache):
+    before = client.get("/oblicz", params=QUERY)
+    assert len(main._result_cache) > 0
+    zus_etag = client.get("/aktualne_dane_zus").headers["etag"]
+
+    zus_data_fetcher._store_zus_data(2025, ZUSData(year=2025, avg_salary=9000.0, zus_base=5400.0), time.time())
+    # Listeners cleared the memoized results / Wywołania zwrotne wyczyściły zapamiętane wyniki
+    assert len(main._result_cache) == 0
+
+    after = client.get("/oblicz", params=QUERY, headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()["podstawa_wymiaru_skladek_zus"] == 5400.0
+    assert after.json()["zus_spoleczne_total"] != before.json()["zus_spoleczne_total"]
+    assert client.get("/aktualne_dane_zus", headers={"If-None-Match": zus_etag}).status_code == 200
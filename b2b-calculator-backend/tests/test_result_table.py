@@ -0,0 +1,90 @@
+# Library for paths / Biblioteka do ścieżek
+import os
+# Seeded sampling / Losowanie z ziarnem
+import random
+
+# Test framework / Framework testowy
+import pytest
+
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import FORMY
+# Table under test / Testowana tablica
+from result_table import ResultTable, build_result_table, table_version
+# Full calculation the table must reproduce / Pełne obliczenie, które tablica musi odtworzyć
+from tax_engine import calculate_batch
+# ZUS data model / Model danych ZUS
+from zus_data_fetcher import ZUSData
+
+# Small grid keeps the build fast / Mała siatka przyspiesza budowanie
+MAX_PLN = 15000
+ZUS_INFO = ZUSData(year=2025, avg_salary=8673.0, zus_base=5203.8, baseline_version="2025.1")
+
+
+@pytest.fixture(scope="module", params=[ZUS_INFO, ZUSData(year=2025, error_message="brak danych")],
+                ids=["zus_base", "no_zus_base"])
+def table(request, tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("tables"), "table.bin")
+    build_result_table(path, request.param, max_pln=MAX_PLN)
+    return ResultTable(path, request.param), request.param
+
+
+def _grid_rows(count: int, seed: int):
+    generator = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        income = generator.randint(0, MAX_PLN)
+        rows.append((float(income), float(generator.choice((0, generator.randint(0, income)))),
+                     generator.choice(FORMY), generator.choice((0.0, 8.0, 23.0)),
+                     generator.random() < 0.5, generator.random() < 0.5))
+    # Grid edges / Krawędzie siatki
+    rows += [(0.0, 0.0, forma, 23.0, True, True) for forma in FORMY]
+    rows += [(float(MAX_PLN), float(MAX_PLN), forma, 0.0, False, False) for forma in FORMY]
+    return rows
+
+
+def test_lookup_matches_engine(table):
+    result_table, zus_info = table
+    rows = _grid_rows(5000, seed=6)
+    expected = calculate_batch(*zip(*rows), zus_base=zus_info.zus_base, year=zus_info.year)
+    for position, row in enumerate(rows):
+        actual = result_table.lookup(*row)
+        assert actual is not None, row
+        for field, column in zip(expected._fields, expected):
+            actual_value = getattr(actual, field)
+            if field == "zus_base":
+                assert actual_value == column
+            else:
+                assert actual_value == [column[position]], (field, row)
+
+
+@pytest.mark.parametrize("forma", FORMY)
+def test_every_income_matches_engine(table, forma):
+    result_table, zus_info = table
+    incomes = [float(income) for income in range(MAX_PLN + 1)]
+    for discount, chorobowe in ((False, True), (True, False)):
+        expected = calculate_batch(incomes, [0.0] * len(incomes), [forma] * len(incomes), [0.0] * len(incomes),
+                                   [discount] * len(incomes), [chorobowe] * len(incomes),
+                                   zus_base=zus_info.zus_base, year=zus_info.year)
+        actual = [result_table.lookup(income, 0.0, forma, 0.0, discount, chorobowe).dochod_netto[0]
+                  for income in incomes]
+        assert actual == expected.dochod_netto
+
+
+@pytest.mark.parametrize("row", [
+    (100.5, 0.0, "skala", 0.0, False, True),
+    (100.0, 0.25, "skala", 0.0, False, True),
+    (100.0, 200.0, "liniowy_19", 0.0, False, True),
+    (MAX_PLN + 1.0, 0.0, "ryczalt_12", 0.0, False, True),
+])
+def test_lookup_outside_grid_returns_none(table, row):
+    result_table, _ = table
+    assert result_table.lookup(*row) is None
+
+
+def test_table_rejects_other_zus_data(tmp_path):
+    path = str(tmp_path / "table.bin")
+    build_result_table(path, ZUS_INFO, max_pln=100)
+    other = ZUSData(year=2025, avg_salary=9000.0, zus_base=5400.0, baseline_version="2025.1")
+    assert table_version(other) != table_version(ZUS_INFO)
+    with pytest.raises(ValueError):
+        ResultTable(path, other)
@@ -0,0 +1,72 @@
+# Test framework / Framework testowy
+import pytest
+
+# Frozen per-request calculation / Zamrożone obliczenie dla pojedynczego żądania
+from baseline_reference import random_inputs, reference_calculation
+# Engine under test / Testowany silnik
+from tax_engine import (ERROR_INVALID_FORMA, ERROR_NEGATIVE_COSTS, ERROR_NEGATIVE_INCOME, calculate_batch,
+                        validate_row, zus_spoleczne_for_year)
+
+# ZUS base of the bundled 2025 baseline / Podstawa ZUS z dołączonych danych bazowych 2025
+ZUS_BASE = 5203.8
+YEAR = 2025
+
+
+def _engine_rows(inputs, zus_base):
+    result = calculate_batch(
+        income=[row["income"] for row in inputs],
+        costs=[row["costs"] for row in inputs],
+        forma_opodatkowania=[row["forma_opodatkowania"] for row in inputs],
+        stawka_vat=[row["stawka_vat"] for row in inputs],
+        has_tax_discount=[row["has_tax_discount"] for row in inputs],
+        platnik_chorobowe=[row["platnik_chorobowe"] for row in inputs],
+        zus_base=zus_base,
+        year=YEAR,
+    )
+    for position in range(len(inputs)):
+        yield {
+            "zus_spoleczne_details": [
+                {"nazwa": nazwa, "procent": procent, "podstawa": podstawa, "kwota": kwota}
+                for nazwa, procent, podstawa, kwota in result.zus_spoleczne_details[position]],
+            "zus_spoleczne_total": result.zus_spoleczne_total[position],
+            "skladka_zdrowotna": result.skladka_zdrowotna[position],
+            "podatek_pit": result.podatek_pit[position],
+            "vat": result.vat[position],
+            "calkowite_obciazenie": result.calkowite_obciazenie[position],
+            "dochod_netto": result.dochod_netto[position],
+            "ostrzezenia": list(result.ostrzezenia[position]),
+        }
+
+
+@pytest.mark.parametrize("zus_base", [ZUS_BASE, None, 0.0])
+def test_batch_matches_reference(zus_base):
+    inputs = random_inputs(3000, seed=1)
+    for row, actual in zip(inputs, _engine_rows(inputs, zus_base)):
+        assert actual == reference_calculation(zus_base=zus_base, **row), row
+
+
+def test_batch_is_independent_of_batch_composition():
+    inputs = random_inputs(200, seed=2)
+    together = list(_engine_rows(inputs, ZUS_BASE))
+    one_by_one = [next(_engine_rows([row], ZUS_BASE)) for row in inputs]
+    assert together == one_by_one
+
+
+@pytest.mark.parametrize("income, costs, forma, expected", [
+    (-0.01, 0.0, "skala", ERROR_NEGATIVE_INCOME),
+    (100.0, -1.0, "skala", ERROR_NEGATIVE_COSTS),
+    (100.0, 0.0, "ryczalt_8", ERROR_INVALID_FORMA),
+    (0.0, 0.0, "liniowy_19", None),
+])
+def test_validate_row(income, costs, forma, expected):
+    assert validate_row(income, costs, forma) == expected
+
+
+@pytest.mark.parametrize("chorobowe", [True, False])
+def test_zus_spoleczne_for_year_matches_reference(chorobowe):
+    for zus_base in (ZUS_BASE, None):
+        zus = zus_spoleczne_for_year(zus_base, chorobowe, YEAR)
+        expected = reference_calculation(0.0, 0.0, "skala", 0.0, False, chorobowe, zus_base)
+        assert zus.total == expected["zus_spoleczne_total"]
+        assert [{"nazwa": nazwa, "procent": procent, "podstawa": podstawa, "kwota": kwota}
+                for nazwa, procent, podstawa, kwota in zus.details] == expected["zus_spoleczne_details"]
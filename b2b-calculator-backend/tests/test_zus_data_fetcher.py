@@ -0,0 +1,235 @@
+# Running the fetcher's coroutines / Uruchamianie korutyn modułu pobierającego
+import asyncio
+# Library for paths / Biblioteka do ścieżek
+import os
+# Importing the app in a fresh interpreter / Importowanie aplikacji w świeżym interpreterze
+import subprocess
+import sys
+# Slow stand-in scrapes / Powolne zastępcze pobrania
+import time
+
+# Test framework / Framework testowy
+import pytest
+
+# Fetcher under test / Testowany moduł pobierający
+import zus_data_fetcher
+from zus_data_fetcher import ZUSData, fetch_and_cache_zus_data_async
+# Persistent store / Trwały magazyn
+from zus_store import ZUSStore
+
+YEAR = 2025
+GOOD = ZUSData(year=YEAR, avg_salary=8673.0, zus_base=5203.8)
+FAILED = ZUSData(year=YEAR, error_message="ZUS Fetcher: Error fetching data from URL: test")
+
+
+class FakeScraper:
+    """Counts scrapes and returns a fixed result after a short delay / Liczy pobrania i zwraca stały wynik po krótkim opóźnieniu."""
+
+    def __init__(self, result: ZUSData, delay: float = 0.05):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, year: int) -> ZUSData:
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Fresh in-memory cache and store for every test / Świeża pamięć podręczna i magazyn dla każdego testu."""
+    store = ZUSStore(str(tmp_path / "zus_data.sqlite3"))
+    monkeypatch.setattr(zus_data_fetcher, "_zus_data_cache", {})
+    monkeypatch.setattr(zus_data_fetcher, "_inflight_fetch", {})
+    monkeypatch.setattr(zus_data_fetcher, "_store", store)
+    monkeypatch.setattr(zus_data_fetcher, "_store_failed", False)
+    return store
+
+
+def _scraper(monkeypatch, result: ZUSData, delay: float = 0.05) -> FakeScraper:
+    scraper = FakeScraper(result, delay)
+    monkeypatch.setattr(zus_data_fetcher, "_scrape_zus_data", scraper)
+    return scraper
+
+# === Single Flight and Negative Cache / Jedno pobieranie i negatywna pamięć podręczna ===
+
+
+def test_concurrent_misses_share_one_scrape(store, monkeypatch):
+    scraper = _scraper(monkeypatch, GOOD, delay=0.2)
+
+    async def run():
+        return await asyncio.gather(*(fetch_and_cache_zus_data_async(year=YEAR) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert scraper.calls == 1
+    assert all(result == GOOD for result in results)
+    # Persisted for other workers / Zapisane dla innych procesów roboczych
+    assert store.load(YEAR)[:2] == (GOOD.avg_salary, GOOD.zus_base)
+    # Served from memory afterwards / Potem serwowane z pamięci
+    assert asyncio.run(fetch_and_cache_zus_data_async(year=YEAR)) == GOOD
+    assert scraper.calls == 1
+
+
+def test_failures_are_cached_with_growing_backoff(store, monkeypatch):
+    scraper = _scraper(monkeypatch, FAILED)
+    entry = zus_data_fetcher._cache_entry(YEAR)
+
+    assert asyncio.run(fetch_and_cache_zus_data_async(year=YEAR)) == FAILED
+    assert asyncio.run(fetch_and_cache_zus_data_async(year=YEAR)) == FAILED
+    assert scraper.calls == 1
+    assert zus_data_fetcher._negative_cache_ttl(entry) == zus_data_fetcher.NEGATIVE_CACHE_TTL_MIN
+
+    # Backoff over: retried once, then the next backoff is twice as long
+    # Koniec wycofywania: jedna ponowna próba, a kolejne wycofywanie jest dwa razy dłuższe
+    entry["error_timestamp"] -= zus_data_fetcher.NEGATIVE_CACHE_TTL_MIN + 1
+    assert asyncio.run(fetch_and_cache_zus_data_async(year=YEAR)) == FAILED
+    assert scraper.calls == 2
+    assert zus_data_fetcher._negative_cache_ttl(entry) == 2 * zus_data_fetcher.NEGATIVE_CACHE_TTL_MIN
+
+    entry["failures"] = 100
+    assert zus_data_fetcher._negative_cache_ttl(entry) == zus_data_fetcher.NEGATIVE_CACHE_TTL_MAX
+    # A success clears the failure streak / Sukces kasuje serię niepowodzeń
+    scraper.result = GOOD
+    entry["error_timestamp"] = 0
+    assert asyncio.run(fetch_and_cache_zus_data_async(year=YEAR)) == GOOD
+    assert entry["failures"] == 0 and entry["error_data"] is None
+
+
+def test_stale_data_is_served_while_one_task_refreshes(store, monkeypatch):
+    scraper = _scraper(monkeypatch, GOOD, delay=0.2)
+    stale = ZUSData(year=YEAR, avg_salary=8000.0, zus_base=4800.0)
+    zus_data_fetcher._store_zus_data(YEAR, stale, time.time() - zus_data_fetcher.ZUS_CACHE_TTL - 1)
+
+    async def run():
+        first = await asyncio.gather(*(fetch_and_cache_zus_data_async(year=YEAR) for _ in range(10)))
+        await zus_data_fetcher._inflight_fetch[YEAR]
+        return first, await fetch_and_cache_zus_data_async(year=YEAR)
+
+    first, after = asyncio.run(run())
+    assert all(result == stale for result in first)
+    assert after == GOOD
+    assert scraper.calls == 1
+
+
+def test_cancelled_request_does_not_cancel_the_shared_fetch(store, monkeypatch):
+    scraper = _scraper(monkeypatch, GOOD, delay=0.2)
+
+    async def run():
+        waiting = asyncio.ensure_future(fetch_and_cache_zus_data_async(year=YEAR))
+        other = asyncio.ensure_future(fetch_and_cache_zus_data_async(year=YEAR))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        return await other
+
+    assert asyncio.run(run()) == GOOD
+    assert scraper.calls == 1
+
+# === Persistent Store and Refresh Lease / Trwały magazyn i dzierżawa odświeżania ===
+
+
+def test_waits_for_the_process_holding_the_lease(store, monkeypatch):
+    scraper = _scraper(monkeypatch, FAILED)
+    # Another worker on the same file / Inny proces roboczy na tym samym pliku
+    other = ZUSStore(store.path)
+    assert other.try_acquire_refresh(YEAR, zus_data_fetcher.REFRESH_LEASE_SECONDS)
+
+    async def run():
+        def finish_other_refresh():
+            other.save(YEAR, GOOD.avg_salary, GOOD.zus_base, time.time())
+            other.release_refresh(YEAR)
+        asyncio.get_running_loop().call_later(0.5, finish_other_refresh)
+        return await asyncio.gather(*(fetch_and_cache_zus_data_async(year=YEAR) for _ in range(5)))
+
+    assert all(result == GOOD for result in asyncio.run(run()))
+    assert scraper.calls == 0
+
+
+def test_scrapes_itself_when_the_lease_holder_fails(store, monkeypatch):
+    scraper = _scraper(monkeypatch, GOOD)
+    other = ZUSStore(store.path)
+    assert other.try_acquire_refresh(YEAR, zus_data_fetcher.REFRESH_LEASE_SECONDS)
+
+    async def run():
+        # Released without data: the other fetch failed / Zwolniona bez danych: inne pobieranie się nie powiodło
+        asyncio.get_running_loop().call_later(0.5, other.release_refresh, YEAR)
+        return await fetch_and_cache_zus_data_async(year=YEAR)
+
+    started = time.monotonic()
+    assert asyncio.run(run()) == GOOD
+    assert scraper.calls == 1
+    # Did not wait for the whole lease / Nie czekał na całą dzierżawę
+    assert time.monotonic() - started < zus_data_fetcher.REFRESH_LEASE_SECONDS / 2
+
+
+def test_stale_data_is_kept_while_another_process_refreshes(store, monkeypatch):
+    scraper = _scraper(monkeypatch, GOOD)
+    stale = ZUSData(year=YEAR, avg_salary=8000.0, zus_base=4800.0)
+    zus_data_fetcher._store_zus_data(YEAR, stale, time.time() - zus_data_fetcher.ZUS_CACHE_TTL - 1)
+    other = ZUSStore(store.path)
+    assert other.try_acquire_refresh(YEAR, zus_data_fetcher.REFRESH_LEASE_SECONDS)
+
+    async def run():
+        first = await fetch_and_cache_zus_data_async(year=YEAR)
+        await zus_data_fetcher._inflight_fetch[YEAR]
+        return first, await fetch_and_cache_zus_data_async(year=YEAR)
+
+    assert asyncio.run(run()) == (stale, stale)
+    assert scraper.calls == 0
+    # The next attempt waits a poll interval / Kolejna próba czeka jeden interwał odczytu
+    assert zus_data_fetcher._cache_entry(YEAR)["refresh_not_before"] > time.time()
+
+
+def test_startup_loads_the_store_without_scraping(store, monkeypatch):
+    scraper = _scraper(monkeypatch, FAILED)
+    monkeypatch.setattr(zus_data_fetcher, "ZUS_STARTUP_MODE", "live")
+    store.save(YEAR, GOOD.avg_salary, GOOD.zus_base, time.time())
+
+    async def run():
+        await zus_data_fetcher.warm_up_zus_data()
+        return await fetch_and_cache_zus_data_async(year=YEAR)
+
+    assert asyncio.run(run()) == GOOD
+    assert scraper.calls == 0
+
+
+@pytest.mark.parametrize("rok, status", [(2022, 422), (2027, 422), (1, 422), (2025, 200)])
+def test_only_years_near_zus_info_year_are_accepted(client, rok, status):
+    assert client.get("/aktualne_dane_zus", params={"rok": rok}).status_code == status
+
+# === Baseline Startup / Start z danych bazowych ===
+
+
+def test_baseline_is_served_until_live_data_arrives(store, monkeypatch):
+    scraper = _scraper(monkeypatch, GOOD, delay=0.3)
+    monkeypatch.setattr(zus_data_fetcher, "ZUS_STARTUP_MODE", "baseline")
+    baseline = zus_data_fetcher.load_zus_baseline(zus_data_fetcher.ZUS_BASELINE_PATH)[YEAR]
+
+    async def run():
+        await zus_data_fetcher.warm_up_zus_data()
+        # Answered at once while the refresh runs / Odpowiedź od razu, gdy trwa odświeżanie
+        during = await fetch_and_cache_zus_data_async(year=YEAR)
+        await zus_data_fetcher._inflight_fetch[YEAR]
+        return during, await fetch_and_cache_zus_data_async(year=YEAR)
+
+    during, after = asyncio.run(run())
+    assert during == baseline and during.baseline_version is not None
+    assert after == GOOD
+    assert scraper.calls == 1
+
+
+def test_stored_data_takes_precedence_over_the_baseline(store, monkeypatch):
+    scraper = _scraper(monkeypatch, FAILED)
+    monkeypatch.setattr(zus_data_fetcher, "ZUS_STARTUP_MODE", "baseline")
+    store.save(YEAR, GOOD.avg_salary, GOOD.zus_base, time.time())
+    asyncio.run(zus_data_fetcher.warm_up_zus_data())
+    assert asyncio.run(fetch_and_cache_zus_data_async(year=YEAR)) == GOOD
+    assert scraper.calls == 0
+
+
+def test_importing_the_app_does_not_load_the_scraping_stack():
+    # A fresh interpreter with the test environment / Świeży interpreter ze środowiskiem testowym
+    code = "import sys, main; print(sorted(name for name in ('requests', 'bs4') if name in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(zus_data_fetcher.__file__),
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,56 @@
+# Library for paths / Biblioteka do ścieżek
+import os
+
+# Test framework / Framework testowy
+import pytest
+
+# Extractor under test / Testowany ekstraktor
+from zus_page_parser import PARSE_CHUNK_BYTES, extract_avg_salary
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "benchmarks", "fixtures", "zus_2025.html")
+# Sentence split across tags, with entities and multi-byte characters / Zdanie podzielone między tagi, z encjami i znakami wielobajtowymi
+PAGE = ("<html><head><script>var s = 'Kwota prognozowanego przeciętnego wynagrodzenia w 2025 roku wynosi 1 zł.';"
+        "</script></head><body><p><strong>Kwota prognozowanego przeciętnego\n   wynagrodzenia</strong> w 2025 roku "
+        "wynosi 8&nbsp;673&nbsp;zł.</p><p>Najniższa podstawa wymiaru składek</p></body></html>").encode("utf-8")
+
+
+def _split(body: bytes, size: int):
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+def test_fixture_page():
+    with open(FIXTURE, "rb") as page:
+        body = page.read()
+    assert extract_avg_salary(_split(body, PARSE_CHUNK_BYTES), 2025).avg_salary == 8673.0
+    # Reading stops at the chunk holding the amount / Odczyt kończy się na porcji zawierającej kwotę
+    early = extract_avg_salary(_split(body, 1024), 2025)
+    assert early.avg_salary == 8673.0
+    assert early.bytes_read < len(body) and early.bytes_read % 1024 == 0
+
+
+def test_every_split_point_finds_the_salary():
+    for offset in range(len(PAGE) + 1):
+        chunks = [PAGE[:offset], PAGE[offset:]]
+        assert extract_avg_salary(chunks, 2025).avg_salary == 8673.0, offset
+    # Byte by byte, reading stops right after the amount / Bajt po bajcie odczyt kończy się tuż za kwotą
+    byte_by_byte = extract_avg_salary(_split(PAGE, 1), 2025)
+    assert byte_by_byte.avg_salary == 8673.0
+    assert PAGE.index("673&nbsp;zł".encode("utf-8")) < byte_by_byte.bytes_read < PAGE.index(b"Najni")
+
+
+def test_unparseable_amounts_are_skipped():
+    body = ("<p>Kwota prognozowanego przeciętnego wynagrodzenia w 2025 roku wynosi 8,673 zł.</p>"
+            "<p>Kwota prognozowanego przeciętnego wynagrodzenia w 2025 roku wynosi 8 673 zł.</p>").encode("utf-8")
+    assert extract_avg_salary([body], 2025) == (8673.0, ["8,673 "], len(body))
+
+
+@pytest.mark.parametrize("year", [2024, 2026])
+def test_other_year_reads_the_whole_page(year):
+    result = extract_avg_salary(_split(PAGE, 64), year)
+    assert result == (None, [], len(PAGE))
+
+
+def test_declared_encoding():
+    body = PAGE.decode("utf-8").encode("cp1250")
+    assert extract_avg_salary(_split(body, 7), 2025, encoding="cp1250").avg_salary == 8673.0
@@ -1,15 +1,30 @@
-# Library for making HTTP requests / Biblioteka do wykonywania żądań HTTP
-import requests
-# Library for regular expressions / Biblioteka do wyrażeń regularnych
-import re
 # Library for time-related functions (used for caching) / Biblioteka do funkcji związanych z czasem (używana do buforowania)
 import time
-# Library for parsing HTML / Biblioteka do parsowania HTML
-from bs4 import BeautifulSoup
+# Library for running the blocking fetch off the event loop / Biblioteka do uruchamiania blokującego pobierania poza pętlą zdarzeń
+import asyncio
+# Library for paths and environment variables / Biblioteka do ścieżek i zmiennych środowiskowych
+import os
+# Errors raised by the persistent store / Błędy zgłaszane przez trwały magazyn
+import sqlite3
+# Library for reading the bundled baseline / Biblioteka do odczytu dołączonych danych bazowych
+import json
+# Library for hashing data versions / Biblioteka do haszowania wersji danych
+import hashlib
+# Structured, leveled logging / Strukturalne logowanie z poziomami
+import logging
 # Library for data validation and settings management using Python type annotations / Biblioteka do walidacji danych i zarządzania ustawieniami przy użyciu adnotacji typów Python
 from pydantic import BaseModel
-# For type hinting optional values / Do typowania opcjonalnych wartości
-from typing import Optional
+# For type hinting / Do typowania
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# In-process metrics / Metryki w procesie
+from metrics import REGISTRY
+# Rate limit for forced refreshes / Limit częstotliwości wymuszonych odświeżeń
+from refresh_admission import RefreshAdmission
+# Persistent year-keyed store / Trwały magazyn z kluczem rocznym
+from zus_store import StoredRow, ZUSStore
+
+logger = logging.getLogger(__name__)
 
 # === Data Models / Modele danych ===
 
@@ -24,102 +39,318 @@ class ZUSData(BaseModel):
     zus_base: Optional[float] = None
     # To store an error message if fetching fails / Do przechowywania komunikatu o błędzie, jeśli pobieranie się nie powiedzie
     error_message: Optional[str] = None
+    # Version of the bundled baseline if the data comes from it, not from zus.pl
+    # Wersja dołączonych danych bazowych, jeśli dane pochodzą z nich, a nie z zus.pl
+    baseline_version: Optional[str] = None
 
 
 # === Cache / Pamięć podręczna (Kesz) ===
-_zus_data_cache = {
-    "data": None,  # Cached data object / Zbuforowany obiekt danych
-    "timestamp": 0,  # Timestamp of the last update / Znacznik czasu ostatniej aktualizacji
-    # Cache Time To Live in seconds (1 hour) / Czas życia pamięci podręcznej w sekundach (1 godzina)
-    "ttl": 3600
-}
+# In-memory cache entries per year, in front of the persistent store
+# Wpisy pamięci podręcznej dla każdego roku, przed trwałym magazynem
+_zus_data_cache: Dict[int, dict] = {}
+# Fetches currently in progress per year, shared by concurrent callers
+# Pobierania w toku dla każdego roku, współdzielone przez równoczesne wywołania
+_inflight_fetch: Dict[int, "asyncio.Task"] = {}
+# Persistent store, opened lazily / Trwały magazyn, otwierany leniwie
+_store: Optional[ZUSStore] = None
+_store_failed = False
+# Callbacks run with the year whenever new data is loaded / Wywołania zwrotne uruchamiane z rokiem po wczytaniu nowych danych
+_zus_data_listeners: List[Callable[[int], None]] = []
+
+
+# === Metrics / Metryki ===
+
+
+def _data_age_samples():
+    """Seconds since each cached year was scraped / Sekundy od pobrania każdego zbuforowanego roku."""
+    now = time.time()
+    return [((str(year),), now - entry["timestamp"])
+            for year, entry in list(_zus_data_cache.items())
+            if entry["data"] is not None and entry["data"].baseline_version is None]
+
+
+# hit, stale_hit, negative_hit or miss for each lookup / hit, stale_hit, negative_hit lub miss dla każdego wyszukania
+_CACHE_EVENTS = REGISTRY.counter(
+    "b2b_zus_data_cache_events_total", "ZUS data cache lookups by outcome.", ("event",))
+# success, failure, or skipped when another process holds the lease / success, failure lub skipped, gdy dzierżawę trzyma inny proces
+_REFRESHES = REGISTRY.counter(
+    "b2b_zus_data_refreshes_total", "ZUS data refresh attempts by result.", ("result",))
+# admitted, coalesced, limited or privileged for each forced refresh
+# admitted, coalesced, limited lub privileged dla każdego wymuszonego odświeżenia
+_FORCE_REFRESHES = REGISTRY.counter(
+    "b2b_zus_force_refreshes_total", "Forced ZUS data refresh requests by outcome.", ("outcome",))
+_SCRAPE_DURATION = REGISTRY.histogram(
+    "b2b_zus_scrape_duration_seconds", "Time to download and parse the ZUS page.")
+REGISTRY.gauge("b2b_zus_data_age_seconds", "Age of the cached ZUS data.", ("year",), _data_age_samples)
 
 # === Configuration / Konfiguracja ===
 # Year for which we are fetching data / Rok, dla którego pobieramy dane
 ZUS_INFO_YEAR = 2025
+# Other years that may be requested, around ZUS_INFO_YEAR; every year means an upstream scrape and a cache entry
+# Inne lata, o które można pytać, wokół ZUS_INFO_YEAR; każdy rok to pobranie ze strony ZUS i wpis w pamięci
+ZUS_YEARS_BACK = 2
+ZUS_YEARS_AHEAD = 1
 # URL template for the ZUS page containing the data / Szablon URL strony ZUS zawierającej dane
 # WARNING: This URL and pattern might become outdated if ZUS changes its website structure.
 # OSTRZEŻENIE: Ten URL i wzorzec mogą stać się nieaktualne, jeśli ZUS zmieni strukturę swojej strony internetowej.
-ZUS_INFO_URL_TEMPLATE = "https://www.zus.pl/-/nowe-wysoko%C5%9Bci-sk%C5%82adek-na-ubezpieczenia-spo%C5%82eczne-w-{year}-r.?p_l_back_url=%2Fwyniki-wyszukiwania%3Fquery%3Dkwota%2Bprognozowanego%2Bprzeci%25C4%2599tnego%2Bwynagrodzenia%26dateFrom%3D%26dateTo%3D"
-# Regular expression pattern template to find the salary text / Szablon wzorca wyrażenia regularnego do znalezienia tekstu z wynagrodzeniem
-ZUS_SALARY_PATTERN_TEMPLATE = r"Kwota\s+prognozowanego\s+przeciętnego\s+wynagrodzenia\s+w\s+{year}\s+roku\s+wynosi\s+([\d\s.,]+)\s*zł\.?"
+# Can be pointed at a local stand-in with the ZUS_INFO_URL_TEMPLATE variable (e.g. in benchmarks)
+# Można go skierować na lokalny zamiennik zmienną ZUS_INFO_URL_TEMPLATE (np. w benchmarkach)
+ZUS_INFO_URL_TEMPLATE = os.environ.get(
+    "ZUS_INFO_URL_TEMPLATE",
+    "https://www.zus.pl/-/nowe-wysoko%C5%9Bci-sk%C5%82adek-na-ubezpieczenia-spo%C5%82eczne-w-{year}-r.?p_l_back_url=%2Fwyniki-wyszukiwania%3Fquery%3Dkwota%2Bprognozowanego%2Bprzeci%25C4%2599tnego%2Bwynagrodzenia%26dateFrom%3D%26dateTo%3D")
+# The salary pattern (ZUS_SALARY_PATTERN_TEMPLATE) lives in zus_page_parser
+# Wzorzec wynagrodzenia (ZUS_SALARY_PATTERN_TEMPLATE) znajduje się w zus_page_parser
 # Request timeout in seconds / Limit czasu żądania w sekundach
 REQUEST_TIMEOUT = 10
+# Failed fetches are cached for this long, doubling with each consecutive failure
+# Nieudane pobrania są buforowane na ten czas, podwajany przy każdym kolejnym niepowodzeniu
+NEGATIVE_CACHE_TTL_MIN = 30
+# Upper limit of the failure backoff in seconds / Górny limit wycofywania po niepowodzeniu w sekundach
+NEGATIVE_CACHE_TTL_MAX = 600
+# Cache Time To Live in seconds (1 hour); stale data is still served while it refreshes
+# Czas życia pamięci podręcznej w sekundach (1 godzina); nieaktualne dane są nadal serwowane podczas odświeżania
+ZUS_CACHE_TTL = 3600
+# Persistent store shared by all workers / Trwały magazyn współdzielony przez wszystkie procesy robocze
+ZUS_STORE_PATH = os.environ.get(
+    "ZUS_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "zus_data.sqlite3"))
+# How long one process may hold the refresh lease / Jak długo jeden proces może trzymać dzierżawę odświeżania
+REFRESH_LEASE_SECONDS = REQUEST_TIMEOUT * 3
+# How often stale data is re-read from the store (another worker may have refreshed it)
+# Jak często nieaktualne dane są ponownie odczytywane z magazynu (inny proces mógł je odświeżyć)
+STORE_POLL_INTERVAL = 5
+# "live" waits for zus.pl when nothing is stored; "baseline" serves the bundled baseline until live data arrives,
+# for scale-to-zero deployments where the first request must not wait for a scrape
+# "live" czeka na zus.pl, gdy nic nie jest zapisane; "baseline" serwuje dołączone dane bazowe do czasu nadejścia
+# aktualnych danych, dla wdrożeń skalowanych do zera, w których pierwsze żądanie nie może czekać na pobranie
+ZUS_STARTUP_MODE = os.environ.get("ZUS_STARTUP_MODE", "live")
+# Versioned ZUS parameters shipped with the service / Wersjonowane parametry ZUS dostarczane z usługą
+ZUS_BASELINE_PATH = os.environ.get(
+    "ZUS_BASELINE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "zus_baseline.json"))
+# Forced refreshes a process admits at once, and seconds to regain one
+# Wymuszone odświeżenia dopuszczane przez proces naraz oraz sekundy do odzyskania jednego
+FORCE_REFRESH_BURST = 3
+FORCE_REFRESH_INTERVAL = 120
+# Seconds after a forced refresh of a year before another one is admitted
+# Sekundy po wymuszonym odświeżeniu roku, zanim zostanie dopuszczone kolejne
+FORCE_REFRESH_COOLDOWN = 60
+# Admission of forced refreshes in this process / Dopuszczanie wymuszonych odświeżeń w tym procesie
+_force_refresh_admission = RefreshAdmission(FORCE_REFRESH_BURST, FORCE_REFRESH_INTERVAL, FORCE_REFRESH_COOLDOWN)
 
-# === Main Data Fetching Function / Główna funkcja pobierania danych ===
 
+def is_supported_year(year: int) -> bool:
+    """
+    True for years that may be fetched: ZUS_INFO_YEAR - ZUS_YEARS_BACK to ZUS_INFO_YEAR + ZUS_YEARS_AHEAD.
+    True dla lat, które można pobrać: od ZUS_INFO_YEAR - ZUS_YEARS_BACK do ZUS_INFO_YEAR + ZUS_YEARS_AHEAD.
+    """
+    return ZUS_INFO_YEAR - ZUS_YEARS_BACK <= year <= ZUS_INFO_YEAR + ZUS_YEARS_AHEAD
+
+# === Data Versions / Wersje danych ===
 
-def fetch_and_cache_zus_data(force_refresh: bool = False) -> ZUSData:
+
+def zus_data_version(data: ZUSData) -> str:
+    """
+    Short hash identifying a ZUSData value, used in result cache keys and ETags.
+    Krótki skrót identyfikujący wartość ZUSData, używany w kluczach pamięci wyników i w ETagach.
     """
-    Fetches and caches data about the projected average salary and ZUS base.
-    Pobiera i buforuje dane o prognozowanym przeciętnym wynagrodzeniu i podstawie ZUS.
+    raw = repr((data.year, data.avg_salary, data.zus_base, data.error_message, data.baseline_version))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def add_zus_data_listener(callback: Callable[[int], None]) -> None:
+    """
+    Registers a callback run with the year each time new ZUS data is loaded.
+    Rejestruje wywołanie zwrotne uruchamiane z rokiem przy każdym wczytaniu nowych danych ZUS.
+    """
+    _zus_data_listeners.append(callback)
+
+
+def _notify_zus_data_changed(year: int) -> None:
+    """Runs the registered listeners / Uruchamia zarejestrowane wywołania zwrotne."""
+    for callback in _zus_data_listeners:
+        callback(year)
+
+# === Cache Helpers / Funkcje pomocnicze pamięci podręcznej ===
+
+
+def _cache_entry(year: int) -> dict:
+    """Returns (creating if needed) the cache entry for a year / Zwraca (tworząc w razie potrzeby) wpis pamięci podręcznej dla roku."""
+    entry = _zus_data_cache.get(year)
+    if entry is None:
+        entry = {
+            "data": None,  # Cached data object / Zbuforowany obiekt danych
+            "timestamp": 0,  # Time the data was scraped / Czas pobrania danych
+            # Last failed fetch result (negative cache) / Wynik ostatniego nieudanego pobrania (negatywna pamięć podręczna)
+            "error_data": None,
+            "error_timestamp": 0,  # Timestamp of the last failure / Znacznik czasu ostatniego niepowodzenia
+            # Consecutive failures, used for backoff / Kolejne niepowodzenia, używane do wycofywania (backoff)
+            "failures": 0,
+            "store_checked": 0,  # Last read of the store / Ostatni odczyt magazynu
+            # No refresh attempt before this time / Brak próby odświeżenia przed tym czasem
+            "refresh_not_before": 0,
+        }
+        _zus_data_cache[year] = entry
+    return entry
+
+
+def _get_store() -> Optional[ZUSStore]:
+    """
+    Opens the persistent store on first use. Without it the service runs memory-only.
+    Otwiera trwały magazyn przy pierwszym użyciu. Bez niego usługa działa tylko w pamięci.
+    """
+    global _store, _store_failed
+    if _store is None and not _store_failed:
+        try:
+            _store = ZUSStore(ZUS_STORE_PATH)
+        except sqlite3.Error as e:
+            logger.warning("Persistent store unavailable, using memory only", extra={"error": str(e)})
+            _store_failed = True
+    return _store
+
+
+def _negative_cache_ttl(entry: dict) -> float:
+    """Backoff for the current failure streak / Czas wycofywania dla bieżącej serii niepowodzeń."""
+    failures = max(1, entry["failures"])
+    return min(NEGATIVE_CACHE_TTL_MAX, NEGATIVE_CACHE_TTL_MIN * 2 ** (failures - 1))
 
-    Args:
-        force_refresh: If True, ignores the cache and makes a new request. / Jeśli True, ignoruje pamięć podręczną i wykonuje nowe żądanie.
+
+def _adopt_stored_row(year: int, row: StoredRow) -> None:
+    """Takes data from the store if it is newer than ours / Przejmuje dane z magazynu, jeśli są nowsze niż nasze."""
+    avg_salary, zus_base, fetched_at = row
+    entry = _cache_entry(year)
+    if fetched_at > entry["timestamp"]:
+        previous = entry["data"]
+        entry["data"] = ZUSData(year=year, avg_salary=avg_salary, zus_base=zus_base)
+        entry["timestamp"] = fetched_at
+        entry["error_data"] = None
+        entry["failures"] = 0
+        if previous != entry["data"]:
+            _notify_zus_data_changed(year)
+
+
+def _read_stored_row(year: int) -> Optional[StoredRow]:
+    """Reads a year from the store. Blocking / Odczytuje rok z magazynu. Blokujące."""
+    store = _get_store()
+    if store is None:
+        return None
+    try:
+        return store.load(year)
+    except sqlite3.Error as e:
+        logger.error("Error reading persistent store", extra={"year": year, "error": str(e)})
+        return None
+
+
+def _store_poll_due(year: int, current_time: float) -> bool:
+    """
+    True at most every STORE_POLL_INTERVAL seconds per year, marking the poll as done.
+    True nie częściej niż co STORE_POLL_INTERVAL sekund dla roku, oznaczając odczyt jako wykonany.
+    """
+    entry = _cache_entry(year)
+    if current_time - entry["store_checked"] < STORE_POLL_INTERVAL:
+        return False
+    entry["store_checked"] = current_time
+    return True
+
+
+async def _reload_from_store_async(year: int, current_time: float) -> None:
+    """
+    Re-reads a year from the store, at most every STORE_POLL_INTERVAL seconds, with the SQLite read in a worker
+    thread. The row is adopted on the event loop, so listeners still run there.
+    Ponownie odczytuje rok z magazynu, nie częściej niż co STORE_POLL_INTERVAL sekund, z odczytem SQLite w wątku
+    roboczym. Wiersz jest przejmowany w pętli zdarzeń, więc wywołania zwrotne nadal są tam uruchamiane.
+    """
+    if _store_poll_due(year, current_time):
+        row = await asyncio.to_thread(_read_stored_row, year)
+        if row is not None:
+            _adopt_stored_row(year, row)
+
+
+def _lookup_zus_data(year: int, current_time: float) -> Tuple[Optional[ZUSData], bool]:
+    """
+    Looks a year up in memory only; the store is read by the refresh task, off the event loop.
+    Wyszukuje rok tylko w pamięci; magazyn jest odczytywany przez zadanie odświeżania, poza pętlą zdarzeń.
 
     Returns:
-        ZUSData object with the fetched data or an error message. / Obiekt ZUSData z pobranymi danymi lub komunikatem o błędzie.
+        (data, needs_refresh). Data may be stale or a cached failure; None means nothing is known yet.
+        (dane, needs_refresh). Dane mogą być nieaktualne lub być zbuforowanym niepowodzeniem; None oznacza brak danych.
     """
-    current_time = time.time()
-    year = ZUS_INFO_YEAR
-
-    # Check cache / Sprawdzenie pamięci podręcznej
-    cached_data = _zus_data_cache.get("data")
-    # Check if cache is valid / Sprawdź, czy pamięć podręczna jest ważna
-    if not force_refresh and cached_data and \
-       (current_time - _zus_data_cache.get("timestamp", 0) < _zus_data_cache.get("ttl", 0)):
-        print(f"ZUS Fetcher: Returning cached data for {year}")
-        # Return cached data if valid / Zwróć dane z pamięci podręcznej, jeśli są ważne
-        return cached_data
-
-    # If cache is invalid or force_refresh is True, fetch new data / Jeśli pamięć podręczna jest nieważna lub force_refresh jest True, pobierz nowe dane
-    print(f"ZUS Fetcher: Fetching new data for {year} from zus.pl")
+    entry = _cache_entry(year)
+
+    # Don't retry the scrape while the upstream is known to be failing
+    # Nie ponawiaj pobierania, gdy wiadomo, że źródło zwraca błędy
+    in_backoff = entry["error_data"] is not None and \
+        current_time - entry["error_timestamp"] < _negative_cache_ttl(entry)
+    may_refresh = not in_backoff and current_time >= entry["refresh_not_before"]
+
+    if entry["data"] is not None:
+        if current_time - entry["timestamp"] < ZUS_CACHE_TTL:
+            _CACHE_EVENTS.inc("hit")
+            logger.debug("Returning cached data", extra={"year": year})
+            return entry["data"], False
+        # Stale-while-revalidate / Serwuj nieaktualne dane podczas odświeżania
+        _CACHE_EVENTS.inc("stale_hit")
+        logger.debug("Returning stale data", extra={"year": year})
+        return entry["data"], may_refresh
+    if in_backoff:
+        _CACHE_EVENTS.inc("negative_hit")
+        logger.debug("Returning cached failure", extra={"year": year})
+        return entry["error_data"], False
+    _CACHE_EVENTS.inc("miss")
+    return None, True
+
+
+def _store_zus_data(year: int, result: ZUSData, current_time: float) -> None:
+    """
+    Stores a fetch result in the positive or negative in-memory cache.
+    Zapisuje wynik pobierania w pozytywnej lub negatywnej pamięci podręcznej.
+    """
+    entry = _cache_entry(year)
+    if result.zus_base is not None:
+        previous = entry["data"]
+        entry["data"] = result
+        entry["timestamp"] = current_time
+        entry["error_data"] = None
+        entry["failures"] = 0
+        if previous != result:
+            _notify_zus_data_changed(year)
+    else:
+        entry["error_data"] = result
+        entry["error_timestamp"] = current_time
+        entry["failures"] += 1
+
+# === Main Data Fetching Function / Główna funkcja pobierania danych ===
+
+
+def _scrape_zus_data(year: int) -> ZUSData:
+    """
+    Downloads the ZUS page and extracts the projected average salary. Blocking, no caching.
+    Pobiera stronę ZUS i wyodrębnia prognozowane przeciętne wynagrodzenie. Blokujące, bez buforowania.
+    """
+    # Imported on the first scrape, so startup does not pay for the HTTP stack
+    # Importowane przy pierwszym pobraniu, aby start nie płacił za stos HTTP
+    import requests
+    from zus_page_parser import PARSE_CHUNK_BYTES, extract_avg_salary
+
+    logger.info("Fetching new data from zus.pl", extra={"year": year})
     # Format URL with the target year / Sformatuj URL z docelowym rokiem
     url = ZUS_INFO_URL_TEMPLATE.format(year=year)
-    # Format regex pattern with the target year / Sformatuj wzorzec regex z docelowym rokiem
-    pattern_text = ZUS_SALARY_PATTERN_TEMPLATE.format(year=year)
-    # Compile regex for efficiency / Skompiluj regex dla wydajności
-    pattern_compiled = re.compile(pattern_text, re.IGNORECASE | re.DOTALL)
 
     try:
-        # Make the HTTP GET request / Wykonaj żądanie HTTP GET
-        response = requests.get(url, timeout=REQUEST_TIMEOUT)
-        # Check for HTTP errors (4xx, 5xx) / Sprawdź błędy HTTP (4xx, 5xx)
-        response.raise_for_status()
+        # Stream the body so reading stops once the salary is found / Strumieniuj treść, aby odczyt zakończył się po znalezieniu wynagrodzenia
+        with requests.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            # Check for HTTP errors (4xx, 5xx) / Sprawdź błędy HTTP (4xx, 5xx)
+            response.raise_for_status()
+            extraction = extract_avg_salary(
+                response.iter_content(PARSE_CHUNK_BYTES), year, response.encoding or "utf-8")
     except requests.exceptions.RequestException as e:
         # Handle request errors (network issues, timeouts, etc.) / Obsłuż błędy żądania (problemy sieciowe, przekroczenia limitu czasu itp.)
         error_msg = f"ZUS Fetcher: Error fetching data from URL: {e}"
-        print(error_msg)
+        logger.error("Error fetching data from URL", extra={"year": year, "error": str(e)})
         # Return ZUSData object with error message / Zwróć obiekt ZUSData z komunikatem o błędzie
         return ZUSData(year=year, error_message=error_msg)
 
-    # Parse the HTML content / Sparsuj zawartość HTML
-    soup = BeautifulSoup(response.text, 'html.parser')
-    avg_salary_found = None
-
-    # Search for the salary text within common HTML tags / Wyszukaj tekst z wynagrodzeniem w popularnych tagach HTML
-    for tag in soup.find_all(['p', 'strong', 'div', 'span']):
-        # Get tag text and replace non-breaking space / Pobierz tekst tagu i zamień twardą spację
-        text = tag.get_text(strip=True).replace(
-            '\xa0', ' ')
-        # Try to match the regex pattern / Spróbuj dopasować wzorzec regex
-        match = pattern_compiled.search(text)
-        if match:
-            try:
-                # Extract, clean (remove spaces, replace comma with dot), and convert the salary string to float
-                # Wyodrębnij, wyczyść (usuń spacje, zamień przecinek na kropkę) i przekonwertuj ciąg znaków wynagrodzenia na float
-                salary_str = match.group(1).replace(" ", "").replace(".", "")
-                avg_salary_found = float(salary_str)
-                print(
-                    f"ZUS Fetcher: Found avg_salary for {year}: {avg_salary_found}")
-                # Salary found, exit the loop / Znaleziono wynagrodzenie, wyjdź z pętli
-                break
-            except (ValueError, IndexError) as e:
-                # Handle potential errors during parsing or conversion / Obsłuż potencjalne błędy podczas parsowania lub konwersji
-                print(
-                    f"ZUS Fetcher: Error parsing salary string '{match.group(1)}': {e}")
-                # Try finding in the next tag / Spróbuj znaleźć w następnym tagu
-                continue
+    for salary_str in extraction.rejected:
+        logger.warning("Error parsing salary string", extra={"year": year, "salary_str": salary_str})
+    avg_salary_found = extraction.avg_salary
 
     # If salary was successfully found and parsed / Jeśli wynagrodzenie zostało pomyślnie znalezione i sparsowane
     if avg_salary_found is not None:
@@ -128,15 +359,253 @@ def fetch_and_cache_zus_data(force_refresh: bool = False) -> ZUSData:
         # Create result object / Utwórz obiekt wynikowy
         result = ZUSData(year=year, avg_salary=avg_salary_found,
                          zus_base=zus_base_calculated)
-        # Update cache / Zaktualizuj pamięć podręczną
-        _zus_data_cache["data"] = result
-        _zus_data_cache["timestamp"] = current_time
-        print(f"ZUS Fetcher: Successfully fetched and cached data: {result}")
+        logger.info("Successfully fetched data", extra={
+            "year": year, "avg_salary": avg_salary_found, "zus_base": zus_base_calculated,
+            "bytes_read": extraction.bytes_read})
         # Return the result / Zwróć wynik
         return result
     else:
         # If salary text was not found on the page / Jeśli tekst wynagrodzenia nie został znaleziony na stronie
         error_msg = f"ZUS Fetcher: Could not find average salary data for {year} on the page."
-        print(error_msg)
+        logger.error("Could not find average salary data on the page", extra={
+            "year": year, "bytes_read": extraction.bytes_read})
         # Return ZUSData object with error message / Zwróć obiekt ZUSData z komunikatem o błędzie
         return ZUSData(year=year, error_message=error_msg)
+
+
+def _refresh_zus_data(year: int, use_lease: bool) -> Optional[ZUSData]:
+    """
+    Scrapes a year and persists a successful result. Blocking.
+    With use_lease, returns None if another process is already refreshing this year.
+
+    Pobiera dane dla roku i zapisuje udany wynik. Blokujące.
+    Z use_lease zwraca None, jeśli inny proces już odświeża ten rok.
+    """
+    store = _get_store()
+    leased = False
+    if use_lease and store is not None:
+        try:
+            leased = store.try_acquire_refresh(year, REFRESH_LEASE_SECONDS)
+        except sqlite3.Error as e:
+            logger.warning("Could not take refresh lease, fetching anyway", extra={"year": year, "error": str(e)})
+        else:
+            if not leased:
+                logger.info("Another process is refreshing data", extra={"year": year})
+                _REFRESHES.inc("skipped")
+                return None
+    try:
+        with _SCRAPE_DURATION.time():
+            result = _scrape_zus_data(year)
+        _REFRESHES.inc("success" if result.zus_base is not None else "failure")
+        if store is not None and result.zus_base is not None:
+            try:
+                store.save(year, result.avg_salary, result.zus_base, time.time())
+            except sqlite3.Error as e:
+                logger.error("Error writing persistent store", extra={"year": year, "error": str(e)})
+        return result
+    finally:
+        if leased:
+            try:
+                store.release_refresh(year)
+            except sqlite3.Error as e:
+                logger.error("Error releasing refresh lease", extra={"year": year, "error": str(e)})
+
+
+async def _wait_for_store(year: int) -> Optional[ZUSData]:
+    """
+    Waits until another process has written the year to the store. Gives up when that process
+    releases its lease without data (its fetch failed) or the lease runs out.
+    Czeka, aż inny proces zapisze rok w magazynie. Rezygnuje, gdy ten proces zwolni dzierżawę
+    bez danych (jego pobieranie się nie powiodło) lub dzierżawa wygaśnie.
+    """
+    deadline = time.time() + REFRESH_LEASE_SECONDS
+    entry = _cache_entry(year)
+    store = _get_store()
+    while time.time() < deadline:
+        await asyncio.sleep(0.25)
+        entry["store_checked"] = 0
+        await _reload_from_store_async(year, time.time())
+        if entry["data"] is not None:
+            return entry["data"]
+        try:
+            if not await asyncio.to_thread(store.refresh_in_progress, year):
+                return None
+        except sqlite3.Error as e:
+            logger.error("Error reading persistent store", extra={"year": year, "error": str(e)})
+    return None
+
+
+async def _run_fetch(year: int, use_lease: bool) -> ZUSData:
+    """
+    Refreshes a year in a worker thread and stores the result.
+    Odświeża rok w wątku roboczym i zapisuje wynik.
+    """
+    try:
+        entry = _cache_entry(year)
+        try:
+            if use_lease:
+                # Another process may have refreshed the year already / Inny proces mógł już odświeżyć ten rok
+                await _reload_from_store_async(year, time.time())
+                if entry["data"] is not None and time.time() - entry["timestamp"] < ZUS_CACHE_TTL:
+                    return entry["data"]
+            result = await asyncio.to_thread(_refresh_zus_data, year, use_lease)
+            if result is None:
+                # Another process holds the lease / Inny proces trzyma dzierżawę
+                if entry["data"] is not None:
+                    entry["refresh_not_before"] = time.time() + STORE_POLL_INTERVAL
+                    return entry["data"]
+                stored = await _wait_for_store(year)
+                if stored is not None:
+                    return stored
+                result = await asyncio.to_thread(_refresh_zus_data, year, False)
+        except Exception as e:
+            # Unexpected parsing errors must not break every waiting request
+            # Nieoczekiwane błędy parsowania nie mogą przerwać wszystkich oczekujących żądań
+            logger.exception("Unexpected error while fetching data", extra={"year": year})
+            result = ZUSData(year=year, error_message=f"ZUS Fetcher: Unexpected error while fetching data: {e}")
+        _store_zus_data(year, result, time.time())
+        return result
+    finally:
+        _inflight_fetch.pop(year, None)
+
+
+def _start_fetch(year: int, use_lease: bool) -> "asyncio.Task":
+    """Returns the in-flight fetch for a year, starting one if needed / Zwraca pobieranie w toku dla roku, rozpoczynając je w razie potrzeby."""
+    task = _inflight_fetch.get(year)
+    if task is None:
+        task = asyncio.ensure_future(_run_fetch(year, use_lease))
+        _inflight_fetch[year] = task
+    return task
+
+
+async def fetch_and_cache_zus_data_async(force_refresh: bool = False, year: Optional[int] = None) -> ZUSData:
+    """
+    Returns the ZUS data for a year without blocking the event loop.
+    Concurrent cache misses share a single in-flight fetch, and failures are cached with backoff.
+    Expired data is served immediately while one background task refreshes it.
+
+    Zwraca dane ZUS dla roku bez blokowania pętli zdarzeń.
+    Równoczesne chybienia pamięci podręcznej współdzielą jedno pobieranie w toku, a niepowodzenia są buforowane z wycofywaniem.
+    Wygasłe dane są serwowane od razu, a jedno zadanie w tle je odświeża.
+
+    Args:
+        force_refresh: If True, ignores the cache (an in-flight fetch is still shared); not rate-limited, public callers go through force_refresh_zus_data. / Jeśli True, ignoruje pamięć podręczną (pobieranie w toku jest nadal współdzielone); bez limitu, publiczne wywołania przechodzą przez force_refresh_zus_data.
+        year: Year to fetch, defaults to ZUS_INFO_YEAR. / Rok do pobrania, domyślnie ZUS_INFO_YEAR.
+
+    Returns:
+        ZUSData object with the fetched data or an error message. / Obiekt ZUSData z pobranymi danymi lub komunikatem o błędzie.
+    """
+    year = ZUS_INFO_YEAR if year is None else year
+    if not force_refresh:
+        cached, needs_refresh = _lookup_zus_data(year, time.time())
+        if cached is not None:
+            if needs_refresh:
+                _start_fetch(year, use_lease=True)
+            return cached
+
+    # Shield so a cancelled request does not cancel the fetch shared with others
+    # Osłona, aby anulowane żądanie nie anulowało pobierania współdzielonego z innymi
+    return await asyncio.shield(_start_fetch(year, use_lease=not force_refresh))
+
+
+class ForceRefreshResult(NamedTuple):
+    """Outcome of a forced refresh request / Wynik żądania wymuszonego odświeżenia."""
+    data: ZUSData  # Fresh data, or the cached data if limited / Świeże dane lub dane z pamięci, jeśli ograniczono
+    # Seconds until a retry can be admitted, None if the refresh ran
+    # Sekundy do chwili, gdy ponowna próba może zostać dopuszczona, None jeśli odświeżenie się odbyło
+    retry_after: Optional[float]
+
+
+async def force_refresh_zus_data(year: Optional[int] = None, privileged: bool = False) -> ForceRefreshResult:
+    """
+    Forced refresh for public callers. A fetch already in progress for the year is joined instead of starting
+    another; otherwise the refresh needs a token and the year must be out of its cooldown. Callers over the
+    limit get the cached data (normal lookup) and the time to wait. Privileged (admin) refreshes skip the limit,
+    but still join an in-flight fetch and start the year's cooldown.
+
+    Wymuszone odświeżenie dla publicznych wywołań. Do pobierania roku już w toku dołącza się zamiast rozpoczynać
+    kolejne; w przeciwnym razie odświeżenie wymaga żetonu, a rok musi być poza czasem ochłodzenia. Wywołania ponad
+    limit dostają dane z pamięci podręcznej (zwykłe wyszukanie) i czas oczekiwania. Odświeżenia uprzywilejowane
+    (administracyjne) pomijają limit, ale nadal dołączają do pobierania w toku i rozpoczynają czas ochłodzenia roku.
+    """
+    year = ZUS_INFO_YEAR if year is None else year
+    task = _inflight_fetch.get(year)
+    if task is not None:
+        _FORCE_REFRESHES.inc("coalesced")
+        return ForceRefreshResult(await asyncio.shield(task), None)
+
+    now = time.monotonic()
+    if privileged:
+        _force_refresh_admission.record(year, now)
+        _FORCE_REFRESHES.inc("privileged")
+    else:
+        retry_after = _force_refresh_admission.admit(year, now)
+        if retry_after > 0.0:
+            _FORCE_REFRESHES.inc("limited")
+            logger.info("Forced refresh limited", extra={"year": year, "retry_after": round(retry_after, 1)})
+            return ForceRefreshResult(await fetch_and_cache_zus_data_async(year=year), retry_after)
+        _FORCE_REFRESHES.inc("admitted")
+    return ForceRefreshResult(await fetch_and_cache_zus_data_async(force_refresh=True, year=year), None)
+
+
+def load_zus_baseline(path: str) -> Dict[int, ZUSData]:
+    """
+    Reads the bundled baseline: {"version": ..., "years": {"2025": {"avg_salary": ..., "zus_base": ...}}}.
+    Odczytuje dołączone dane bazowe: {"version": ..., "years": {"2025": {"avg_salary": ..., "zus_base": ...}}}.
+    """
+    with open(path, encoding="utf-8") as source:
+        baseline = json.load(source)
+    version = str(baseline["version"])
+    return {int(year): ZUSData(year=int(year), avg_salary=values["avg_salary"], zus_base=values["zus_base"],
+                               baseline_version=version)
+            for year, values in baseline["years"].items()}
+
+
+def _adopt_baseline() -> None:
+    """
+    Serves baseline years that have no data yet. Their timestamp is zero, so they count as expired:
+    the first lookup starts a refresh, and any stored or scraped data replaces them.
+    Serwuje lata bazowe, które nie mają jeszcze danych. Ich znacznik czasu to zero, więc liczą się jako wygasłe:
+    pierwsze wyszukanie rozpoczyna odświeżanie, a dane zapisane lub pobrane je zastępują.
+    """
+    try:
+        baseline = load_zus_baseline(ZUS_BASELINE_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error("Error reading the ZUS baseline", extra={"path": ZUS_BASELINE_PATH, "error": str(e)})
+        return
+    for year, data in baseline.items():
+        entry = _cache_entry(year)
+        if entry["data"] is None:
+            entry["data"] = data
+    logger.info("Serving the ZUS baseline until live data arrives", extra={
+        "version": next(iter(baseline.values())).baseline_version if baseline else None, "years": sorted(baseline)})
+
+
+async def warm_up_zus_data() -> None:
+    """
+    Loads every stored year into memory at startup and starts a background refresh of the
+    current year if it is missing or expired. Does not wait for the scrape.
+    In the "baseline" startup mode, years missing from the store are served from the bundled baseline meanwhile.
+
+    Ładuje przy starcie wszystkie zapisane lata do pamięci i uruchamia w tle odświeżenie
+    bieżącego roku, jeśli go brakuje lub wygasł. Nie czeka na pobranie.
+    W trybie startu "baseline" lata nieobecne w magazynie są w tym czasie serwowane z dołączonych danych bazowych.
+    """
+    store = await asyncio.to_thread(_get_store)
+    if store is not None:
+        try:
+            rows = await asyncio.to_thread(store.load_all)
+        except sqlite3.Error as e:
+            logger.error("Error reading persistent store", extra={"error": str(e)})
+            rows = {}
+        for year, row in rows.items():
+            _adopt_stored_row(year, row)
+        logger.info("Loaded years from the persistent store", extra={"years": sorted(rows)})
+    if ZUS_STARTUP_MODE == "baseline":
+        _adopt_baseline()
+
+    current_time = time.time()
+    _cache_entry(ZUS_INFO_YEAR)["store_checked"] = current_time
+    cached, needs_refresh = _lookup_zus_data(ZUS_INFO_YEAR, current_time)
+    if needs_refresh:
+        _start_fetch(ZUS_INFO_YEAR, use_lease=True)
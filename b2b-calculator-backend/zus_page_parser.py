@@ -0,0 +1,124 @@
+# Incremental decoding of the response body / Przyrostowe dekodowanie treści odpowiedzi
+import codecs
+# Caching of compiled patterns per year / Buforowanie skompilowanych wzorców dla każdego roku
+import functools
+# Streaming HTML tokenizer from the standard library / Strumieniowy tokenizer HTML z biblioteki standardowej
+from html.parser import HTMLParser
+# Library for regular expressions / Biblioteka do wyrażeń regularnych
+import re
+# For type hinting / Do typowania
+from typing import Iterable, List, NamedTuple, Optional
+
+# === ZUS Page Extractor / Ekstraktor strony ZUS ===
+# Finds the projected average salary while the ZUS page is being read. Each text node is read once
+# and only a short tail of earlier text is kept, so the work is linear in the page size, and reading
+# stops at the first amount that parses.
+# Znajduje prognozowane przeciętne wynagrodzenie podczas odczytu strony ZUS. Każdy węzeł tekstowy jest
+# czytany raz i zachowywany jest tylko krótki koniec wcześniejszego tekstu, więc praca jest liniowa
+# względem rozmiaru strony, a odczyt kończy się na pierwszej kwocie, którą da się sparsować.
+
+# Regular expression pattern template to find the salary text / Szablon wzorca wyrażenia regularnego do znalezienia tekstu z wynagrodzeniem
+ZUS_SALARY_PATTERN_TEMPLATE = r"Kwota\s+prognozowanego\s+przeciętnego\s+wynagrodzenia\s+w\s+{year}\s+roku\s+wynosi\s+([\d\s.,]+)\s*zł\.?"
+# Size of the body chunks passed to the extractor / Rozmiar porcji treści przekazywanych do ekstraktora
+PARSE_CHUNK_BYTES = 16384
+# Text kept from earlier nodes, so a sentence split across tags is still found; longer than any match
+# Tekst zachowywany z wcześniejszych węzłów, aby zdanie podzielone między tagi zostało znalezione; dłuższy niż każde dopasowanie
+SEARCH_WINDOW_CHARS = 512
+
+# Tags whose content is not page text / Tagi, których zawartość nie jest tekstem strony
+_SKIPPED_TAGS = ("script", "style")
+# Runs of whitespace (\s also matches non-breaking spaces) / Ciągi białych znaków (\s obejmuje też twarde spacje)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class PageExtraction(NamedTuple):
+    """Result of scanning a ZUS page / Wynik przeszukania strony ZUS."""
+    avg_salary: Optional[float]  # Projected average salary, None if not found / Prognozowane przeciętne wynagrodzenie, None jeśli nie znaleziono
+    rejected: List[str]  # Matched amounts that could not be parsed / Dopasowane kwoty, których nie udało się sparsować
+    bytes_read: int  # Body bytes consumed before stopping / Bajty treści odczytane przed zatrzymaniem
+
+
+@functools.lru_cache(maxsize=None)
+def salary_pattern(year: int) -> "re.Pattern":
+    """Compiled salary pattern for a year, built once / Skompilowany wzorzec wynagrodzenia dla roku, budowany raz."""
+    return re.compile(ZUS_SALARY_PATTERN_TEMPLATE.format(year=year), re.IGNORECASE | re.DOTALL)
+
+
+def parse_salary(text: str) -> float:
+    """
+    Converts the matched amount to float (spaces and thousands dots removed). Raises ValueError.
+    Konwertuje dopasowaną kwotę na float (usuwa spacje i kropki tysięcy). Zgłasza ValueError.
+    """
+    return float(text.replace(" ", "").replace(".", ""))
+
+
+class SalaryExtractor(HTMLParser):
+    """
+    HTML parser that searches the page text as it is fed and remembers the first valid salary.
+    Parser HTML przeszukujący tekst strony w miarę podawania i zapamiętujący pierwsze prawidłowe wynagrodzenie.
+    """
+
+    def __init__(self, year: int):
+        super().__init__(convert_charrefs=True)
+        self.pattern = salary_pattern(year)
+        self.avg_salary: Optional[float] = None
+        self.rejected: List[str] = []
+        # Normalized text not yet ruled out / Znormalizowany tekst jeszcze niewykluczony
+        self._window = ""
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.avg_salary is not None or self._skip_depth:
+            return
+        # Collapse whitespace, including non-breaking spaces; text split between chunks or tags is joined as is
+        # Zwiń białe znaki, łącznie z twardymi spacjami; tekst podzielony między porcje lub tagi jest łączony bez zmian
+        text = _WHITESPACE.sub(" ", data)
+        if self._window.endswith(" ") and text.startswith(" "):
+            text = text[1:]
+        if not text:
+            return
+        window = self._window + text
+
+        match = self.pattern.search(window)
+        while match is not None:
+            try:
+                self.avg_salary = parse_salary(match.group(1))
+                return
+            except ValueError:
+                # Keep looking after this match / Szukaj dalej za tym dopasowaniem
+                self.rejected.append(match.group(1))
+                window = window[match.end():]
+                match = self.pattern.search(window)
+        self._window = window[-SEARCH_WINDOW_CHARS:]
+
+
+def extract_avg_salary(chunks: Iterable[bytes], year: int, encoding: str = "utf-8") -> PageExtraction:
+    """
+    Scans a page given as byte chunks and stops reading at the first valid salary.
+    Przeszukuje stronę podaną jako porcje bajtów i przestaje czytać przy pierwszym prawidłowym wynagrodzeniu.
+
+    Args:
+        chunks: Body chunks, e.g. response.iter_content(). / Porcje treści, np. response.iter_content().
+        year: Year in the searched sentence. / Rok w szukanym zdaniu.
+        encoding: Body encoding. / Kodowanie treści.
+    """
+    extractor = SalaryExtractor(year)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    bytes_read = 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.avg_salary is not None:
+            return PageExtraction(extractor.avg_salary, extractor.rejected, bytes_read)
+    extractor.feed(decoder.decode(b"", final=True))
+    # Flush text buffered after the last tag / Opróżnij tekst zbuforowany po ostatnim tagu
+    extractor.close()
+    return PageExtraction(extractor.avg_salary, extractor.rejected, bytes_read)
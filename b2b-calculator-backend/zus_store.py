@@ -0,0 +1,96 @@
+# Library for the on-disk database / Biblioteka do bazy danych na dysku
+import sqlite3
+# Library for time-related functions / Biblioteka do funkcji związanych z czasem
+import time
+# Context manager helper / Pomocnik menedżera kontekstu
+from contextlib import contextmanager
+# For type hinting / Do typowania
+from typing import Dict, Iterator, Optional, Tuple
+
+# === Persistent ZUS Parameter Store / Trwały magazyn parametrów ZUS ===
+# SQLite file keyed by year, shared by all worker processes on the host. It survives restarts and
+# holds a refresh lease per year, so that only one process scrapes zus.pl when data expires.
+# Plik SQLite z kluczem rocznym, współdzielony przez wszystkie procesy robocze na hoście. Przetrwa restart
+# i przechowuje dzierżawę odświeżania dla każdego roku, aby tylko jeden proces pobierał dane z zus.pl po ich wygaśnięciu.
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS zus_data (
+        year INTEGER PRIMARY KEY,
+        avg_salary REAL NOT NULL,
+        zus_base REAL NOT NULL,
+        fetched_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS refresh_leases (
+        year INTEGER PRIMARY KEY,
+        lease_until REAL NOT NULL
+    )""",
+)
+
+# A stored row: (avg_salary, zus_base, fetched_at) / Zapisany wiersz: (avg_salary, zus_base, fetched_at)
+StoredRow = Tuple[float, float, float]
+
+
+class ZUSStore:
+    """Year-keyed persistent store for scraped ZUS data / Trwały magazyn pobranych danych ZUS z kluczem rocznym."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Short-lived connections: the store is only touched on startup and on expiry
+        # Krótkotrwałe połączenia: magazyn jest używany tylko przy starcie i po wygaśnięciu danych
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:  # Commits or rolls back / Zatwierdza lub wycofuje transakcję
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, year: int) -> Optional[StoredRow]:
+        """Returns the stored row for a year, or None / Zwraca zapisany wiersz dla roku lub None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT avg_salary, zus_base, fetched_at FROM zus_data WHERE year = ?", (year,)).fetchone()
+        return tuple(row) if row else None
+
+    def load_all(self) -> Dict[int, StoredRow]:
+        """Returns all stored years / Zwraca wszystkie zapisane lata."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT year, avg_salary, zus_base, fetched_at FROM zus_data").fetchall()
+        return {year: (avg_salary, zus_base, fetched_at) for year, avg_salary, zus_base, fetched_at in rows}
+
+    def save(self, year: int, avg_salary: float, zus_base: float, fetched_at: float) -> None:
+        """Inserts or replaces the data for a year / Wstawia lub zastępuje dane dla roku."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO zus_data (year, avg_salary, zus_base, fetched_at) VALUES (?, ?, ?, ?)",
+                (year, avg_salary, zus_base, fetched_at))
+
+    def try_acquire_refresh(self, year: int, lease_seconds: float) -> bool:
+        """
+        Atomically takes the refresh lease for a year. Returns False if another process holds it.
+        Atomowo przejmuje dzierżawę odświeżania dla roku. Zwraca False, jeśli trzyma ją inny proces.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """INSERT INTO refresh_leases (year, lease_until) VALUES (?, ?)
+                   ON CONFLICT(year) DO UPDATE SET lease_until = excluded.lease_until
+                   WHERE refresh_leases.lease_until < ?""",
+                (year, now + lease_seconds, now))
+            return cursor.rowcount == 1
+
+    def release_refresh(self, year: int) -> None:
+        """Releases the refresh lease for a year / Zwalnia dzierżawę odświeżania dla roku."""
+        with self._connect() as conn:
+            conn.execute("UPDATE refresh_leases SET lease_until = 0 WHERE year = ?", (year,))
+
+    def refresh_in_progress(self, year: int) -> bool:
+        """Whether some process holds an unexpired refresh lease / Czy jakiś proces trzyma niewygasłą dzierżawę odświeżania."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT lease_until FROM refresh_leases WHERE year = ?", (year,)).fetchone()
+        return row is not None and row[0] > time.time()